@@ -1,109 +1,100 @@
-
-from decimal import Decimal, getcontext
 from collections import Counter
-import math
-import os
-
-# High precision for arithmetic coding
-getcontext().prec = 500
-
-
-# Step 1: Load the generated Bernoulli sequence
-
-data_path = os.path.join(os.path.dirname(__file__), "..", "data", "bernoulli_bits.txt")
 
-if not os.path.exists(data_path):
-    raise FileNotFoundError("Missing 'bernoulli_bits.txt' in data/ folder. Generate it first!")
+from bitcodecs.bit_dataset import load_dataset
+from bitcodecs.entropy import entropy
+from bitcodecs.range_coder import quantize_counts, build_intervals, encode_sequence, decode_sequence
+from bitcodecs.instrument import Instrument
+from bitcodecs.results_store import ResultsStore, code_version
 
-with open(data_path, "r") as f:
-    content = f.read().strip()
-    sequence = [int(c) for c in content if c in "01"]
 
-total = len(sequence)
-counts = Counter(sequence)
-p0 = counts[0] / total
-p1 = counts[1] / total
+if __name__ == "__main__":
 
-print("\n--- ARITHMETIC CODING  ---")
-print(f"Sequence length: {total}")
-print(f"Symbol 0: p={p0:.4f}")
-print(f"Symbol 1: p={p1:.4f}")
+    # Step 1: Load the generated Bernoulli sequence
 
+    inst = Instrument("arithmetic_compression")
+    inst.stage("load")
+    sequence = load_dataset("bernoulli_bits").tolist()
 
-# Step 2: Computing entropy
+    total = len(sequence)
+    inst.stage("count")
+    counts = Counter(sequence)
+    p0 = counts[0] / total
+    p1 = counts[1] / total
 
-def entropy(p_list):
-    return -sum(p * math.log2(p) for p in p_list if p > 0)
+    print("\n--- ARITHMETIC CODING  ---")
+    print(f"Sequence length: {total}")
+    print(f"Symbol 0: p={p0:.4f}")
+    print(f"Symbol 1: p={p1:.4f}")
 
-H = entropy([p0, p1])
-print(f"Entropy of source: {H:.4f} bits/symbol\n")
 
+    # Step 2: Computing entropy
 
-# Step 3: Defining cumulative probability intervals
+    H = entropy([p0, p1])
+    print(f"Entropy of source: {H:.4f} bits/symbol\n")
 
-intervals = {
-    0: (Decimal('0.0'), Decimal(str(p0))),
-    1: (Decimal(str(p0)), Decimal('1.0'))
-}
 
-print("Symbol intervals (like Huffman codes):")
-for sym, (low_i, high_i) in intervals.items():
-    print(f"  Symbol {sym}: [{low_i:.6f}, {high_i:.6f})")
+    # Step 3: Defining cumulative probability intervals
 
+    # Integer frequencies (out of 2**15) stand in for p0/p1
+    inst.stage("build")
+    freqs = quantize_counts(counts)
+    intervals, total_freq = build_intervals(freqs)
 
-# Step 4: Arithmetic encoding
+    print("Symbol intervals (like Huffman codes):")
+    for sym, (cum, freq) in intervals.items():
+        print(f"  Symbol {sym}: [{cum / total_freq:.6f}, {(cum + freq) / total_freq:.6f})")
 
-low = Decimal('0.0')
-high = Decimal('1.0')
 
-for bit in sequence:
-    range_width = high - low
-    sym_low, sym_high = intervals[bit]
-    high = low + range_width * sym_high
-    low = low + range_width * sym_low
+    # Step 4: Arithmetic encoding and decoding (served from the results store if this exact run was done before)
 
-encoded_value = (low + high) / 2
-width = float(high - low)
-if width <= 0:
-    width = 1e-300
+    inst.stage("lookup")
+    store = ResultsStore()
+    run_params = {"freq_bits": 15}
+    run_version = code_version(__file__, "range_coder")
+    run_key, input_hash = store.key(sequence, "arithmetic", run_params, run_version)
+    cached = store.get(run_key)
 
-encoded_bits_est = -math.log2(width)
-avg_code_len = encoded_bits_est / total
-efficiency = (H / avg_code_len) * 100
+    if cached is None:
+        inst.stage("encode")
+        encoded = encode_sequence(sequence, intervals, total_freq)
+        encoded_bytes = len(encoded)
 
+        inst.stage("decode")
+        # Arithmetic decoding
+        decoded = decode_sequence(encoded, total, intervals, total_freq)
+        inst.stage("verify")
+        is_lossless = decoded == sequence
+    else:
+        print("\n(encode/decode results served from the results store)")
+        encoded_bytes = cached["encoded_bytes"]
+        is_lossless = cached["lossless"]
 
-# Step 5: Arithmetic decoding
-
-decoded = []
-low_d, high_d = Decimal('0.0'), Decimal('1.0')
-code = encoded_value
-
-for _ in range(total):
-    range_width = high_d - low_d
-    scaled_value = (code - low_d) / range_width
 
-    # Check which symbol interval the scaled value falls into
-    if scaled_value < intervals[0][1]:
-        bit = 0
-    else:
-        bit = 1
+    # Step 5: Statistics
 
-    decoded.append(bit)
+    inst.stage("stats")
+    encoded_bits = encoded_bytes * 8
+    avg_code_len = encoded_bits / total
+    efficiency = (H / avg_code_len) * 100
 
-    sym_low, sym_high = intervals[bit]
-    high_d = low_d + range_width * sym_high
-    low_d = low_d + range_width * sym_low
 
-is_lossless = decoded == sequence
+    # Step 6: Display results
 
+    print(f"\nEncoded length: {encoded_bits} bits ({encoded_bytes} bytes)")
+    print(f"Average code length per bit: {avg_code_len:.4f} bits/symbol")
+    print(f"Compression efficiency: {efficiency:.2f}%")
+    print(f"Original bit length: {total} bits")
+    print(f"Decoded sequence equals original? {is_lossless}")
 
-# Step 6: Display results
+    inst.stage("write")
+    store.put(run_key, input_hash, "arithmetic", run_params, {
+        "entropy_per_bit": H,
+        "avg_len_per_bit": avg_code_len,
+        "efficiency": efficiency,
+        "original_bits": total,
+        "encoded_bits": encoded_bits,
+        "encoded_bytes": encoded_bytes,
+        "lossless": is_lossless,
+    }, version=run_version)
 
-print(f"\nEncoded range: [{low}, {high})")
-print(f"Encoded value: {encoded_value}")
-print(f"Encoded range width: {float(high - low):.3e}")
-print(f"Estimated encoded length: {encoded_bits_est:.2f} bits")
-print(f"Average code length per bit: {avg_code_len:.4f} bits/symbol")
-print(f"Compression efficiency: {efficiency:.2f}%")
-print(f"Original bit length: {total} bits")
-print(f"Decoded sequence equals original? {is_lossless}")
\ No newline at end of file
+    inst.done()
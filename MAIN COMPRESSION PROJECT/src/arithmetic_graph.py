@@ -1,134 +1,125 @@
-
-from decimal import Decimal, getcontext
 from collections import Counter
-import math
 import os
 
-# Use high precision for tiny probability ranges
-getcontext().prec = 500
-
-
-# Step 1: Load adjacency bits
-
-data_path = os.path.join(os.path.dirname(__file__), "..", "data", "graph_bits.txt")
-
-if not os.path.exists(data_path):
-    raise FileNotFoundError("Missing 'graph_bits.txt' in data/ folder. Generate it using data_generation.py first!")
-
-with open(data_path, "r") as f:
-    content = f.read().strip()
-    sequence = [int(c) for c in content if c in "01"]
-
-total = len(sequence)
-counts = Counter(sequence)
-p0 = counts[0] / total
-p1 = counts[1] / total
-
-print("\n--- ARITHMETIC CODING (GRAPH) ---")
-print(f"Sequence length: {total}")
-print(f"Symbol 0: p={p0:.4f}")
-print(f"Symbol 1: p={p1:.4f}")
-
+from bitcodecs.bit_dataset import load_dataset
+from bitcodecs.entropy import entropy
+from bitcodecs.range_coder import quantize_counts, build_intervals, encode_sequence, decode_sequence
+from bitcodecs.instrument import Instrument
+from bitcodecs.results_store import ResultsStore, code_version
 
-# Step 2: Compute entropy
 
-def entropy(p_list):
-    return -sum(p * math.log2(p) for p in p_list if p > 0)
+if __name__ == "__main__":
 
-H = entropy([p0, p1])
-print(f"Entropy of source: {H:.4f} bits/symbol\n")
+    # Step 1: Load adjacency bits
 
+    inst = Instrument("arithmetic_graph")
+    inst.stage("load")
+    sequence = load_dataset("graph_bits").tolist()
 
-# Step 3: Defining symbol probability intervals
+    total = len(sequence)
+    inst.stage("count")
+    counts = Counter(sequence)
+    p0 = counts[0] / total
+    p1 = counts[1] / total
 
-intervals = {
-    0: (Decimal('0.0'), Decimal(str(p0))),
-    1: (Decimal(str(p0)), Decimal('1.0'))
-}
+    print("\n--- ARITHMETIC CODING (GRAPH) ---")
+    print(f"Sequence length: {total}")
+    print(f"Symbol 0: p={p0:.4f}")
+    print(f"Symbol 1: p={p1:.4f}")
 
-print("Symbol intervals (analogous to Huffman codes):")
-for sym, (low_i, high_i) in intervals.items():
-    print(f"  Symbol {sym}: [{low_i:.6f}, {high_i:.6f})")
 
+    # Step 2: Compute entropy
 
-# Step 4: Arithmetic encoding
+    H = entropy([p0, p1])
+    print(f"Entropy of source: {H:.4f} bits/symbol\n")
 
-low = Decimal('0.0')
-high = Decimal('1.0')
 
-for bit in sequence:
-    range_width = high - low
-    sym_low, sym_high = intervals[bit]
-    high = low + range_width * sym_high
-    low = low + range_width * sym_low
+    # Step 3: Defining symbol probability intervals
 
-encoded_value = (low + high) / 2
-width = float(high - low)
-if width <= 0:
-    width = 1e-300
+    # Integer frequencies (out of 2**15) stand in for p0/p1
+    inst.stage("build")
+    freqs = quantize_counts(counts)
+    intervals, total_freq = build_intervals(freqs)
 
-encoded_bits_est = -math.log2(width)
-avg_code_len = encoded_bits_est / total
-efficiency = (H / avg_code_len) * 100
+    print("Symbol intervals (analogous to Huffman codes):")
+    for sym, (cum, freq) in intervals.items():
+        print(f"  Symbol {sym}: [{cum / total_freq:.6f}, {(cum + freq) / total_freq:.6f})")
 
 
-# Step 5: Arithmetic decoding (verify losslessness)
+    # Step 4: Arithmetic encoding and decoding (served from the results store if this exact run was done before)
 
-decoded = []
-low_d, high_d = Decimal('0.0'), Decimal('1.0')
-code = encoded_value
+    inst.stage("lookup")
+    store = ResultsStore()
+    run_params = {"freq_bits": 15}
+    run_version = code_version(__file__, "range_coder")
+    run_key, input_hash = store.key(sequence, "arithmetic", run_params, run_version)
+    cached = store.get(run_key)
 
-for _ in range(total):
-    range_width = high_d - low_d
-    scaled_value = (code - low_d) / range_width
+    if cached is None:
+        inst.stage("encode")
+        encoded = encode_sequence(sequence, intervals, total_freq)
+        encoded_bytes = len(encoded)
 
-    if scaled_value < intervals[0][1]:
-        bit = 0
+        inst.stage("decode")
+        # Arithmetic decoding (verify losslessness)
+        decoded = decode_sequence(encoded, total, intervals, total_freq)
+        inst.stage("verify")
+        is_lossless = decoded == sequence
     else:
-        bit = 1
-
-    decoded.append(bit)
-    sym_low, sym_high = intervals[bit]
-    high_d = low_d + range_width * sym_high
-    low_d = low_d + range_width * sym_low
-
-is_lossless = decoded == sequence
-
-
-# Step 6: Display results
-
-print(f"\nEncoded range: [{low}, {high})")
-print(f"Encoded value: {encoded_value}")
-print(f"Encoded range width: {float(high - low):.3e}")
-print(f"Estimated encoded length: {encoded_bits_est:.2f} bits")
-print(f"Average code length per bit: {avg_code_len:.4f} bits/symbol")
-print(f"Compression efficiency: {efficiency:.2f}%")
-print(f"Original bit length: {total} bits")
-print(f"Decoded sequence equals original? {is_lossless}")
-
-
-# Step 7: Save  results
-
-results_dir = os.path.join(os.path.dirname(__file__), "..", "results")
-os.makedirs(results_dir, exist_ok=True)
-save_path = os.path.join(results_dir, "arithmetic_graph.txt")
-
-with open(save_path, "w") as f:
-    f.write("--- ARITHMETIC CODING (GRAPH) ---\n")
-    f.write(f"Sequence length: {total}\n")
-    f.write(f"Symbol 0: p={p0:.4f}\n")
-    f.write(f"Symbol 1: p={p1:.4f}\n\n")
-    f.write(f"Entropy of source: {H:.4f} bits/symbol\n\n")
-    f.write("Symbol intervals (analogous to Huffman codes):\n")
-    for sym, (low_i, high_i) in intervals.items():
-        f.write(f"  Symbol {sym}: [{low_i:.6f}, {high_i:.6f})\n")
-    f.write(f"\nEncoded range: [{low}, {high})\n")
-    f.write(f"Encoded value: {encoded_value}\n")
-    f.write(f"Encoded range width: {float(high - low):.3e}\n")
-    f.write(f"Estimated encoded length: {encoded_bits_est:.2f} bits\n")
-    f.write(f"Average code length per bit: {avg_code_len:.4f} bits/symbol\n")
-    f.write(f"Compression efficiency: {efficiency:.2f}%\n")
-    f.write(f"Original bit length: {total} bits\n")
-    f.write(f"Decoded sequence equals original? {is_lossless}\n")
-
-print(f"\nResults saved to: {os.path.abspath(save_path)}")
\ No newline at end of file
+        print("\n(encode/decode results served from the results store)")
+        encoded_bytes = cached["encoded_bytes"]
+        is_lossless = cached["lossless"]
+
+
+    # Step 5: Statistics
+
+    inst.stage("stats")
+    encoded_bits = encoded_bytes * 8
+    avg_code_len = encoded_bits / total
+    efficiency = (H / avg_code_len) * 100
+
+
+    # Step 6: Display results
+
+    print(f"\nEncoded length: {encoded_bits} bits ({encoded_bytes} bytes)")
+    print(f"Average code length per bit: {avg_code_len:.4f} bits/symbol")
+    print(f"Compression efficiency: {efficiency:.2f}%")
+    print(f"Original bit length: {total} bits")
+    print(f"Decoded sequence equals original? {is_lossless}")
+
+    inst.stage("write")
+    store.put(run_key, input_hash, "arithmetic", run_params, {
+        "entropy_per_bit": H,
+        "avg_len_per_bit": avg_code_len,
+        "efficiency": efficiency,
+        "original_bits": total,
+        "encoded_bits": encoded_bits,
+        "encoded_bytes": encoded_bytes,
+        "lossless": is_lossless,
+    }, version=run_version)
+
+
+    # Step 7: Save  results
+
+    results_dir = os.path.join(os.path.dirname(__file__), "..", "results")
+    os.makedirs(results_dir, exist_ok=True)
+    save_path = os.path.join(results_dir, "arithmetic_graph.txt")
+
+    with open(save_path, "w") as f:
+        f.write("--- ARITHMETIC CODING (GRAPH) ---\n")
+        f.write(f"Sequence length: {total}\n")
+        f.write(f"Symbol 0: p={p0:.4f}\n")
+        f.write(f"Symbol 1: p={p1:.4f}\n\n")
+        f.write(f"Entropy of source: {H:.4f} bits/symbol\n\n")
+        f.write("Symbol intervals (analogous to Huffman codes):\n")
+        for sym, (cum, freq) in intervals.items():
+            f.write(f"  Symbol {sym}: [{cum / total_freq:.6f}, {(cum + freq) / total_freq:.6f})\n")
+        f.write(f"\nEncoded length: {encoded_bits} bits ({encoded_bytes} bytes)\n")
+        f.write(f"Average code length per bit: {avg_code_len:.4f} bits/symbol\n")
+        f.write(f"Compression efficiency: {efficiency:.2f}%\n")
+        f.write(f"Original bit length: {total} bits\n")
+        f.write(f"Decoded sequence equals original? {is_lossless}\n")
+
+    print(f"\nResults saved to: {os.path.abspath(save_path)}")
+
+    inst.done()
@@ -0,0 +1,101 @@
+#  THIS SCRIPT
+#  - Benchmarks one-pass adaptive Huffman (adaptive_huffman.py) against the
+#    two-pass path (count -> code lengths -> canonical codes -> encode)
+#  - Per-symbol encode latency (median / p99), delay until the first output
+#    byte, encode / decode throughput and compressed size, for plain and
+#    blocked alphabets
+#  - The two-pass path cannot emit anything before it has seen the whole input,
+#    so its first byte waits for the counting and codebook build
+
+import time
+
+import numpy as np
+
+from bitcodecs.adaptive_huffman import AdaptiveHuffmanEncoder, decode_adaptive
+from bitcodecs.bitio import BitWriter
+from bitcodecs.block_symbols import to_block_symbols, block_counts
+from bitcodecs.canonical_huffman import canonical_codes
+from bitcodecs.huffman_decoder import HuffmanDecoder
+from bitcodecs.huffman_tree import code_lengths
+
+
+# CONFIGURATION
+
+n_bits = 1 << 18
+probs = [0.1, 0.3]
+block_sizes = [1, 4, 8]
+
+
+def adaptive_run(symbols, k):
+    encoder = AdaptiveHuffmanEncoder(1 << k)
+    latencies = np.empty(len(symbols), dtype=np.int64)
+    chunks = []
+    first_byte = None
+    start = time.perf_counter_ns()
+    for i, s in enumerate(symbols):
+        t = time.perf_counter_ns()
+        out = encoder.encode(s)
+        latencies[i] = time.perf_counter_ns() - t
+        if out and first_byte is None:
+            first_byte = time.perf_counter_ns() - start
+        chunks.append(out)
+    payload = b"".join(chunks) + encoder.finish()
+    encode_time = (time.perf_counter_ns() - start) / 1e9
+
+    start = time.perf_counter()
+    decoded = decode_adaptive(payload, len(symbols), 1 << k)
+    decode_time = time.perf_counter() - start
+    if decoded != symbols:
+        raise RuntimeError(f"Adaptive round trip failed for k={k}")
+    return latencies, first_byte, encode_time, decode_time, len(payload)
+
+
+def two_pass_run(symbols, k):
+    start = time.perf_counter_ns()
+    counts = block_counts(np.array(symbols, dtype=np.int64), k)
+    codebook = canonical_codes(code_lengths({s: int(c) for s, c in enumerate(counts) if c > 0}))
+    words = {s: (int(c, 2), len(c)) for s, c in codebook.items()}
+    out = BitWriter()
+    latencies = np.empty(len(symbols), dtype=np.int64)
+    first_byte = None
+    for i, s in enumerate(symbols):
+        t = time.perf_counter_ns()
+        out.write(*words[s])
+        latencies[i] = time.perf_counter_ns() - t
+        if first_byte is None and out.bit_length() >= 8:
+            first_byte = time.perf_counter_ns() - start
+    payload = out.getvalue()
+    encode_time = (time.perf_counter_ns() - start) / 1e9
+
+    start = time.perf_counter()
+    decoded = HuffmanDecoder(codebook).decode(payload, len(symbols))
+    decode_time = time.perf_counter() - start
+    if list(decoded) != symbols:
+        raise RuntimeError(f"Two-pass round trip failed for k={k}")
+    # The code lengths have to travel with the data: one byte per symbol
+    return latencies, first_byte, encode_time, decode_time, len(payload) + (1 << k)
+
+
+if __name__ == "__main__":
+
+    # Step 1: Bernoulli inputs
+
+    rng = np.random.default_rng(42)
+
+    print("\n--- ADAPTIVE vs TWO-PASS HUFFMAN ---")
+    print(f"{'p':>4} {'k':>2} {'method':>9} {'bits/bit':>8} {'med ns':>7} {'p99 ns':>7} "
+          f"{'1st byte ms':>11} {'enc Mb/s':>8} {'dec Mb/s':>8}")
+
+
+    # Step 2: Both paths on every input and block size
+
+    for p in probs:
+        bits = (rng.random(n_bits) < p).astype(np.uint8)
+        for k in block_sizes:
+            symbols = to_block_symbols(bits[:len(bits) - len(bits) % k], k).tolist()
+            for name, run in (("adaptive", adaptive_run), ("two-pass", two_pass_run)):
+                latencies, first_byte, enc_time, dec_time, size = run(symbols, k)
+                first_ms = first_byte / 1e6 if first_byte is not None else float("nan")
+                print(f"{p:>4} {k:>2} {name:>9} {8 * size / n_bits:>8.4f} "
+                      f"{np.median(latencies):>7.0f} {np.percentile(latencies, 99):>7.0f} "
+                      f"{first_ms:>11.3f} {n_bits / enc_time / 1e6:>8.2f} {n_bits / dec_time / 1e6:>8.2f}")
@@ -0,0 +1,149 @@
+#  THIS SCRIPT
+#  - Benchmarks the codebook cache (codebook_cache.py) the way a long-running
+#    service uses it: many frames whose bits come from the same few sources
+#  - Model construction per frame (code lengths, canonical codes and decode
+#    table for Huffman; frequency table and intervals for arithmetic) without
+#    a cache, with a cold cache and with one warm-started from its saved file
+#  - Reports hit rate, evictions and the size cost of coding with the
+#    cached model instead of the frame's own (Huffman code lengths, and the
+#    ideal arithmetic code length under the frequency table), including
+#    skewed sources where coarse quantization would cost the most
+#  - A few frames go through the full encode / decode round trip as a check
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bitcodecs.block_symbols import to_block_symbols, block_counts
+from bitcodecs.codebook_cache import CodebookCache, HuffmanTables
+from bitcodecs.range_coder import build_intervals
+from bitcodecs.stream_codecs import (huffman_code_lengths, bit_frequencies,
+                                     encode_huffman_frame, decode_huffman_frame,
+                                     encode_arithmetic_frame, decode_arithmetic_frame)
+
+
+# CONFIGURATION
+
+frame_bits = 1 << 16
+frames = 60
+sources = [0.001, 0.01, 0.1, 0.3, 0.5]
+block_sizes = [1, 4, 8]
+checked_frames = 3
+
+
+def huffman_models(all_counts, k, cache):
+    # Encoder side (counts -> tables) and decoder side (header lengths -> tables)
+    lengths = []
+    start = time.perf_counter()
+    for counts in all_counts:
+        if cache is None:
+            lens = huffman_code_lengths(counts, k)
+            HuffmanTables(lens, k)
+            HuffmanTables(lens, k)
+        else:
+            lens = cache.huffman_lengths(counts, k)
+            cache.huffman_tables(lens, k)
+            cache.huffman_tables(lens, k)
+        lengths.append(lens)
+    elapsed = time.perf_counter() - start
+    coded = sum(sum(int(c[s]) * l for s, l in lens.items()) for c, lens in zip(all_counts, lengths))
+    return elapsed, coded
+
+
+def arithmetic_models(all_bits, cache):
+    tables = []
+    start = time.perf_counter()
+    for bits in all_bits:
+        if cache is None:
+            freqs = bit_frequencies(bits)
+            build_intervals(freqs)
+            build_intervals(freqs)
+        else:
+            ones = int(np.count_nonzero(bits))
+            freqs = cache.arithmetic_freqs([len(bits) - ones, ones])
+            cache.arithmetic_intervals(freqs)
+            cache.arithmetic_intervals(freqs)
+        tables.append(freqs)
+    elapsed = time.perf_counter() - start
+
+    # Ideal code length of every frame under the table it is coded with
+    coded = 0.0
+    for bits, freqs in zip(all_bits, tables):
+        ones = int(np.count_nonzero(bits))
+        total = sum(freqs.values())
+        for s, n in ((0, len(bits) - ones), (1, ones)):
+            if n:
+                coded -= n * np.log2(freqs[s] / total)
+    return elapsed, coded
+
+
+def round_trip(all_bits, k, cache):
+    for bits in all_bits[:checked_frames]:
+        payload = encode_huffman_frame(bits, k, cache=cache)
+        if not np.array_equal(decode_huffman_frame(payload, len(bits), k, cache=cache), bits):
+            raise RuntimeError(f"Huffman round trip failed for k={k}")
+        payload = encode_arithmetic_frame(bits, cache=cache)
+        if not np.array_equal(decode_arithmetic_frame(payload, len(bits), cache=cache), bits):
+            raise RuntimeError("Arithmetic round trip failed")
+
+
+if __name__ == "__main__":
+
+    # Step 1: Frames drawn from a few recurring sources
+
+    rng = np.random.default_rng(42)
+    all_bits = [(rng.random(frame_bits) < sources[i % len(sources)]).astype(np.uint8)
+                for i in range(frames)]
+    warm_path = os.path.join(tempfile.mkdtemp(), "codebook_cache.json")
+
+    print("\n--- CODEBOOK CACHE BENCHMARK (model construction only) ---")
+    print(f"{frames} frames of {frame_bits} bits, sources p = {sources}")
+    print(f"{'codec':>10} {'k':>2} {'cache':>6} {'ms/frame':>8} {'size %':>7} "
+          f"{'hits':>5} {'misses':>6} {'evict':>5}")
+
+
+    # Step 2: No cache, cold cache, warm-started cache
+
+    for k in block_sizes:
+        all_counts = [block_counts(to_block_symbols(bits, k), k) for bits in all_bits]
+        base_time, base_size = huffman_models(all_counts, k, None)
+        print(f"{'huffman':>10} {k:>2} {'none':>6} {1000 * base_time / frames:>8.3f} {100.0:>7.2f}")
+
+        cold = CodebookCache()
+        cold_time, cold_size = huffman_models(all_counts, k, cold)
+        cold.save(warm_path)
+        warm = CodebookCache(path=warm_path)
+        warm_time, warm_size = huffman_models(all_counts, k, warm)
+
+        for name, t, size, cache in (("cold", cold_time, cold_size, cold), ("warm", warm_time, warm_size, warm)):
+            st = cache.stats()
+            print(f"{'huffman':>10} {k:>2} {name:>6} {1000 * t / frames:>8.3f} {100 * size / base_size:>7.2f} "
+                  f"{st['hits']:>5} {st['misses']:>6} {st['evictions']:>5}")
+        round_trip(all_bits, k, warm)
+
+    base_time, base_size = arithmetic_models(all_bits, None)
+    print(f"{'arithmetic':>10} {1:>2} {'none':>6} {1000 * base_time / frames:>8.3f} {100.0:>7.2f}")
+
+    cold = CodebookCache()
+    cold_time, cold_size = arithmetic_models(all_bits, cold)
+    cold.save(warm_path)
+    warm = CodebookCache(path=warm_path)
+    warm_time, warm_size = arithmetic_models(all_bits, warm)
+
+    for name, t, size, cache in (("cold", cold_time, cold_size, cold), ("warm", warm_time, warm_size, warm)):
+        st = cache.stats()
+        print(f"{'arithmetic':>10} {1:>2} {name:>6} {1000 * t / frames:>8.3f} {100 * size / base_size:>7.2f} "
+              f"{st['hits']:>5} {st['misses']:>6} {st['evictions']:>5}")
+
+
+    # Step 3: Encoded frame sizes per source (arithmetic, header included)
+
+    print(f"\n{'p':>6} {'no cache B':>10} {'cache B':>8} {'size %':>7}")
+    cache = CodebookCache()
+    for i, p in enumerate(sources):
+        frame = all_bits[i]
+        plain = len(encode_arithmetic_frame(frame))
+        cached = len(encode_arithmetic_frame(frame, cache=cache))
+        print(f"{p:>6} {plain:>10} {cached:>8} {100 * cached / plain:>7.2f}")
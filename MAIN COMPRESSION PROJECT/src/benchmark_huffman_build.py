@@ -0,0 +1,97 @@
+#  THIS SCRIPT
+#  - Benchmarks codebook construction for large alphabets (2^12..2^20 symbols)
+#  - Array-based two-queue construction (huffman_lengths + canonical_code_values)
+#    against the original heap of Node objects with recursive code generation
+#  - Checks that both give the same total encoded length
+
+import heapq
+import time
+
+import numpy as np
+
+from bitcodecs.canonical_huffman import canonical_code_values
+from bitcodecs.huffman_tree import huffman_lengths
+
+
+# CONFIGURATION
+
+alphabet_bits = [12, 16, 18, 20]
+legacy_max_bits = 18        # the Node-based build is skipped above this size
+repeats = 3
+
+
+# The construction every Huffman script used before huffman_tree.py
+
+class Node:
+    def __init__(self, symbol=None, prob=0):
+        self.symbol = symbol
+        self.prob = prob
+        self.left = None
+        self.right = None
+
+    def __lt__(self, other):
+        return self.prob < other.prob
+
+
+def legacy_build(counts):
+    heap = [Node(sym, c) for sym, c in enumerate(counts)]
+    heapq.heapify(heap)
+    while len(heap) > 1:
+        left = heapq.heappop(heap)
+        right = heapq.heappop(heap)
+        new_node = Node(prob=left.prob + right.prob)
+        new_node.left, new_node.right = left, right
+        heapq.heappush(heap, new_node)
+
+    codebook = {}
+
+    def walk(node, prefix):
+        if node.symbol is not None:
+            codebook[node.symbol] = prefix
+        else:
+            walk(node.left, prefix + "0")
+            walk(node.right, prefix + "1")
+
+    walk(heap[0], "")
+    return codebook
+
+
+def array_build(counts):
+    lengths = huffman_lengths(counts)
+    return lengths, canonical_code_values(lengths)
+
+
+def best_time(fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+
+    # Step 1: Skewed integer counts (geometric), like large-block symbol counts
+
+    rng = np.random.default_rng(42)
+
+    print("\n--- HUFFMAN CODEBOOK CONSTRUCTION BENCHMARK ---")
+    print(f"{'symbols':>8} {'max len':>7} {'legacy s':>9} {'array s':>8} {'speedup':>8}")
+
+
+    # Step 2: Time both constructions for every alphabet size
+
+    for k in alphabet_bits:
+        counts = rng.geometric(1e-3, 1 << k)
+
+        array_time, (lengths, _) = best_time(lambda: array_build(counts))
+        if k <= legacy_max_bits:
+            legacy_time, codebook = best_time(lambda: legacy_build(counts.tolist()))
+            legacy_cost = sum(int(counts[s]) * len(code) for s, code in codebook.items())
+            if legacy_cost != int(np.dot(counts, lengths)):
+                raise RuntimeError(f"Encoded lengths differ for {1 << k} symbols")
+            print(f"{1 << k:>8} {lengths.max():>7} {legacy_time:>9.3f} {array_time:>8.3f} "
+                  f"{legacy_time / array_time:>7.1f}x")
+        else:
+            print(f"{1 << k:>8} {lengths.max():>7} {'-':>9} {array_time:>8.3f} {'-':>8}")
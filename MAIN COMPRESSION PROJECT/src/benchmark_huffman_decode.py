@@ -0,0 +1,92 @@
+#  THIS SCRIPT
+#  - Benchmarks the table-driven HuffmanDecoder against the original
+#    per-bit string-accumulation loop (temp += bit; if temp in reverse: ...)
+#  - Uses Bernoulli(p) bits grouped into blocks of several sizes
+#  - Also checks that payloads cut short by a few bytes raise ValueError
+#    instead of decoding the missing tail as zeros
+
+import random
+import time
+
+from bitcodecs.bitio import BitWriter
+from bitcodecs.huffman_decoder import HuffmanDecoder
+from bitcodecs.huffman_tree import code_lengths
+from bitcodecs.canonical_huffman import canonical_codes
+
+
+# CONFIGURATION
+
+num_bits = 1_048_560      # 2**20 rounded down to a multiple of every block size
+bern_p = 0.3
+block_sizes = [1, 2, 3, 4, 8, 12]
+repeats = 3
+truncations = [1, 2, 5]   # bytes cut off the end of the payload
+
+
+# The decode loop every Huffman script used before the table decoder
+
+def legacy_decode(encoded, codes):
+    reverse = {v: k for k, v in codes.items()}
+    decoded = []
+    temp = ""
+    for bit in encoded:
+        temp += bit
+        if temp in reverse:
+            decoded.append(reverse[temp])
+            temp = ""
+    return decoded
+
+
+def best_time(fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+
+    # Step 1: Generate the input bits
+
+    random.seed(42)
+    bits = [1 if random.random() < bern_p else 0 for _ in range(num_bits)]
+    bit_str = "".join(str(x) for x in bits)
+
+    print(f"\n--- HUFFMAN DECODE BENCHMARK ({num_bits} bits, p={bern_p}) ---")
+    print(f"{'block':>5} {'symbols':>7} {'legacy Mbit/s':>14} {'table Mbit/s':>13} {'speedup':>8}")
+
+
+    # Step 2: Time both decoders for every block size
+
+    for block_size in block_sizes:
+        blocks = [int(bit_str[i:i+block_size], 2) for i in range(0, len(bits), block_size)]
+        counts = {}
+        for b in blocks:
+            counts[b] = counts.get(b, 0) + 1
+        codes = canonical_codes(code_lengths(counts))
+
+        encoded_str = "".join(codes[b] for b in blocks)
+        writer = BitWriter()
+        for b in blocks:
+            code = codes[b]
+            writer.write(int(code, 2), len(code))
+        encoded = writer.getvalue()
+
+        legacy_time, legacy_out = best_time(lambda: legacy_decode(encoded_str, codes))
+        decoder = HuffmanDecoder(codes)
+        table_time, table_out = best_time(lambda: decoder.decode(encoded, len(blocks)))
+
+        if legacy_out != blocks or table_out.tolist() != blocks:
+            raise RuntimeError(f"Decoder mismatch for block size {block_size}")
+        for cut in truncations:
+            try:
+                decoder.decode(encoded[:-cut], len(blocks))
+            except ValueError:
+                continue
+            raise RuntimeError(f"Payload cut by {cut} bytes decoded without error (block size {block_size})")
+
+        legacy_rate = num_bits / legacy_time / 1e6
+        table_rate = num_bits / table_time / 1e6
+        print(f"{block_size:>5} {len(codes):>7} {legacy_rate:>14.2f} {table_rate:>13.2f} {legacy_time / table_time:>7.1f}x")
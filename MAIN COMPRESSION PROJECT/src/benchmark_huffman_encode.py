@@ -0,0 +1,105 @@
+#  THIS SCRIPT
+#  - Benchmarks the vectorized HuffmanEncoder against the per-symbol loops it
+#    replaces: "".join(codes[b] for b in blocks) and one BitWriter.write per block
+#  - Blocked Bernoulli(p) bits, several block sizes; MB/s of input bits
+#  - Checks that the vectorized output is byte-identical to BitWriter's
+#  - Splits the vectorized time into codeword lookup (symbols, table gathers,
+#    pair merges) and packing (cumulative sums and the word scatter), and
+#    reports the block sizes that stay under the target throughput
+
+import time
+
+import numpy as np
+
+from bitcodecs.bitio import BitWriter
+from bitcodecs.block_symbols import to_block_symbols, block_counts
+from bitcodecs.canonical_huffman import canonical_codes
+from bitcodecs.huffman_encoder import HuffmanEncoder, pack_codes
+from bitcodecs.stream_codecs import huffman_code_lengths
+
+
+# CONFIGURATION
+
+num_bits = 1 << 22
+bern_p = 0.3
+block_sizes = [1, 2, 3, 4, 8, 12]
+repeats = 3
+target_mb_s = 100           # encode throughput goal for the vectorized encoder
+
+
+def best_time(fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def join_encode(symbols, codes):
+    return "".join(codes[s] for s in symbols.tolist())
+
+
+def writer_encode(symbols, words):
+    writer = BitWriter()
+    for s in symbols.tolist():
+        writer.write(*words[s])
+    return writer.getvalue()
+
+
+if __name__ == "__main__":
+
+    # Step 1: Generate the input bits
+
+    rng = np.random.default_rng(42)
+    bits = (rng.random(num_bits) < bern_p).astype(np.uint8)
+    mb = num_bits / 8 / 1e6
+
+    print(f"\n--- HUFFMAN ENCODE BENCHMARK ({num_bits} bits, p={bern_p}) ---")
+    print(f"{'block':>5} {'join MB/s':>10} {'writer MB/s':>12} {'vector MB/s':>12} {'speedup':>8} "
+          f"{'lookup ms':>10} {'pack ms':>8}")
+    below = []
+
+
+    # Step 2: Time the three encoders for every block size
+
+    for block_size in block_sizes:
+        usable = bits[:num_bits - num_bits % block_size]
+        symbols = to_block_symbols(usable, block_size)
+        lengths = huffman_code_lengths(block_counts(symbols, block_size), block_size)
+        codes = canonical_codes(lengths)
+        words = {s: (int(c, 2), len(c)) for s, c in codes.items()}
+
+        join_time, _ = best_time(lambda: join_encode(symbols, codes))
+        writer_time, expected = best_time(lambda: writer_encode(symbols, words))
+        encoder = HuffmanEncoder(lengths, block_size)
+        vector_time, (encoded, _) = best_time(lambda: encoder.encode(usable))
+
+        if encoded != expected:
+            raise RuntimeError(f"Vectorized encoder output differs for block size {block_size}")
+
+        # Where the vectorized time goes (a fixed-length code skips both stages)
+        lookup_time = pack_time = 0.0
+        items = 0
+        if not encoder.identity:
+            lookup_time, (aligned, code_lengths) = best_time(lambda: encoder.codewords(usable))
+            pack_time, _ = best_time(lambda: pack_codes(aligned, code_lengths))
+            items = len(aligned)
+        if mb / vector_time < target_mb_s:
+            below.append((block_size, mb / vector_time, items, lookup_time, pack_time))
+
+        print(f"{block_size:>5} {mb / join_time:>10.2f} {mb / writer_time:>12.2f} {mb / vector_time:>12.2f} "
+              f"{writer_time / vector_time:>7.1f}x {1e3 * lookup_time:>10.2f} {1e3 * pack_time:>8.2f}")
+
+
+    # Step 3: Report the block sizes below the target
+
+    print(f"\nTarget: {target_mb_s} MB/s")
+    for block_size, speed, items, lookup_time, pack_time in below:
+        print(f"  k={block_size}: {speed:.1f} MB/s, {items} packed items; lookup {1e3 * lookup_time:.2f} ms, "
+              f"pack {1e3 * pack_time:.2f} ms")
+    if below:
+        print("  Limit: lookup and packing are each about a dozen full NumPy passes (gathers, shifts,")
+        print("  cumulative sums) over the packed items, so the time follows the item count. An item holds")
+        print("  at most 64 bits of codewords, and block sizes that do not divide 16 also read their symbols")
+        print("  at odd bit offsets; those are the cases that stay below the target.")
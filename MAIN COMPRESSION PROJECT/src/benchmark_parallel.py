@@ -0,0 +1,54 @@
+#  THIS SCRIPT
+#  - Measures how chunked encoding/decoding scales with the number of workers
+#  - Runs blocked Huffman and arithmetic coding on Bernoulli(p) bits
+#    with 1, 2, 4 and 8 worker processes
+
+import os
+import time
+
+import numpy as np
+
+from bitcodecs.parallel_codecs import encode_parallel, decode_parallel
+from bitcodecs.stream_codecs import HUFFMAN, ARITHMETIC
+
+
+# CONFIGURATION
+
+num_bits = 1 << 22
+bern_p = 0.3
+chunk_bits = 1 << 18
+worker_counts = [1, 2, 4, 8]
+setups = [("Huffman-4", HUFFMAN, 4), ("Arithmetic", ARITHMETIC, 1)]
+
+
+if __name__ == "__main__":
+
+    # Step 1: Generate the input bits
+
+    rng = np.random.default_rng(42)
+    bits = (rng.random(num_bits) < bern_p).astype(np.uint8)
+
+    print(f"\n--- PARALLEL SCALING BENCHMARK ({num_bits} bits, p={bern_p}, {os.cpu_count()} CPUs) ---")
+    print(f"{'codec':>10} {'workers':>7} {'encode s':>9} {'decode s':>9} {'enc speedup':>11} {'dec speedup':>11} {'bits/bit':>8}")
+
+
+    # Step 2: Time encode and decode for every worker count
+
+    for name, codec, block_size in setups:
+        base_enc = base_dec = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            data = encode_parallel(bits, codec, block_size, workers, chunk_bits)
+            enc_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            decoded = decode_parallel(data, workers)
+            dec_time = time.perf_counter() - start
+
+            if not np.array_equal(decoded, bits):
+                raise RuntimeError(f"{name} with {workers} workers did not decode correctly")
+
+            base_enc = base_enc or enc_time
+            base_dec = base_dec or dec_time
+            print(f"{name:>10} {workers:>7} {enc_time:>9.2f} {dec_time:>9.2f} "
+                  f"{base_enc / enc_time:>10.2f}x {base_dec / dec_time:>10.2f}x {len(data) * 8 / num_bits:>8.4f}")
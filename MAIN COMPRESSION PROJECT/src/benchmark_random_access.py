@@ -0,0 +1,63 @@
+#  THIS SCRIPT
+#  - Benchmarks the random-access container (bitcodecs/random_access.py)
+#  - Full decode + compare (what the codec scripts do for their lossless
+#    check) against a CRC-only verify, and against decoding short ranges at
+#    random positions with decode_range()
+#  - Size overhead of the sync points and index for a few segment sizes
+
+import time
+
+import numpy as np
+
+from bitcodecs.random_access import encode_container, RandomAccessReader
+from bitcodecs.stream_codecs import HUFFMAN, ARITHMETIC
+
+
+# CONFIGURATION
+
+num_bits = 1 << 20
+bern_p = 0.3
+segment_sizes = [1024, 4096, 16384]
+range_bits = 1000
+range_queries = 20
+setups = [("Huffman-4", HUFFMAN, 4), ("Arithmetic", ARITHMETIC, 1)]
+
+
+if __name__ == "__main__":
+
+    # Step 1: Input bits
+
+    rng = np.random.default_rng(42)
+    bits = (rng.random(num_bits) < bern_p).astype(np.uint8)
+    starts = rng.integers(0, num_bits - range_bits, range_queries)
+
+    print(f"\n--- RANDOM-ACCESS CONTAINER ({num_bits} bits, p={bern_p}) ---")
+    print(f"{'codec':>10} {'segment':>7} {'bits/bit':>8} {'full decode s':>13} {'verify ms':>9} "
+          f"{'range ms':>8}")
+
+
+    # Step 2: Whole-stream check vs CRC verify vs short ranges
+
+    for name, codec, block_size in setups:
+        for segment_symbols in segment_sizes:
+            data = encode_container(bits, codec, block_size, segment_symbols)
+            reader = RandomAccessReader(data)
+
+            start = time.perf_counter()
+            if not np.array_equal(reader.decode_all(), bits):
+                raise RuntimeError(f"{name} container did not decode correctly")
+            full_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if reader.verify():
+                raise RuntimeError(f"{name} container failed its CRC check")
+            verify_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for s in starts.tolist():
+                if not np.array_equal(reader.decode_range(s, range_bits), bits[s:s + range_bits]):
+                    raise RuntimeError(f"{name} range {s}+{range_bits} decoded wrongly")
+            range_time = (time.perf_counter() - start) / range_queries
+
+            print(f"{name:>10} {segment_symbols:>7} {8 * len(data) / num_bits:>8.4f} {full_time:>13.3f} "
+                  f"{1000 * verify_time:>9.3f} {1000 * range_time:>8.3f}")
@@ -0,0 +1,133 @@
+#  THIS SCRIPT
+#  - Load generator for bitcodecs/compression_server.py, entirely local
+#  - Opens several connections that each keep a few requests in flight; every
+#    request encodes a block of Bernoulli bits on the server and decodes the
+#    returned frame again, and the round trip is checked
+#  - Reports throughput and client-side latency percentiles, then the
+#    server's own per-request percentiles and batch sizes
+#  - --spawn starts (and stops) a server itself on a private Unix socket
+#
+#  Usage:
+#    python benchmark_server_load.py --spawn
+#    python benchmark_server_load.py --spawn --max-batch 1     (batching off, for comparison)
+#    python benchmark_server_load.py --port 8765 --codec arithmetic
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bitcodecs.compression_server import CompressionClient, percentiles
+
+
+# CONFIGURATION
+
+connections = 8
+in_flight = 4               # requests pipelined per connection
+requests = 400              # encode + decode round trips in total
+request_bits = 8192
+bern_p = 0.3
+
+
+async def client_worker(client, jobs, latencies, codec, block_size):
+    while jobs:
+        bits = jobs.pop()
+        start = time.perf_counter()
+        payload = await client.encode(bits, codec, block_size)
+        middle = time.perf_counter()
+        decoded = await client.decode(payload, len(bits), codec, block_size)
+        end = time.perf_counter()
+        if not np.array_equal(decoded, bits):
+            raise RuntimeError("Server round trip returned different bits")
+        latencies["encode"].append(middle - start)
+        latencies["decode"].append(end - middle)
+
+
+async def run_load(args):
+    rng = np.random.default_rng(42)
+    jobs = [(rng.random(args.bits) < bern_p).astype(np.uint8) for _ in range(args.requests)]
+    latencies = {"encode": [], "decode": []}
+
+    clients = [await CompressionClient.connect(args.host, args.port, args.unix) for _ in range(args.connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*[client_worker(client, jobs, latencies, args.codec, args.block_size)
+                           for client in clients for _ in range(args.in_flight)])
+    elapsed = time.perf_counter() - start
+    server_stats = await clients[0].stats()
+    for client in clients:
+        await client.close()
+    return elapsed, latencies, server_stats
+
+
+async def wait_for_server(args, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            client = await CompressionClient.connect(args.host, args.port, args.unix)
+            await client.close()
+            return
+        except (ConnectionError, FileNotFoundError):
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for bitcodecs.compression_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix")
+    parser.add_argument("--spawn", action="store_true", help="start a server for the run")
+    parser.add_argument("--max-batch", type=int, help="batch limit of the spawned server (1 = no batching)")
+    parser.add_argument("--codec", choices=["huffman", "arithmetic"], default="huffman")
+    parser.add_argument("--block-size", type=int, default=4)
+    parser.add_argument("--connections", type=int, default=connections)
+    parser.add_argument("--in-flight", type=int, default=in_flight)
+    parser.add_argument("--requests", type=int, default=requests)
+    parser.add_argument("--bits", type=int, default=request_bits)
+    args = parser.parse_args()
+
+
+    # Step 1: Server (spawned on a private socket, or an existing one)
+
+    server = None
+    if args.spawn:
+        args.unix = args.unix or os.path.join(tempfile.mkdtemp(), "bitcodecs.sock")
+        here = os.path.dirname(os.path.abspath(__file__))
+        command = [sys.executable, "-m", "bitcodecs.compression_server", "--unix", args.unix]
+        if args.max_batch:
+            command += ["--max-batch", str(args.max_batch)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL, cwd=here)
+    try:
+        asyncio.run(wait_for_server(args))
+
+
+        # Step 2: Load
+
+        elapsed, latencies, server_stats = asyncio.run(run_load(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+    # Step 3: Report
+
+    k = args.block_size if args.codec == "huffman" else 1
+    round_trips = len(latencies["encode"])
+    print(f"\n--- SERVER LOAD ({args.codec}, k={k}, {args.connections} connections x {args.in_flight} in flight) ---")
+    print(f"{round_trips} round trips of {args.bits} bits in {elapsed:.2f} s: "
+          f"{2 * round_trips / elapsed:.0f} requests/s, {round_trips * args.bits / elapsed / 1e6:.2f} Mbit/s")
+    print(f"{'':>14} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for op in ("encode", "decode"):
+        p = percentiles(latencies[op])
+        print(f"{'client ' + op:>14} {p['p50_ms']:>8.2f} {p['p90_ms']:>8.2f} {p['p99_ms']:>8.2f}")
+    for name, p in server_stats["latency"].items():
+        if p["count"]:
+            print(f"{'server ' + name.split()[0]:>14} {p['p50_ms']:>8.2f} {p['p90_ms']:>8.2f} {p['p99_ms']:>8.2f}")
+    print(f"Server batches: {server_stats['batches']}, mean batch size {server_stats['mean_batch']:.1f}")
@@ -0,0 +1,207 @@
+#  THIS SCRIPT
+#  - Benchmarks plain Huffman, blocked Huffman (k=2..N and, on request, large
+#    block sizes), arithmetic coding, run-length + Golomb-Rice and rANS
+#    (k=1 and k=N) coding on generated Bernoulli(p) inputs of several sizes
+#  - Records encode/decode MB/s (of input bits), compressed bits per input bit
+#    (and, separately, how many of those bits are stream / frame / model headers)
+#    and the peak memory of every entry on its own: traced allocations
+#    (tracemalloc, reset per entry) and the peak RSS of a fresh process that
+#    runs only that entry (interpreter and imports included)
+#  - Writes everything to JSON and can compare a run against a stored baseline
+#    (speed, size and memory)
+#
+#  Usage:
+#    python benchmark_suite.py --sizes 1e3 1e4 1e5 --probs 0.1 0.3 --max-block 4
+#    python benchmark_suite.py --large-blocks 16 20
+#    python benchmark_suite.py --baseline ../results/benchmark_baseline.json --threshold 0.15
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from bitcodecs.stream_codecs import HuffmanStream, ArithmeticStream, RiceStream, RansStream, header_bits
+
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(base_dir, "results", "benchmark.json")
+MEMORY_SLACK_MB = 1.0       # memory growth below this is never a regression (allocator noise)
+
+
+# Step 1: One measurement
+
+def make_codecs(max_block, large_blocks=()):
+    codecs = [("huffman", 1, lambda: HuffmanStream(1))]
+    # Large block sizes: alphabets of 2**16 and up, length-limited codebooks
+    for k in sorted(set(range(2, max_block + 1)) | set(large_blocks)):
+        codecs.append(("huffman-blocked", k, lambda k=k: HuffmanStream(k)))
+    codecs.append(("arithmetic", 1, ArithmeticStream))
+    codecs.append(("rice", 1, RiceStream))
+    for k in sorted({1, max_block}):
+        codecs.append(("rans", k, lambda k=k: RansStream(k)))
+    return codecs
+
+
+def run_codec(make_codec, raw, n_bits):
+    codec = make_codec()
+    encoded = io.BytesIO()
+    start = time.perf_counter()
+    codec.encode(io.BytesIO(raw), encoded, n_bits)
+    enc_time = time.perf_counter() - start
+
+    decoded = io.BytesIO()
+    start = time.perf_counter()
+    codec.decode(io.BytesIO(encoded.getvalue()), decoded)
+    dec_time = time.perf_counter() - start
+
+    if decoded.getvalue() != raw:
+        raise RuntimeError("Decoded output differs from the input")
+    return enc_time, dec_time, len(encoded.getvalue()), header_bits(encoded.getvalue())
+
+
+def peak_traced_memory(make_codec, raw, n_bits):
+    # Separate run: tracemalloc slows everything down, so it is not timed
+    tracemalloc.start()
+    run_codec(make_codec, raw, n_bits)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def peak_rss_kb():
+    # Linux: VmHWM belongs to this process image only; ru_maxrss would also
+    # count the parent's size at the time this process was started
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def rss_entry(name, block_size, raw, n_bits):
+    # Runs in a fresh process: its peak RSS after the codec run
+    make_codec = {(n, k): m for n, k, m in make_codecs(block_size)}[(name, block_size)]
+    run_codec(make_codec, raw, n_bits)
+    return peak_rss_kb()
+
+
+def peak_rss_memory(name, block_size, raw, n_bits):
+    # Separate, untimed run in a new interpreter, so earlier entries do not
+    # leave their peak behind (ru_maxrss only ever grows within a process)
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(rss_entry, (name, block_size, raw, n_bits))
+
+
+def benchmark(sizes, probs, max_block, seed=42, trace_memory=True, large_blocks=()):
+    results = []
+    for n_bits in sizes:
+        for p in probs:
+            rng = np.random.default_rng(seed)
+            bits = (rng.random(n_bits) < p).astype(np.uint8)
+            raw = np.packbits(bits).tobytes()
+            mb = n_bits / 8 / 1e6
+
+            for name, block_size, make_codec in make_codecs(max_block, large_blocks):
+                enc_time, dec_time, size, header = run_codec(make_codec, raw, n_bits)
+                entry = {
+                    "codec": name,
+                    "block_size": block_size,
+                    "n_bits": n_bits,
+                    "p": p,
+                    "encode_mb_s": mb / enc_time,
+                    "decode_mb_s": mb / dec_time,
+                    "bits_per_symbol": size * 8 / n_bits,
+                    "header_bits": header,
+                }
+                if trace_memory:
+                    entry["peak_traced_mb"] = peak_traced_memory(make_codec, raw, n_bits) / 1e6
+                    entry["peak_rss_mb"] = peak_rss_memory(name, block_size, raw, n_bits) / 1024
+                results.append(entry)
+                print(f"{name:>16} k={block_size:<2} n={n_bits:<10} p={p:<5} "
+                      f"enc {entry['encode_mb_s']:8.3f} MB/s  dec {entry['decode_mb_s']:8.3f} MB/s  "
+                      f"{entry['bits_per_symbol']:.4f} bits/bit (headers {header / n_bits:.4f})"
+                      + (f"  traced {entry['peak_traced_mb']:7.2f} MB  rss {entry['peak_rss_mb']:7.2f} MB" if trace_memory else ""))
+    return results
+
+
+# Step 2: Baseline comparison
+
+def result_key(entry):
+    return (entry["codec"], entry["block_size"], entry["n_bits"], entry["p"])
+
+
+def find_regressions(results, baseline, threshold):
+    # Slower by more than `threshold` (fraction), compressing worse by more than
+    # it, or using more than that much more memory (plus MEMORY_SLACK_MB)
+    old = {result_key(e): e for e in baseline["results"]}
+    regressions = []
+    for entry in results:
+        ref = old.get(result_key(entry))
+        if ref is None:
+            continue
+        for metric in ("encode_mb_s", "decode_mb_s"):
+            if entry[metric] < ref[metric] * (1 - threshold):
+                regressions.append((result_key(entry), metric, ref[metric], entry[metric]))
+        if entry["bits_per_symbol"] > ref["bits_per_symbol"] * (1 + threshold):
+            regressions.append((result_key(entry), "bits_per_symbol", ref["bits_per_symbol"], entry["bits_per_symbol"]))
+        for metric in ("peak_traced_mb", "peak_rss_mb"):
+            if metric in entry and metric in ref and entry[metric] > ref[metric] * (1 + threshold) + MEMORY_SLACK_MB:
+                regressions.append((result_key(entry), metric, ref[metric], entry[metric]))
+    return regressions
+
+
+# Step 3: Command line
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Codec throughput / memory benchmark")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6])
+    parser.add_argument("--probs", type=float, nargs="+", default=[0.01, 0.05, 0.3, 0.5])
+    parser.add_argument("--max-block", type=int, default=4)
+    parser.add_argument("--large-blocks", type=int, nargs="*", default=[],
+                        help="blocked Huffman sizes run on top of 2..max-block (off by default: "
+                             "below ~1e7 bits their code lengths dominate the output)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-trace", action="store_true", help="skip the memory runs (tracemalloc and fresh-process RSS)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    sizes = [int(n) for n in args.sizes]
+    results = benchmark(sizes, args.probs, args.max_block, args.seed, not args.no_trace, args.large_blocks)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {os.path.abspath(args.output)}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for key, metric, before, after in regressions:
+            print(f"REGRESSION {key}: {metric} {before:.4f} -> {after:.4f}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
@@ -0,0 +1,62 @@
+#  bitcodecs: the codec modules, and one import point for all of them
+#  - The modules live in this package and import each other relatively; the
+#    scripts in src/ import them as bitcodecs.<module> (the modules with a
+#    command line run as `python -m bitcodecs.<module>` from src/)
+#  - Nothing is imported up front; every name loads its module on first use,
+#    so `import bitcodecs` is close to free and a long-lived process only pays
+#    for the codecs it actually calls
+#  - networkx / matplotlib are only pulled in by the graph and plot helpers
+#
+#  Usage:
+#    import bitcodecs
+#    payload = bitcodecs.encode_huffman_frame(bits, 3)
+#    bits = bitcodecs.decode_huffman_frame(payload, len(bits), 3)
+
+import importlib
+
+
+_EXPORTS = {
+    "bitio": ["BitWriter", "BitReader"],
+    "entropy": ["entropy"],
+    "huffman_tree": ["huffman_lengths", "code_lengths"],
+    "canonical_huffman": ["package_merge", "canonical_codes", "canonical_code_values",
+                          "write_code_lengths", "read_code_lengths"],
+    "huffman_decoder": ["HuffmanDecoder"],
+    "huffman_encoder": ["HuffmanEncoder", "pack_codes"],
+    "range_coder": ["quantize_counts", "build_intervals", "RangeEncoder", "RangeDecoder",
+                    "encode_sequence", "decode_sequence"],
+    "block_symbols": ["to_block_symbols", "packed_fields", "from_block_symbols", "block_counts", "block_label"],
+    "block_stats": ["BlockStats"],
+    "bit_dataset": ["save_bits", "PackedBitWriter", "load_bits", "load_dataset", "read_header", "open_packed",
+                    "load_packed", "iter_packed", "iter_bits", "dataset_path", "load_packed_dataset"],
+    "stream_codecs": ["HuffmanStream", "ArithmeticStream", "RiceStream", "RansStream", "AdaptiveHuffmanStream",
+                      "encode_huffman_frame", "decode_huffman_frame",
+                      "encode_arithmetic_frame", "decode_arithmetic_frame"],
+    "golomb_rice": ["run_lengths", "rice_parameter", "encode_rice", "decode_rice"],
+    "adaptive_huffman": ["AdaptiveHuffmanEncoder", "AdaptiveHuffmanDecoder", "encode_adaptive", "decode_adaptive",
+                         "encode_adaptive_frame", "decode_adaptive_frame"],
+    "rans": ["frequency_table", "encode_rans", "decode_rans", "encode_rans_frame", "decode_rans_frame"],
+    "context_coder": ["ContextModel", "ContextEncoder", "encode_context", "decode_context"],
+    "random_access": ["encode_container", "decode_container", "RandomAccessReader"],
+    "codebook_cache": ["CodebookCache", "quantize_distribution"],
+    "parallel_codecs": ["encode_parallel", "decode_parallel"],
+    "compression_server": ["CompressionServer", "CompressionClient"],
+    "instrument": ["Instrument"],
+    "results_store": ["ResultsStore", "data_hash", "packed_data_hash"],
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module 'bitcodecs' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,199 @@
+#  One-pass adaptive Huffman coding (FGK)
+#  - The tree is updated after every symbol, identically on both sides, so no
+#    codebook is ever transmitted and every symbol is coded as soon as it arrives
+#  - A symbol seen for the first time is sent as the code of the NYT
+#    ("not yet transmitted") leaf followed by its index in fixed-width bits;
+#    the last unseen symbol takes over the NYT leaf, so a full alphabet pays
+#    nothing for it (a 2-symbol alphabet ends at exactly 1 bit per symbol)
+#  - Nodes live in flat lists indexed by their sibling-property number (root is
+#    the highest); weights never decrease with the number, so the leader of a
+#    weight block is found with a bisect instead of a scan
+#  - Works for bits (alphabet 2) and for k-bit blocks (alphabet 2**k)
+
+from bisect import bisect_right
+
+import numpy as np
+
+from .block_symbols import to_block_symbols, from_block_symbols
+
+
+class AdaptiveHuffmanModel:
+    def __init__(self, alphabet_size):
+        self.alphabet_size = alphabet_size
+        self.fixed_bits = max(1, (alphabet_size - 1).bit_length())
+        size = 2 * alphabet_size + 1
+        self.root = size - 1
+        self.weight = [0] * size
+        self.parent = [-1] * size
+        self.left = [-1] * size           # -1 for leaves
+        self.right = [-1] * size
+        self.symbol = [-1] * size         # -1 for internal nodes and NYT
+        self.leaf = [-1] * alphabet_size  # symbol -> node number, -1 if not seen
+        self.nyt = self.root              # -1 once every symbol has been seen
+        self.unseen = alphabet_size
+
+    # Step 1: Codes
+
+    def path(self, node):
+        # (code, length) of the path root -> node
+        code = length = 0
+        while node != self.root:
+            up = self.parent[node]
+            code |= (self.right[up] == node) << length
+            length += 1
+            node = up
+        return code, length
+
+    def code(self, sym):
+        node = self.leaf[sym]
+        if node >= 0:
+            return self.path(node)
+        code, length = self.path(self.nyt)
+        return (code << self.fixed_bits) | sym, length + self.fixed_bits
+
+    # Step 2: Tree update (FGK)
+
+    def _swap(self, a, b):
+        # Exchange the subtrees at numbers a and b (their parents stay put)
+        for arr in (self.symbol, self.left, self.right):
+            arr[a], arr[b] = arr[b], arr[a]
+        for node in (a, b):
+            if self.left[node] >= 0:
+                self.parent[self.left[node]] = node
+                self.parent[self.right[node]] = node
+            else:
+                self.leaf[self.symbol[node]] = node
+
+    def update(self, sym):
+        q = self.leaf[sym]
+        if q < 0 and self.unseen == 1:
+            q, self.nyt = self.nyt, -1
+            self.symbol[q] = sym
+            self.leaf[sym] = q
+        elif q < 0:
+            # The NYT leaf becomes an internal node with a new NYT and the new leaf
+            self.unseen -= 1
+            old = self.nyt
+            self.nyt, q = old - 2, old - 1
+            self.left[old], self.right[old] = self.nyt, q
+            self.parent[self.nyt] = self.parent[q] = old
+            self.symbol[q] = sym
+            self.leaf[sym] = q
+
+        weight, parent = self.weight, self.parent
+        while True:
+            # Move q to the top of its weight block before incrementing it
+            leader = bisect_right(weight, weight[q]) - 1
+            if leader == parent[q]:
+                # Only happens next to the NYT (sibling weight 0): the parent
+                # leads the block too, so both go up by one without a swap
+                weight[q] += 1
+                q = leader
+            elif leader != q:
+                self._swap(q, leader)
+                q = leader
+            weight[q] += 1
+            if q == self.root:
+                return
+            q = parent[q]
+
+
+# Step 3: Encoder / decoder
+
+class AdaptiveHuffmanEncoder:
+    def __init__(self, alphabet_size):
+        self.model = AdaptiveHuffmanModel(alphabet_size)
+        self.acc = 0
+        self.nbits = 0
+
+    def encode(self, sym):
+        # Returns the bytes completed by this symbol (often empty)
+        code, length = self.model.code(sym)
+        self.model.update(sym)
+        self.acc = (self.acc << length) | code
+        self.nbits += length
+        whole = self.nbits >> 3
+        if not whole:
+            return b""
+        self.nbits &= 7
+        out = (self.acc >> self.nbits).to_bytes(whole, "big")
+        self.acc &= (1 << self.nbits) - 1
+        return out
+
+    def finish(self):
+        # Last partial byte, zero-padded
+        if not self.nbits:
+            return b""
+        out = (self.acc << (8 - self.nbits)).to_bytes(1, "big")
+        self.acc = self.nbits = 0
+        return out
+
+
+class AdaptiveHuffmanDecoder:
+    def __init__(self, alphabet_size):
+        self.model = AdaptiveHuffmanModel(alphabet_size)
+        self.node = self.model.root
+        self.fixed_left = -1      # >= 0 while reading the index of a new symbol
+        self.fixed = 0
+
+    def _emit(self, sym, out):
+        out.append(sym)
+        self.model.update(sym)
+        self.node = self.model.root
+
+    def feed(self, data, limit=None):
+        # Decodes as many symbols as the bytes so far complete (at most limit);
+        # a code cut at the end of data is resumed by the next call
+        m = self.model
+        out = []
+        if self.node == m.nyt and self.fixed_left < 0:
+            self.fixed_left, self.fixed = m.fixed_bits, 0
+        for byte in data:
+            for shift in range(7, -1, -1):
+                if limit is not None and len(out) >= limit:
+                    return out
+                bit = (byte >> shift) & 1
+                if self.fixed_left >= 0:
+                    self.fixed = (self.fixed << 1) | bit
+                    self.fixed_left -= 1
+                    if self.fixed_left:
+                        continue
+                    self.fixed_left = -1
+                    self._emit(self.fixed, out)
+                else:
+                    self.node = m.right[self.node] if bit else m.left[self.node]
+                    if m.left[self.node] >= 0:
+                        continue
+                    if self.node != m.nyt:
+                        self._emit(m.symbol[self.node], out)
+                if self.node == m.nyt:
+                    self.fixed_left, self.fixed = m.fixed_bits, 0
+        return out
+
+
+def encode_adaptive(symbols, alphabet_size):
+    encoder = AdaptiveHuffmanEncoder(alphabet_size)
+    return b"".join([encoder.encode(s) for s in symbols]) + encoder.finish()
+
+
+def decode_adaptive(data, count, alphabet_size):
+    return AdaptiveHuffmanDecoder(alphabet_size).feed(data, count)
+
+
+# Step 4: Frames of bits (the model may carry over from the previous frame)
+
+def encode_adaptive_frame(bits, block_size=1, encoder=None):
+    k = block_size
+    if encoder is None:
+        encoder = AdaptiveHuffmanEncoder(1 << k)
+    bits = np.concatenate([bits, np.zeros(-len(bits) % k, dtype=np.uint8)])
+    out = [encoder.encode(s) for s in to_block_symbols(bits, k).tolist()]
+    return b"".join(out) + encoder.finish()
+
+
+def decode_adaptive_frame(payload, n_bits, block_size=1, decoder=None):
+    k = block_size
+    if decoder is None:
+        decoder = AdaptiveHuffmanDecoder(1 << k)
+    symbols = decoder.feed(payload, -(-n_bits // k))
+    return from_block_symbols(np.array(symbols, dtype=np.int64), k)[:n_bits]
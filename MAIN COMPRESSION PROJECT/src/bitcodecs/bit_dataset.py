@@ -0,0 +1,162 @@
+#  Packed binary dataset format shared by every script
+#  - <name>.bin = fixed prefix + JSON header + np.packbits payload (8 bits/byte)
+#  - The header records the bit length, the source type and its parameters
+#  - Loaders memory-map the payload, so opening a multi-GB file costs nothing
+#  - Legacy <name>.txt files (one bit per line) are still accepted
+
+import json
+import os
+import struct
+
+import numpy as np
+
+
+MAGIC = b"PBIT"
+PREFIX = struct.Struct("<4sI")     # magic, header size in bytes
+ALIGN = 8                          # payload starts on an 8-byte boundary
+CHUNK_BYTES = 1 << 20              # packed bytes per chunk for iter_packed / iter_bits
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+
+
+# Step 1: Writing
+
+def build_header(length, source, params=None):
+    meta = json.dumps({"length": int(length), "source": source, "params": params or {}}).encode()
+    size = PREFIX.size + len(meta)
+    meta += b" " * (-size % ALIGN)
+    return PREFIX.pack(MAGIC, len(meta)) + meta
+
+
+def save_bits(path, bits, source, params=None):
+    bits = np.asarray(bits, dtype=np.uint8)
+    with open(path, "wb") as f:
+        f.write(build_header(len(bits), source, params))
+        f.write(np.packbits(bits).tobytes())
+
+
+class PackedBitWriter:
+    # Streams bits into a .bin dataset chunk by chunk, so the full bit array
+    # never has to exist in memory; the total length goes in the header up front
+    def __init__(self, path, length, source, params=None):
+        self.path = path
+        self.length = length
+        self.written = 0
+        self.pending = np.zeros(0, dtype=np.uint8)
+        self.file = open(path, "wb")
+        self.file.write(build_header(length, source, params))
+
+    def write(self, bits):
+        bits = np.asarray(bits, dtype=np.uint8)
+        self.written += len(bits)
+        if len(self.pending):
+            bits = np.concatenate([self.pending, bits])
+        whole = len(bits) - len(bits) % 8
+        self.file.write(np.packbits(bits[:whole]).tobytes())
+        self.pending = bits[whole:]
+
+    def write_packed(self, data, n_bits):
+        # Already packed bits (np.packbits order); copied straight to the file
+        # when the stream is on a byte boundary, which is the usual case
+        if len(self.pending):
+            self.write(np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=n_bits))
+            return
+        whole = n_bits // 8
+        self.file.write(memoryview(data)[:whole])
+        self.written += 8 * whole
+        if n_bits % 8:
+            self.write(np.unpackbits(np.frombuffer(data, dtype=np.uint8)[whole:whole + 1], count=n_bits % 8))
+
+    def close(self):
+        if len(self.pending):
+            self.file.write(np.packbits(self.pending).tobytes())
+        self.file.close()
+        if self.written != self.length:
+            raise ValueError(f"{self.path}: header says {self.length} bits, {self.written} were written")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+
+# Step 2: Reading
+
+def read_header(path):
+    # Returns (header dict, payload offset in bytes)
+    with open(path, "rb") as f:
+        magic, meta_size = PREFIX.unpack(f.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a packed bit dataset")
+        header = json.loads(f.read(meta_size))
+    return header, PREFIX.size + meta_size
+
+
+def open_packed(path):
+    # Packed payload as a read-only memmap (no bits are read until used)
+    header, offset = read_header(path)
+    nbytes = (header["length"] + 7) // 8
+    if nbytes == 0:
+        return header, np.zeros(0, dtype=np.uint8)
+    return header, np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(nbytes,))
+
+
+def load_legacy_txt(path):
+    # Every '0'/'1' character is a bit, whatever the line layout
+    with open(path, "rb") as f:
+        raw = np.frombuffer(f.read(), dtype=np.uint8)
+    return raw[(raw == ord("0")) | (raw == ord("1"))] - ord("0")
+
+
+def load_packed(path):
+    # (packed bytes, bit count) without unpacking anything: the memmap for a
+    # .bin file, np.packbits of the bits for a legacy .txt
+    if path.endswith(".txt"):
+        bits = load_legacy_txt(path)
+        return np.packbits(bits), len(bits)
+    header, packed = open_packed(path)
+    return packed, header["length"]
+
+
+def iter_packed(path, chunk_bytes=CHUNK_BYTES):
+    # Yields (packed chunk, bits in it); only the last chunk can be short
+    packed, n_bits = load_packed(path)
+    for start in range(0, len(packed), chunk_bytes):
+        chunk = packed[start:start + chunk_bytes]
+        yield chunk, min(8 * len(chunk), n_bits - 8 * start)
+
+
+def iter_bits(path, chunk_bytes=CHUNK_BYTES):
+    # One bit per byte, at most 8 * chunk_bytes bits at a time
+    for chunk, n in iter_packed(path, chunk_bytes):
+        yield np.unpackbits(chunk, count=n)
+
+
+def load_bits(path):
+    # Legacy path: the whole dataset unpacked to one byte per bit (8x the file);
+    # use load_packed / iter_bits for anything large
+    if path.endswith(".txt"):
+        return load_legacy_txt(path)
+    header, packed = open_packed(path)
+    return np.unpackbits(packed, count=header["length"])
+
+
+def dataset_path(name, data_dir=DATA_DIR):
+    # name: "bernoulli_bits" or "graph_bits"; prefers the packed file
+    for ext in (".bin", ".txt"):
+        path = os.path.join(data_dir, name + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Missing '{name}.bin' (or legacy '{name}.txt') in data/ folder. Run data generation first!")
+
+
+def load_packed_dataset(name, data_dir=DATA_DIR):
+    return load_packed(dataset_path(name, data_dir))
+
+
+def load_dataset(name, data_dir=DATA_DIR):
+    return load_bits(dataset_path(name, data_dir))
@@ -0,0 +1,66 @@
+#  Bit-level I/O over packed byte buffers, shared by every codec
+#  - BitWriter packs codewords MSB-first into a bytearray, 64 bits at a time
+#  - BitReader reads them back through a memoryview (no copies)
+#  - Reading past the end yields zero bits, so decoders can look ahead freely
+
+
+WORD_BITS = 64
+
+
+class BitWriter:
+    def __init__(self):
+        self.buf = bytearray()
+        self.acc = 0          # pending bits, most significant first
+        self.nbits = 0        # number of pending bits in acc
+
+    def write(self, value, length):
+        self.acc = (self.acc << length) | value
+        self.nbits += length
+        while self.nbits >= WORD_BITS:
+            self.nbits -= WORD_BITS
+            self.buf += (self.acc >> self.nbits).to_bytes(8, "big")
+            self.acc &= (1 << self.nbits) - 1
+
+    def write_bit(self, bit):
+        self.write(bit, 1)
+
+    def bit_length(self):
+        return len(self.buf) * 8 + self.nbits
+
+    def getvalue(self):
+        # Pending bits are zero-padded up to the next byte boundary
+        nbytes = (self.nbits + 7) // 8
+        tail = (self.acc << (nbytes * 8 - self.nbits)).to_bytes(nbytes, "big")
+        return bytes(self.buf) + tail
+
+
+class BitReader:
+    def __init__(self, data, bit_length=None):
+        self.data = memoryview(data).cast("B")
+        self.bit_length = len(self.data) * 8 if bit_length is None else bit_length
+        self.pos = 0          # current bit position
+
+    def peek(self, n):
+        start = self.pos >> 3
+        shift = self.pos & 7
+        nbytes = (shift + n + 7) >> 3
+        chunk = self.data[start:start + nbytes]
+        value = int.from_bytes(chunk, "big") << (8 * (nbytes - len(chunk)))
+        return (value >> (nbytes * 8 - shift - n)) & ((1 << n) - 1)
+
+    def skip(self, n):
+        self.pos += n
+
+    def read(self, n):
+        value = self.peek(n)
+        self.pos += n
+        return value
+
+    def read_bit(self):
+        byte = self.pos >> 3
+        bit = (self.data[byte] >> (7 - (self.pos & 7))) & 1 if byte < len(self.data) else 0
+        self.pos += 1
+        return bit
+
+    def bits_left(self):
+        return self.bit_length - self.pos
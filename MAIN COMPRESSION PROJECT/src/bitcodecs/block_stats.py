@@ -0,0 +1,100 @@
+#  Single-pass statistics for every block size 1..K at once
+#  - One pass over the bits fills the block histograms of all block sizes
+#    (non-overlapping blocks aligned to the start of the stream, as in the
+#    blocked Huffman scripts; an incomplete last block is not counted)
+#  - Every position gets one K-bit sliding window; the k-bit block starting
+#    there is its top k bits, so all block sizes share the same window array
+#  - Ones (block size 1) are counted with popcount straight on packed bytes
+#  - update() / update_packed() can be called again as more data arrives
+
+import numpy as np
+
+from .entropy import entropy
+from .huffman_tree import huffman_lengths
+
+
+CHUNK_BITS = 1 << 22      # bits handled per window array, bounds the temporaries
+
+
+class BlockStats:
+    def __init__(self, max_block=8):
+        if not 1 <= max_block <= 24:
+            raise ValueError("max_block must be between 1 and 24")
+        self.max_block = max_block
+        self.total_bits = 0
+        self.ones = 0
+        self.counts = {k: np.zeros(1 << k, dtype=np.int64) for k in range(2, max_block + 1)}
+        self.tail = np.zeros(0, dtype=np.uint8)     # last max_block-1 bits seen
+
+    # Step 1: Feeding data
+
+    def update(self, bits):
+        # bits: 0/1 array (any length, continues the stream)
+        bits = np.asarray(bits, dtype=np.uint8)
+        self.ones += int(np.count_nonzero(bits))
+        self._add_blocks(bits)
+
+    def update_packed(self, packed, n_bits=None):
+        # packed: np.packbits bytes (e.g. a slice of a .bin memmap)
+        packed = np.asarray(packed, dtype=np.uint8)
+        if n_bits is None:
+            n_bits = 8 * len(packed)
+        whole, extra = divmod(n_bits, 8)
+        ones = int(np.bitwise_count(packed[:whole]).sum())
+        if extra:
+            ones += int(np.bitwise_count(packed[whole] >> (8 - extra)))
+        self.ones += ones
+        if self.max_block == 1:
+            self.total_bits += n_bits
+            return
+        self._add_blocks(np.unpackbits(packed, count=n_bits))
+
+    def _add_blocks(self, bits):
+        for start in range(0, len(bits), CHUNK_BITS):
+            self._add_chunk(bits[start:start + CHUNK_BITS])
+
+    def _add_chunk(self, bits):
+        K = self.max_block
+        if K == 1:
+            self.total_bits += len(bits)
+            return
+        data = np.concatenate([self.tail, bits])
+        base = self.total_bits - len(self.tail)      # stream position of data[0]
+        before, after = self.total_bits, self.total_bits + len(bits)
+
+        # K-bit window starting at every position of data (zeros past the end)
+        padded = np.concatenate([data, np.zeros(K - 1, dtype=np.uint8)]).astype(np.uint32)
+        windows = np.zeros(len(data), dtype=np.uint32)
+        for j in range(K):
+            windows |= padded[j:j + len(data)] << np.uint32(K - 1 - j)
+
+        for k, counts in self.counts.items():
+            first = before - before % k              # the block still open before this chunk
+            starts = np.arange(first - base, after - base - k + 1, k)
+            if len(starts):
+                counts += np.bincount(windows[starts] >> np.uint32(K - k), minlength=1 << k)
+
+        self.tail = data[-(K - 1):]
+        self.total_bits = after
+
+    # Step 2: Results
+
+    def histogram(self, k):
+        if k == 1:
+            return np.array([self.total_bits - self.ones, self.ones], dtype=np.int64)
+        return self.counts[k]
+
+    def results(self):
+        # One entry per block size: entropy and optimal Huffman length per bit
+        rows = []
+        for k in range(1, self.max_block + 1):
+            counts = self.histogram(k)
+            blocks = int(counts.sum())
+            row = {"block_size": k, "blocks": blocks, "distinct": int(np.count_nonzero(counts))}
+            if blocks:
+                H_bit = float(entropy((counts[counts > 0] / blocks).tolist())) / k
+                avg_len_bit = float(np.dot(counts, huffman_lengths(counts))) / blocks / k
+                row.update(entropy_per_bit=H_bit, huffman_len_per_bit=avg_len_bit,
+                           efficiency=100 * H_bit / avg_len_bit)
+            rows.append(row)
+        return rows
@@ -0,0 +1,71 @@
+#  Vectorized block symbolization for the blocked Huffman scripts
+#  - A block of k bits becomes one integer symbol (first bit = most significant)
+#  - Built by reshaping the bit array and taking a dot product with powers of two;
+#    blocks of 7 to 16 bits are read out of np.packbits output instead (a byte
+#    window per block), which is faster once a block spans most of a byte.
+#    The fields repeat every lcm(k, 8) bits, so each field position in that
+#    unit is one strided pass over the bytes, with no index arrays
+#  - Block frequencies come from np.bincount instead of Counter over strings
+
+import math
+
+import numpy as np
+
+
+CHUNK_BLOCKS = 1 << 20    # rows converted per dot product, bounds the int64 temporaries
+
+
+def to_block_symbols(bits, block_size):
+    # bits: 0/1 array whose length is a multiple of block_size
+    bits = np.asarray(bits, dtype=np.uint8)
+    if len(bits) % block_size != 0:
+        raise ValueError(f"{len(bits)} bits do not split into blocks of {block_size}")
+    if block_size == 1:
+        return bits.astype(np.int64)
+    if 7 <= block_size <= 16:
+        return packed_fields(np.packbits(bits), len(bits) // block_size, block_size)
+    rows = bits.reshape(-1, block_size)
+    weights = np.left_shift(1, np.arange(block_size - 1, -1, -1), dtype=np.int64)
+    symbols = np.empty(len(rows), dtype=np.int64)
+    for start in range(0, len(rows), CHUNK_BLOCKS):
+        symbols[start:start + CHUNK_BLOCKS] = rows[start:start + CHUNK_BLOCKS] @ weights
+    return symbols
+
+
+def packed_fields(packed, count, width):
+    # The first `count` width-bit fields (width <= 16) of a packed bit buffer
+    if width == 8:
+        return packed[:count].astype(np.int64)
+    if width == 16:
+        return packed[:2 * count].view(">u2").astype(np.int64)
+    step = width // math.gcd(width, 8)      # bytes per repeating unit
+    per_unit = 8 // math.gcd(width, 8)      # fields per unit
+    units = -(-count // per_unit)
+    buf = np.zeros(units * step + 3, dtype=np.uint8)
+    used = min(len(packed), len(buf))
+    buf[:used] = packed[:used]
+    out = np.empty((units, per_unit), dtype=np.int64)
+    for j in range(per_unit):
+        # Field j of every unit: a 3-byte window from the same byte of each unit
+        byte = (j * width) >> 3
+        window = buf[byte:byte + units * step:step].astype(np.uint32) << 16
+        window |= buf[byte + 1:byte + 1 + units * step:step].astype(np.uint32) << 8
+        window |= buf[byte + 2:byte + 2 + units * step:step]
+        out[:, j] = (window >> (24 - width - (j * width & 7))) & ((1 << width) - 1)
+    return out.ravel()[:count]
+
+
+def from_block_symbols(symbols, block_size):
+    # Inverse of to_block_symbols: integer symbols back to a flat bit array
+    symbols = np.asarray(symbols, dtype=np.int64)
+    shifts = np.arange(block_size - 1, -1, -1)
+    return ((symbols[:, None] >> shifts) & 1).astype(np.uint8).ravel()
+
+
+def block_counts(symbols, block_size):
+    # Count of every possible block (index = symbol), zero for unseen blocks
+    return np.bincount(symbols, minlength=1 << block_size)
+
+
+def block_label(symbol, block_size):
+    return format(int(symbol), f"0{block_size}b")
@@ -0,0 +1,137 @@
+#  Canonical, length-limited Huffman codebooks
+#  - Codes are assigned from the code lengths alone (sorted by length, then
+#    symbol), so they no longer depend on heap tie-breaking
+#  - package_merge() builds optimal lengths under a maximum code length
+#  - The serialized header holds only the code lengths of the symbols that
+#    occur, so it grows with those rather than with the 2**k alphabet
+
+import numpy as np
+
+
+LEN_WIDTH_BITS = 5        # header fields: shortest length, length entry width, Rice parameter
+
+
+# Step 1: Length-limited code lengths (package-merge)
+
+def package_merge(weights, max_len):
+    # weights: symbol -> count (or probability); returns symbol -> code length
+    symbols = sorted((s for s in weights if weights[s] > 0), key=lambda s: weights[s])
+    n = len(symbols)
+    if n == 0:
+        raise ValueError("Cannot build a codebook without symbols")
+    if n == 1:
+        return {symbols[0]: 1}
+    if (1 << max_len) < n:
+        raise ValueError(f"{n} symbols do not fit in codes of at most {max_len} bits")
+
+    # An item is (weight, symbol, first, second): a leaf when symbol is not None,
+    # otherwise a package of two items from the previous level
+    leaves = [(weights[s], s, None, None) for s in symbols]
+    current = leaves
+    for _ in range(max_len - 1):
+        packages = [(current[i][0] + current[i + 1][0], None, current[i], current[i + 1])
+                    for i in range(0, len(current) - 1, 2)]
+        current = sorted(leaves + packages, key=lambda item: item[0])
+
+    # Each time a symbol appears in the 2n-2 cheapest items adds one to its length
+    lengths = dict.fromkeys(symbols, 0)
+    stack = list(current[:2 * n - 2])
+    while stack:
+        _, sym, first, second = stack.pop()
+        if sym is not None:
+            lengths[sym] += 1
+        else:
+            stack.append(first)
+            stack.append(second)
+    return lengths
+
+
+# Step 2: Canonical code assignment
+
+def canonical_codes(lengths):
+    # lengths: symbol -> code length; returns symbol -> code string
+    codes = {}
+    code = 0
+    prev_len = 0
+    for sym in sorted(lengths, key=lambda s: (lengths[s], s)):
+        length = lengths[sym]
+        code <<= length - prev_len
+        codes[sym] = format(code, f"0{length}b")
+        code += 1
+        prev_len = length
+    return codes
+
+
+def canonical_code_values(lengths):
+    # Array form of canonical_codes() for large alphabets: lengths is indexed by
+    # symbol (0 = unused); returns the integer code of every symbol
+    lengths = np.asarray(lengths, dtype=np.int64)
+    codes = np.zeros(len(lengths), dtype=np.uint64)
+    used = np.flatnonzero(lengths)
+    if len(used) == 0:
+        return codes
+    max_len = int(lengths.max())
+    if max_len > 63:
+        raise ValueError(f"Code length {max_len} does not fit in 64-bit code values")
+    # Stable sort by length keeps symbols in increasing order within a length
+    # (code lengths fit a uint8, which numpy sorts with a radix sort)
+    order = used[np.argsort(lengths[used].astype(np.uint8), kind="stable")]
+    # The code of each symbol is the Kraft sum of all symbols before it,
+    # scaled to its own length
+    shift = (max_len - lengths[order]).astype(np.uint64)
+    kraft = np.cumsum(np.uint64(1) << shift) - (np.uint64(1) << shift)
+    codes[order] = kraft >> shift
+    return codes
+
+
+# Step 3: Header holding only the code lengths
+# Large blocked alphabets are mostly unused symbols, so only the symbols that
+# occur are listed: their count, then for each one the gap since the previous
+# one (Rice coded) and its code length above the shortest length
+
+def write_code_lengths(writer, lengths):
+    # lengths: list indexed by symbol, 0 for symbols that never occur
+    used = [sym for sym, length in enumerate(lengths) if length]
+    writer.write(len(used), len(lengths).bit_length())
+    if not used:
+        return
+    shortest = min(lengths[sym] for sym in used)
+    width = (max(lengths) - shortest).bit_length()
+    # Rice parameter from the mean gap between used symbols
+    rice = max(0, ((len(lengths) - len(used)) // len(used)).bit_length() - 1)
+    writer.write(shortest, LEN_WIDTH_BITS)
+    writer.write(width, LEN_WIDTH_BITS)
+    writer.write(rice, LEN_WIDTH_BITS)
+    prev = -1
+    for sym in used:
+        gap = sym - prev - 1
+        # (gap >> rice) one bits, a zero, the low rice bits, then the length
+        quotient = gap >> rice
+        writer.write((1 << quotient) - 1, quotient)
+        writer.write(gap & ((1 << rice) - 1), 1 + rice)
+        writer.write(lengths[sym] - shortest, width)
+        prev = sym
+
+
+def read_code_lengths(reader, alphabet_size):
+    count = reader.read(alphabet_size.bit_length())
+    lengths = [0] * alphabet_size
+    if count > alphabet_size:
+        raise ValueError(f"Corrupt code length header ({count} symbols of {alphabet_size})")
+    if not count:
+        return lengths
+    shortest = reader.read(LEN_WIDTH_BITS)
+    width = reader.read(LEN_WIDTH_BITS)
+    rice = reader.read(LEN_WIDTH_BITS)
+    sym = -1
+    for _ in range(count):
+        quotient = 0
+        while reader.read_bit():
+            quotient += 1
+            if quotient << rice >= alphabet_size:
+                raise ValueError("Corrupt code length header (gap past the alphabet)")
+        sym += 1 + ((quotient << rice) | reader.read(rice))
+        if sym >= alphabet_size:
+            raise ValueError("Corrupt code length header (symbol past the alphabet)")
+        lengths[sym] = shortest + reader.read(width)
+    return lengths
@@ -0,0 +1,152 @@
+#  Bounded LRU cache of compiled codebooks and decode tables
+#  - Encoding side: keyed by the codec, the block size and the symbol
+#    distribution quantized to multiples of 2**-quant_bits, so frames with the
+#    same or nearly the same statistics share one model
+#  - Tables (canonical codes, decode table, intervals) are keyed by the model
+#    itself (code lengths / frequency table), the one the frame header carries:
+#    distributions that differ but give the same code lengths share them, and
+#    the decoder finds them from the header alone
+#  - Hit / miss / eviction counters; save() writes the keys and models to a
+#    JSON warm-start file that a new process loads (and compiles) at start-up
+#
+#  Usage:
+#    cache = CodebookCache(path="../results/codebook_cache.json")
+#    stream = HuffmanStream(4, cache=cache)
+#    ...
+#    print(cache.stats()); cache.save()
+
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from .canonical_huffman import canonical_codes
+from .huffman_decoder import HuffmanDecoder
+from .huffman_encoder import HuffmanEncoder
+from .range_coder import quantize_counts, build_intervals
+from .stream_codecs import huffman_code_lengths
+
+
+CAPACITY = 256            # entries (models and tables each take one)
+QUANT_BITS = 8            # distribution resolution of the encoding-side keys
+
+
+def quantize_distribution(counts, quant_bits=QUANT_BITS):
+    # counts: array indexed by symbol -> tuple of probabilities in units of
+    # 2**-quant_bits; a symbol that occurs never rounds down to 0
+    counts = np.asarray(counts, dtype=np.float64)
+    q = np.rint(counts / counts.sum() * (1 << quant_bits)).astype(np.int64)
+    q[(counts > 0) & (q == 0)] = 1
+    return tuple(q.tolist())
+
+
+def as_tuple(value):
+    # Nested lists (a key read back from JSON) -> nested tuples
+    return tuple(as_tuple(v) for v in value) if isinstance(value, list) else value
+
+
+class HuffmanTables:
+    # Everything a Huffman frame needs once the code lengths are known
+    def __init__(self, lengths, block_size=1):
+        self.lengths = lengths                              # symbol -> code length
+        self.codes = canonical_codes(lengths)
+        self.encoder = HuffmanEncoder(lengths, block_size)
+        self.decoder = HuffmanDecoder(self.codes)
+
+
+class CodebookCache:
+    def __init__(self, capacity=CAPACITY, quant_bits=QUANT_BITS, path=None):
+        self.capacity = capacity
+        self.quant_bits = quant_bits
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    # Step 1: LRU core
+
+    def lookup(self, key, build):
+        value = self.entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+        self.misses += 1
+        value = build()
+        self.insert(key, value)
+        return value
+
+    def insert(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.entries), "capacity": self.capacity,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    # Step 2: Huffman
+
+    def huffman_lengths(self, counts, block_size):
+        # counts: block_counts() array. A miss builds the lengths from the exact
+        # counts; later frames with the same quantized distribution reuse them
+        # (the key keeps which symbols occur, so every one of them has a code)
+        key = ("huffman", block_size, quantize_distribution(counts, self.quant_bits))
+        return self.lookup(key, lambda: huffman_code_lengths(counts, block_size))
+
+    def huffman_tables(self, lengths, block_size):
+        key = ("huffman-table", block_size, tuple(sorted(lengths.items())))
+        return self.lookup(key, lambda: HuffmanTables(lengths, block_size))
+
+    def huffman(self, counts, block_size):
+        # Encoding side in one call: distribution -> code lengths -> tables
+        return self.huffman_tables(self.huffman_lengths(counts, block_size), block_size)
+
+    # Step 3: Arithmetic
+
+    def arithmetic_freqs(self, counts):
+        # counts: array indexed by symbol -> quantized frequency table (symbol -> frequency).
+        # As for Huffman, a miss builds the table from the exact counts and later
+        # frames with the same quantized distribution reuse it
+        key = ("arithmetic", quantize_distribution(counts, self.quant_bits))
+        return self.lookup(key, lambda: quantize_counts({s: int(c) for s, c in enumerate(counts) if c > 0}))
+
+    def arithmetic_intervals(self, freqs):
+        key = ("arithmetic-table", tuple(sorted(freqs.items())))
+        return self.lookup(key, lambda: build_intervals(freqs))
+
+    # Step 4: Warm-start file (models as they are; tables are compiled again on load)
+
+    def save(self, path=None):
+        path = path or self.path
+        entries = [[key, value if key[0] in ("huffman", "arithmetic") else None]
+                   for key, value in self.entries.items()]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"quant_bits": self.quant_bits, "entries": entries}, f)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        with open(path) as f:
+            saved = json.load(f)
+        if saved["quant_bits"] != self.quant_bits:
+            return
+        # Oldest first, so the saved LRU order is kept; the most recent fit
+        for key, model in saved["entries"][-self.capacity:]:
+            # JSON turns tuples into lists and symbols into strings
+            key = as_tuple(key)
+            kind = key[0]
+            if kind in ("huffman", "arithmetic"):
+                value = {int(s): v for s, v in model.items()}
+            elif kind == "huffman-table":
+                value = HuffmanTables(dict(key[2]), key[1])
+            else:
+                value = build_intervals(dict(key[1]))
+            self.insert(key, value)
@@ -0,0 +1,376 @@
+#  Local asyncio compression server
+#  - encode / decode over a local TCP or Unix socket for Huffman (block size 1),
+#    blocked Huffman (block size k) and arithmetic coding; payloads are the
+#    frames of stream_codecs, so anything the server writes decodes offline too
+#  - Concurrent requests with the same operation, codec and block size are
+#    collected for up to BATCH_WINDOW seconds (or MAX_BATCH requests) and run
+#    as one batch: one process-pool round trip, one unpack / pack of all the
+#    bits, and a per-worker CodebookCache shared by the whole batch
+#  - All coding runs in a ProcessPoolExecutor; the event loop only moves bytes
+#  - Per-request latency (arrival to reply) is kept per operation and codec;
+#    the "stats" operation returns p50 / p90 / p99
+#
+#  Wire format (both directions, requests may be pipelined):
+#    MESSAGE header (JSON bytes, payload bytes), JSON, payload
+#    request JSON:  {"id", "op": "encode" | "decode" | "stats", "codec", "block_size", "n_bits"}
+#    reply JSON:    {"id", "ok", "n_bits"} or {"id", "ok": false, "error"}
+#    (every request gets a reply, malformed or failing ones an error reply)
+#    n_bits may not exceed MAX_BITS, nor the most bits the payload can hold
+#    encode payload: packed bits in, frame out; decode: frame in, packed bits out
+#
+#  Usage:
+#    python -m bitcodecs.compression_server --port 8765      (or --unix /tmp/bitcodecs.sock)
+#    python benchmark_server_load.py --port 8765
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import struct
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .codebook_cache import CodebookCache
+from .range_coder import FREQ_BITS
+from .stream_codecs import (encode_huffman_frame, decode_huffman_frame,
+                            encode_arithmetic_frame, decode_arithmetic_frame)
+
+
+MESSAGE = struct.Struct("<II")      # JSON header bytes, payload bytes
+CODECS = ("huffman", "arithmetic")
+BATCH_WINDOW = 0.002                # seconds a batch stays open for more requests
+MAX_BATCH = 64
+LATENCY_WINDOW = 10000              # latencies kept per operation / codec
+MAX_BLOCK_SIZE = 16
+MAX_BITS = 1 << 26                  # largest n_bits one request may ask for
+ARITHMETIC_RATIO = 1 << FREQ_BITS   # an arithmetic symbol costs over 2**-FREQ_BITS bits
+
+
+# Step 1: Batch work (runs in the worker processes)
+
+_cache = None
+
+
+def _worker_cache():
+    global _cache
+    if _cache is None:
+        _cache = CodebookCache()
+    return _cache
+
+
+def run_batch(op, codec, block_size, items):
+    # items: [(payload, n_bits)]; returns [(True, payload, n_bits) or (False, error)]
+    cache = _worker_cache()
+    results = []
+    if op == "encode":
+        # One unpack for the whole batch, then every request is its own frame
+        offsets = np.cumsum([0] + [len(data) for data, _ in items])
+        bits = np.unpackbits(np.frombuffer(b"".join(data for data, _ in items), dtype=np.uint8))
+        for (data, n_bits), start in zip(items, offsets.tolist()):
+            try:
+                if n_bits > 8 * len(data):
+                    raise ValueError(f"{n_bits} bits do not fit in {len(data)} bytes")
+                chunk = bits[8 * start:8 * start + n_bits]
+                if codec == "huffman":
+                    payload = encode_huffman_frame(chunk, block_size, cache=cache)
+                else:
+                    payload = encode_arithmetic_frame(chunk, cache=cache)
+                results.append((True, payload, n_bits))
+            except Exception as exc:
+                results.append((False, str(exc)))
+        return results
+
+    # Decode every frame, then pack all the bits at once (each padded to whole bytes)
+    decoded = []
+    for payload, n_bits in items:
+        try:
+            if codec == "huffman":
+                chunk = decode_huffman_frame(payload, n_bits, block_size, cache=cache)
+            else:
+                chunk = decode_arithmetic_frame(payload, n_bits, cache=cache)
+            decoded.append(np.concatenate([chunk, np.zeros(-len(chunk) % 8, dtype=np.uint8)]))
+        except Exception as exc:
+            decoded.append(str(exc))
+    arrays = [d for d in decoded if not isinstance(d, str)]
+    packed = np.packbits(np.concatenate(arrays)).tobytes() if arrays else b""
+    pos = 0
+    for d, (_, n_bits) in zip(decoded, items):
+        if isinstance(d, str):
+            results.append((False, d))
+            continue
+        results.append((True, packed[pos:pos + len(d) // 8], n_bits))
+        pos += len(d) // 8
+    return results
+
+
+def max_bits(op, codec, block_size, payload_size):
+    # Most bits a payload of this size can encode or decode to
+    if op == "encode":
+        return min(MAX_BITS, 8 * payload_size)
+    if codec == "huffman":
+        # Every codeword is at least one bit and stands for block_size bits
+        return min(MAX_BITS, 8 * payload_size * block_size)
+    return min(MAX_BITS, 8 * payload_size * ARITHMETIC_RATIO)
+
+
+# Step 2: Message framing
+
+async def read_message(reader):
+    head = await reader.readexactly(MESSAGE.size)
+    json_size, payload_size = MESSAGE.unpack(head)
+    raw = await reader.readexactly(json_size)
+    payload = await reader.readexactly(payload_size)
+    # The whole message is read first, so a bad header leaves the stream in sync
+    return json.loads(raw), payload
+
+
+def write_message(writer, header, payload=b""):
+    raw = json.dumps(header).encode()
+    writer.write(MESSAGE.pack(len(raw), len(payload)) + raw + payload)
+
+
+# Step 3: Batching and latency bookkeeping
+
+class Batcher:
+    def __init__(self, pool, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.pool = pool
+        self.window = window
+        self.max_batch = max_batch
+        self.open = {}            # (op, codec, block_size) -> [(item, future)]
+        self.timers = {}
+        self.batches = 0
+        self.batched = 0
+
+    async def submit(self, key, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.open.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) == 1:
+            self.timers[key] = loop.call_later(self.window, self.flush, key)
+        if len(batch) >= self.max_batch:
+            self.flush(key)
+        return await future
+
+    def flush(self, key):
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self.open.pop(key, None)
+        if batch:
+            asyncio.ensure_future(self.run(key, batch))
+
+    async def run(self, key, batch):
+        self.batches += 1
+        self.batched += len(batch)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, run_batch, *key, [item for item, _ in batch])
+        except Exception as exc:
+            results = [(False, f"batch failed: {exc}")] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def is_count(value):
+    # JSON integer (not a bool, float or string)
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    ms = np.array(values) * 1000
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {"count": len(values), "p50_ms": float(p50), "p90_ms": float(p90),
+            "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+
+class CompressionServer:
+    def __init__(self, workers=None, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        self.batcher = Batcher(self.pool, window, max_batch)
+        self.latency = {}         # "op codec k" -> recent latencies in seconds
+        self.served = 0
+        self.started = time.perf_counter()
+
+    def stats(self):
+        uptime = time.perf_counter() - self.started
+        return {"served": self.served, "uptime_s": uptime,
+                "batches": self.batcher.batches,
+                "mean_batch": self.batcher.batched / max(self.batcher.batches, 1),
+                "latency": {name: percentiles(list(values)) for name, values in self.latency.items()}}
+
+    async def respond(self, header, payload, reply):
+        # Fills in reply; returns (reply payload, latency name or None)
+        op = header.get("op")
+        if op == "stats":
+            reply.update(ok=True, stats=self.stats())
+            return b"", None
+        codec = header.get("codec")
+        block_size = header.get("block_size", 1) if codec == "huffman" else 1
+        n_bits = header.get("n_bits")
+        if (op not in ("encode", "decode") or codec not in CODECS
+                or not is_count(block_size) or not 1 <= block_size <= MAX_BLOCK_SIZE
+                or not is_count(n_bits) or n_bits < 0):
+            reply.update(ok=False, error=f"bad request: op={op!r} codec={codec!r} "
+                                         f"block_size={block_size!r} n_bits={n_bits!r}")
+            return b"", None
+        limit = max_bits(op, codec, block_size, len(payload))
+        if n_bits > limit:
+            # Checked before decoding: the coders would otherwise run on
+            # through the zero padding for as many symbols as were asked for
+            reply.update(ok=False, error=f"bad request: n_bits={n_bits} is more than "
+                                         f"{limit} for a {len(payload)}-byte {op} payload")
+            return b"", None
+
+        result = await self.batcher.submit((op, codec, block_size), (payload, n_bits))
+        if result[0]:
+            reply.update(ok=True, n_bits=result[2])
+            return result[1], f"{op} {codec} k={block_size}"
+        reply.update(ok=False, error=result[1])
+        return b"", f"{op} {codec} k={block_size}"
+
+    async def handle_request(self, header, payload, writer):
+        arrived = time.perf_counter()
+        reply = {"id": header.get("id") if isinstance(header, dict) else None}
+        try:
+            data, name = await self.respond(header, payload, reply)
+        except Exception as exc:
+            # Whatever went wrong, the client still gets a reply instead of waiting forever
+            reply = {"id": reply["id"], "ok": False, "error": f"request failed: {exc!r}"}
+            data, name = b"", None
+        write_message(writer, reply, data)
+        if name is not None:
+            self.served += 1
+            self.latency.setdefault(name, deque(maxlen=LATENCY_WINDOW)).append(time.perf_counter() - arrived)
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    header, payload = await read_message(reader)
+                except ValueError as exc:
+                    # Not JSON: no id to answer to, but the connection stays usable
+                    write_message(writer, {"id": None, "ok": False, "error": f"bad request: {exc}"})
+                    continue
+                task = asyncio.ensure_future(self.handle_request(header, payload, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        if unix:
+            server = await asyncio.start_unix_server(self.handle_connection, unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            where = f"{host}:{port}"
+        print(f"Compression server listening on {where}", flush=True)
+
+        # SIGINT / SIGTERM stop the server cleanly, so the pool workers exit too
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass      # Windows: Ctrl-C still raises KeyboardInterrupt
+        async with server:
+            await stop.wait()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# Step 4: Client (pipelined: many requests in flight on one connection)
+
+class CompressionClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.next_id = 0
+        self.receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, unix=None):
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                header, payload = await read_message(self.reader)
+                future = self.pending.pop(header["id"], None)
+                if future is not None:
+                    future.set_result((header, payload))
+        except (asyncio.IncompleteReadError, ConnectionError) as exc:
+            for future in self.pending.values():
+                future.set_exception(ConnectionError(f"server closed the connection: {exc}"))
+
+    async def request(self, header, payload=b""):
+        self.next_id += 1
+        header = dict(header, id=self.next_id)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        write_message(self.writer, header, payload)
+        await self.writer.drain()
+        reply, data = await future
+        if not reply["ok"]:
+            raise ValueError(reply["error"])
+        return reply, data
+
+    async def encode(self, bits, codec="huffman", block_size=1):
+        bits = np.asarray(bits, dtype=np.uint8)
+        header = {"op": "encode", "codec": codec, "block_size": block_size, "n_bits": len(bits)}
+        return (await self.request(header, np.packbits(bits).tobytes()))[1]
+
+    async def decode(self, payload, n_bits, codec="huffman", block_size=1):
+        header = {"op": "decode", "codec": codec, "block_size": block_size, "n_bits": n_bits}
+        packed = (await self.request(header, payload))[1]
+        return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=n_bits)
+
+    async def stats(self):
+        return (await self.request({"op": "stats"}))[0]["stats"]
+
+    async def close(self):
+        self.writer.close()
+        self.receiver.cancel()
+
+
+# Step 5: Command line
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve encode/decode requests on a local socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Unix socket path (instead of TCP)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW, help="seconds")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args()
+
+    server = CompressionServer(args.workers, args.batch_window, args.max_batch)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        print(json.dumps(server.stats(), indent=2))
@@ -0,0 +1,170 @@
+#  Adaptive context-model binary arithmetic coding
+#  - Every bit is coded with the range coder under the probability of its
+#    context; the counts of that context are updated right after, identically
+#    on both sides, so there is no counting pass and no model in the header
+#  - Order-k context: the previous k bits of the stream
+#  - Row contexts (graph adjacency bits, upper triangle flattened row by row as
+#    in generate_data.py): additionally the bit above (same column, previous
+#    row) and the distance from the diagonal, bucketed by powers of two
+#  - Per context two integer counts (KT start: 1 and 1, +2 per coded bit),
+#    halved once their sum passes COUNT_LIMIT so the model keeps adapting
+#
+#  Usage:
+#    python -m bitcodecs.context_coder encode ../data/graph_bits.bin graph.ctx --rows
+#    python -m bitcodecs.context_coder decode graph.ctx graph_bits.bin
+
+import argparse
+import struct
+
+import numpy as np
+
+from .range_coder import RangeEncoder, RangeDecoder
+
+
+ORDER = 4
+COUNT_LIMIT = 1 << 13     # well under the range coder's 2**16 limit on a frequency total
+ROW_BITS = 4              # bit above + 3-bit diagonal distance bucket
+MAX_ORDER = 16
+
+MAGIC = b"CTXA"
+CONTEXT_HEADER = struct.Struct("<4sBBIQ")    # magic, order, row contexts, nodes, bits
+
+
+def graph_nodes(n_bits):
+    # n with n(n-1)/2 == n_bits, or None when n_bits is no upper triangle
+    n = (1 + int(np.sqrt(1 + 8 * n_bits))) // 2
+    return n if n * (n - 1) // 2 == n_bits else None
+
+
+# Step 1: Model (shared by encoder and decoder)
+
+class ContextModel:
+    def __init__(self, order=ORDER, n=None):
+        if not 0 <= order <= MAX_ORDER:
+            raise ValueError(f"Context order must be 0..{MAX_ORDER}, got {order}")
+        self.order = order
+        self.mask = (1 << order) - 1
+        self.n = n                # nodes; None: no row contexts
+        size = 1 << (order + (ROW_BITS if n else 0))
+        self.c0 = [1] * size
+        self.c1 = [1] * size
+        self.history = 0
+        self.row = 0              # row i holds pairs (i, j), j = i+1 .. n-1
+        self.col = 0              # j - i - 1
+        self.prev_row = []
+        self.cur_row = []
+
+    def context(self):
+        if not self.n:
+            return self.history
+        above = self.prev_row[self.col + 1] if self.row else 0
+        distance = min(self.col.bit_length(), 7)
+        return self.history | (((above << 3) | distance) << self.order)
+
+    def update(self, ctx, bit):
+        if bit:
+            self.c1[ctx] += 2
+        else:
+            self.c0[ctx] += 2
+        if self.c0[ctx] + self.c1[ctx] > COUNT_LIMIT:
+            self.c0[ctx] = (self.c0[ctx] + 1) >> 1
+            self.c1[ctx] = (self.c1[ctx] + 1) >> 1
+        self.history = ((self.history << 1) | bit) & self.mask
+        if self.n:
+            self.cur_row.append(bit)
+            self.col += 1
+            if self.col == self.n - 1 - self.row:
+                self.prev_row, self.cur_row = self.cur_row, []
+                self.row += 1
+                self.col = 0
+
+
+# Step 2: Encoder (bits may arrive in any number of chunks)
+
+class ContextEncoder:
+    def __init__(self, order=ORDER, n=None):
+        self.model = ContextModel(order, n)
+        self.coder = RangeEncoder()
+        self.count = 0
+
+    def encode(self, bits):
+        model, coder = self.model, self.coder
+        c0, c1 = model.c0, model.c1
+        for bit in np.asarray(bits, dtype=np.uint8).tolist():
+            ctx = model.context()
+            zero = c0[ctx]
+            if bit:
+                coder.encode(zero, c1[ctx], zero + c1[ctx])
+            else:
+                coder.encode(0, zero, zero + c1[ctx])
+            model.update(ctx, bit)
+        self.count += len(bits)
+
+    def finish(self):
+        header = CONTEXT_HEADER.pack(MAGIC, self.model.order, bool(self.model.n), self.model.n or 0, self.count)
+        return header + self.coder.finish()
+
+
+def encode_context(bits, order=ORDER, n=None):
+    encoder = ContextEncoder(order, n)
+    encoder.encode(bits)
+    return encoder.finish()
+
+
+# Step 3: Decoder
+
+def decode_context(data):
+    magic, order, rows, n, n_bits = CONTEXT_HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Input is not a context-coded stream")
+    model = ContextModel(order, n if rows else None)
+    c0, c1 = model.c0, model.c1
+    decoder = RangeDecoder(bytes(data[CONTEXT_HEADER.size:]))
+    out = np.empty(n_bits, dtype=np.uint8)
+    for i in range(n_bits):
+        ctx = model.context()
+        zero = c0[ctx]
+        if decoder.get_freq(zero + c1[ctx]) < zero:
+            decoder.decode(0, zero)
+            bit = 0
+        else:
+            decoder.decode(zero, c1[ctx])
+            bit = 1
+        model.update(ctx, bit)
+        out[i] = bit
+    return out
+
+
+# Step 4: Command line (the .bin input is read chunk by chunk)
+
+if __name__ == "__main__":
+    from .bit_dataset import read_header, iter_bits, save_bits
+
+    parser = argparse.ArgumentParser(description="Adaptive context-model arithmetic coder for bit datasets")
+    parser.add_argument("command", choices=["encode", "decode"])
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--order", type=int, default=ORDER)
+    parser.add_argument("--rows", action="store_true", help="row contexts (input is a graph's upper triangle)")
+    args = parser.parse_args()
+
+    if args.command == "encode":
+        header, _ = read_header(args.input)
+        n_bits = header["length"]
+        n = None
+        if args.rows:
+            n = header["params"].get("n") or graph_nodes(n_bits)
+            if not n or n * (n - 1) // 2 != n_bits:
+                raise SystemExit(f"{args.input}: {n_bits} bits are not the upper triangle of a graph")
+        encoder = ContextEncoder(args.order, n)
+        for bits in iter_bits(args.input, 1 << 16):
+            encoder.encode(bits)
+        data = encoder.finish()
+        with open(args.output, "wb") as f:
+            f.write(data)
+        print(f"{n_bits} bits -> {len(data)} bytes ({8 * len(data) / max(n_bits, 1):.4f} bits/bit)")
+    else:
+        with open(args.input, "rb") as f:
+            bits = decode_context(f.read())
+        save_bits(args.output, bits, "context_decoded")
+        print(f"Decoded {len(bits)} bits to {args.output}")
@@ -0,0 +1,7 @@
+#  Shannon entropy helper shared by the Huffman and arithmetic scripts
+
+import math
+
+
+def entropy(p_list):
+    return -sum(p * math.log2(p) for p in p_list if p > 0)
@@ -0,0 +1,83 @@
+#  Run-length + Golomb-Rice coding for sparse bit streams
+#  - The bits become the lengths of the zero runs in front of every 1 (plus the
+#    trailing run), which are geometric for Bernoulli(p) / Erdős–Rényi data
+#  - Each run r is coded as r >> k in unary and r & (2^k - 1) in k bits, with k
+#    chosen from the measured p
+#  - All unary parts are stored first, then all remainders, so encoding and
+#    decoding are plain NumPy array operations over the runs (no per-bit loop)
+
+import math
+import struct
+
+import numpy as np
+
+
+RICE_HEADER = struct.Struct("<BI")     # Rice parameter k, number of runs
+MAX_K = 31
+GOLDEN = (1 + math.sqrt(5)) / 2
+
+
+# Step 1: Runs and the Rice parameter
+
+def run_lengths(bits):
+    # Zero-run length before every 1, then the trailing zero run
+    ones = np.flatnonzero(bits)
+    return np.diff(np.concatenate([[-1], ones, [len(bits)]])) - 1
+
+
+def rice_parameter(p):
+    # Optimal k for geometric runs when a bit is 1 with probability p (Kiely, 2004)
+    if p <= 0:
+        return MAX_K
+    if p >= 0.5:
+        return 0
+    k = 1 + math.floor(math.log2(math.log(GOLDEN - 1) / math.log(1 - p)))
+    return min(max(k, 0), MAX_K)
+
+
+def rice_cost(runs, k):
+    # Coded size in bits of the runs with parameter k
+    return int(np.sum(runs >> k)) + len(runs) * (k + 1)
+
+
+# Step 2: Encoding
+
+def encode_rice(bits, k=None):
+    bits = np.asarray(bits, dtype=np.uint8)
+    runs = run_lengths(bits).astype(np.int64)
+    if k is None:
+        k = rice_parameter(np.count_nonzero(bits) / max(len(bits), 1))
+    quotients = runs >> k
+
+    # Unary parts: q ones closed by a zero; the zeros sit at cumsum(q + 1) - 1
+    unary = np.ones(int(quotients.sum()) + len(runs), dtype=np.uint8)
+    unary[np.cumsum(quotients + 1) - 1] = 0
+
+    # Remainders: k bits each, most significant first
+    shifts = np.arange(k - 1, -1, -1, dtype=np.int64)
+    remainders = ((runs[:, None] >> shifts) & 1).astype(np.uint8).ravel()
+
+    payload = np.packbits(np.concatenate([unary, remainders])).tobytes()
+    return RICE_HEADER.pack(k, len(runs)) + payload
+
+
+# Step 3: Decoding
+
+def decode_rice(data, n_bits):
+    k, n_runs = RICE_HEADER.unpack_from(data, 0)
+    coded = np.unpackbits(np.frombuffer(data, dtype=np.uint8, offset=RICE_HEADER.size))
+
+    # The n_runs-th zero closes the unary section; quotient = ones before each zero
+    stops = np.flatnonzero(coded == 0)[:n_runs]
+    quotients = np.diff(np.concatenate([[-1], stops])) - 1
+    start = int(stops[-1]) + 1
+
+    runs = quotients << k
+    if k:
+        fields = coded[start:start + n_runs * k].reshape(n_runs, k).astype(np.int64)
+        runs |= fields @ (1 << np.arange(k - 1, -1, -1, dtype=np.int64))
+
+    # Every run but the last ends with a 1
+    bits = np.zeros(n_bits, dtype=np.uint8)
+    bits[np.cumsum(runs[:-1] + 1) - 1] = 1
+    return bits
@@ -0,0 +1,319 @@
+#  Table-driven Huffman decoder
+#  - Looks at TABLE_BITS bits of input at a time instead of one bit at a time
+#  - A primary entry holds every whole codeword that fits in those bits, so
+#    short codes (e.g. single-bit alphabets) decode several symbols per lookup
+#  - Codes longer than TABLE_BITS go through a second-level table
+#  - Codebooks whose codes fit in WINDOW_MAX_BITS decode with NumPy instead:
+#    the data is cut into SEGMENT_BITS-bit segments that are all walked at
+#    once from a guessed start, then re-walked from the true start wherever
+#    the guess was wrong (Huffman codes resynchronize after a few codewords,
+#    so the re-walks are short); with short codes each step of the first walk
+#    takes every codeword in a STEP_BITS-bit window
+#  - Bits that match no codeword, or data that ends before the last of the
+#    `count` codewords, raise ValueError instead of decoding garbage
+
+import numpy as np
+
+from .bitio import BitReader
+from .block_symbols import to_block_symbols
+
+
+TABLE_BITS = 12
+WINDOW_MAX_BITS = 20      # longest code the NumPy path handles (2**20-entry table)
+STEP_BITS = 12            # window the multi-codeword walkers read per step
+SEGMENT_BITS = 512        # bits every NumPy walker covers per pass
+CHUNK_BITS = 1 << 20      # bits walked per call, so memory stays bounded
+
+
+class HuffmanDecoder:
+    def __init__(self, codes, table_bits=TABLE_BITS):
+        # codes: symbol -> code string ("0101"), e.g. canonical_codes(code_lengths(counts))
+        lengths = [len(code) for code in codes.values()]
+        if max(lengths) == 0:
+            raise ValueError("Cannot decode a codebook with a single zero-length code")
+        self.max_len = max(lengths)
+        self.table_bits = k = table_bits
+        self.sub_bits = 0
+
+        # Step 1: first codeword at the top of every k-bit window
+        first = [None] * (1 << k)
+        long_codes = {}
+        for sym, code in codes.items():
+            value, length = int(code, 2), len(code)
+            if length <= k:
+                start = value << (k - length)
+                first[start:start + (1 << (k - length))] = [(sym, length)] * (1 << (k - length))
+            else:
+                long_codes.setdefault(value >> (length - k), []).append((sym, value, length))
+
+        # Step 2: every whole codeword in a window of width w, built from the
+        # tables for narrower widths (what is left after the first codeword)
+        tables = [[((), 0, None)]]
+        for w in range(1, k + 1):
+            table = []
+            for i in range(1 << w):
+                match = first[i << (k - w)]
+                if match is None or match[1] > w:
+                    table.append(((), 0, None))
+                    continue
+                sym, length = match
+                rest_syms, rest_used, _ = tables[w - length][i & ((1 << (w - length)) - 1)]
+                table.append(((sym,) + rest_syms, length + rest_used, None))
+            tables.append(table)
+        self.table = tables[k]
+        self.code_len = {sym: len(code) for sym, code in codes.items()}
+
+        # Step 3: second-level tables for prefixes of codes longer than k bits
+        for prefix, group in long_codes.items():
+            sub_bits = max(length for _, _, length in group) - k
+            self.sub_bits = max(self.sub_bits, sub_bits)
+            sub_table = [None] * (1 << sub_bits)
+            for sym, value, length in group:
+                low = value & ((1 << (length - k)) - 1)
+                span = 1 << (sub_bits - (length - k))
+                sub_table[low * span:(low + 1) * span] = [(sym, length - k)] * span
+            self.table[prefix] = ((), k, (sub_bits, sub_table))
+
+        # Step 4: symbol index and code length for every max_len-bit window
+        self.window_sym = None
+        if self.max_len <= WINDOW_MAX_BITS:
+            self.build_windows(codes)
+
+    def build_windows(self, codes):
+        width = self.max_len
+        values = np.array([int(code, 2) for code in codes.values()], dtype=np.int64)
+        lengths = np.array([len(code) for code in codes.values()], dtype=np.int64)
+        spans = np.int64(1) << (width - lengths)
+        if spans.sum() > 1 << width:
+            raise ValueError("Huffman code lengths overfill the code space")
+        starts = values << (width - lengths)
+        index = np.repeat(starts - np.cumsum(spans) + spans, spans) + np.arange(spans.sum())
+        # Windows that start no codeword get index -1 and step over one bit
+        self.window_sym = np.full(1 << width, -1, dtype=np.int32)
+        self.window_len = np.ones(1 << width, dtype=np.uint8)
+        self.window_sym[index] = np.repeat(np.arange(len(codes), dtype=np.int32), spans)
+        self.window_len[index] = np.repeat(lengths, spans)
+        self.symbols = np.array(list(codes))
+        self.symbol_len = lengths
+        self.fixed_len = lengths.min() == width
+        # Most bits a walker moves in one step
+        self.reach = max(width, STEP_BITS)
+
+        # Every whole codeword in a STEP_BITS-bit window: how far a walker
+        # jumps and a bit mask of where the codewords start
+        self.step_len = None
+        if width <= STEP_BITS:
+            view = np.arange(1 << STEP_BITS, dtype=np.int64)
+            used = np.zeros(len(view), dtype=np.int64)
+            starts = np.zeros(len(view), dtype=np.int64)
+            open_ = np.ones(len(view), dtype=bool)
+            while open_.any():
+                window = ((view << used) & ((1 << STEP_BITS) - 1)) >> (STEP_BITS - width)
+                length = self.window_len[window].astype(np.int64)
+                open_ &= (self.window_sym[window] >= 0) & (used + length <= STEP_BITS)
+                starts |= open_.astype(np.int64) << used
+                used += np.where(open_, length, 0)
+            # A window that starts no codeword steps over one bit, as above
+            stuck = used == 0
+            used[stuck], starts[stuck] = 1, 1
+            self.step_len = used.astype(np.uint8)
+            self.step_starts = starts.astype(np.uint16)
+
+    def decode(self, data, count, start=0):
+        # start: bit offset of the first codeword (e.g. after a codebook header)
+        # Returns the `count` symbols as a NumPy array
+        if self.window_sym is not None:
+            return self.decode_windows(data, count, start)
+        return np.array(self.decode_table(data, count, start))
+
+    def decode_table(self, data, count, start=0):
+        reader = BitReader(data)
+        reader.skip(start)
+        table = self.table
+        k = self.table_bits
+        k_mask = (1 << k) - 1
+        need = k + self.sub_bits
+
+        out = []
+        extend = out.extend
+        acc, nacc = 0, 0
+        while len(out) < count:
+            # Every bit not yet decoded lies past the end of the data
+            if reader.pos - nacc >= reader.bit_length:
+                raise ValueError(f"Huffman data ends after {len(out)} of {count} symbols")
+            acc = ((acc & ((1 << nacc) - 1)) << 256) | reader.read(256)
+            nacc += 256
+            while nacc >= need:
+                syms, used, sub = table[(acc >> (nacc - k)) & k_mask]
+                if not used:
+                    # No codeword starts with these bits (corrupt data or an incomplete code)
+                    raise ValueError(f"Invalid Huffman code at bit {reader.pos - nacc}")
+                nacc -= used
+                if sub is None:
+                    if reader.pos - nacc > reader.bit_length and len(out) < count:
+                        self.check_end(len(out), syms, reader.pos - nacc - used, reader.bit_length, count)
+                    extend(syms)
+                else:
+                    sub_bits, sub_table = sub
+                    match = sub_table[(acc >> (nacc - sub_bits)) & ((1 << sub_bits) - 1)]
+                    if match is None:
+                        raise ValueError(f"Invalid Huffman code at bit {reader.pos - nacc - k}")
+                    sym, length = match
+                    nacc -= length
+                    if reader.pos - nacc > reader.bit_length and len(out) < count:
+                        raise ValueError(f"Huffman data ends after {len(out)} of {count} symbols")
+                    out.append(sym)
+
+        # The last lookups may run into the zero padding after the final codeword
+        del out[count:]
+        return out
+
+    def check_end(self, done, syms, pos, bit_length, count):
+        # A lookup ran past the end of the data: fine only if every codeword
+        # still needed ends inside it (the rest is decoded zero padding)
+        for sym in syms[:count - done]:
+            pos += self.code_len[sym]
+            if pos > bit_length:
+                raise ValueError(f"Huffman data ends after {done} of {count} symbols")
+            done += 1
+
+    def decode_windows(self, data, count, start=0):
+        width = self.max_len
+        raw = np.frombuffer(data, dtype=np.uint8)
+        bit_length = len(raw) * 8
+
+        if self.fixed_len:
+            # Every codeword has the same length, so the codes are plain fields
+            if start + width * count > bit_length:
+                done = max(0, (bit_length - start) // width)
+                raise ValueError(f"Huffman data ends after {done} of {count} symbols")
+            fields = to_block_symbols(np.unpackbits(raw)[start:start + width * count], width)
+            index = self.window_sym[fields]
+            bad = np.flatnonzero(index < 0)
+            if len(bad):
+                raise ValueError(f"Invalid Huffman code at bit {start + width * bad[0]}")
+            return self.symbols[index]
+
+        # Walkers may step a few codewords past the end; they read zeros there
+        padded = np.concatenate([raw, np.zeros(self.reach + 8, dtype=np.uint8)]).astype(np.uint32)
+        # words[b]: the 32 bits starting at byte b
+        words = (padded[:-3] << 24) | (padded[1:-2] << 16) | (padded[2:-1] << 8) | padded[3:]
+        found, pos, done = [], start, 0
+        while done < count and pos < bit_length:
+            part, pos = self.walk(words, pos, min(bit_length, pos + CHUNK_BITS))
+            found.append(part)
+            done += len(part[0])
+        if done < count:
+            raise ValueError(f"Huffman data ends after {done} of {count} symbols")
+        positions, index = (np.concatenate(column)[:count] for column in zip(*found))
+
+        bad = np.flatnonzero(index < 0)
+        if len(bad):
+            raise ValueError(f"Invalid Huffman code at bit {positions[bad[0]]}")
+        if count and positions[-1] + self.symbol_len[index[-1]] > bit_length:
+            raise ValueError(f"Huffman data ends after {count - 1} of {count} symbols")
+        return self.symbols[index]
+
+    def walk(self, words, lo, hi):
+        # The codewords that start in [lo, hi) given that one starts at lo
+        # (positions and symbol indexes), plus the position of the first
+        # codeword at or after hi
+        width = self.max_len
+        window_len = self.window_len
+
+        # Step 1: the 32 bits at every bit position from the byte holding lo
+        # (positions below are relative to that byte)
+        base = lo >> 3
+        bit_words = (words[base:(hi >> 3) + self.reach + 5, None] << np.arange(8, dtype=np.uint32)).ravel()
+        shift = np.uint32(32 - width)
+        lo, hi = lo - 8 * base, hi - 8 * base
+
+        def step(pos):
+            return pos + window_len[bit_words[pos] >> shift]
+
+        # Step 2: walk every segment from its first bit; only segment 0 is
+        # sure to start on a codeword boundary
+        n_seg = max(1, (hi - lo) // SEGMENT_BITS)
+        seg_start = lo + SEGMENT_BITS * np.arange(n_seg, dtype=np.int64)
+        seg_end = np.append(seg_start[1:], hi)
+        # Walkers run on past their segment until every one is done; holding
+        # them reach bits past hi keeps the exit of the last segment exact
+        is_start = np.zeros(len(bit_words), dtype=bool)
+        if self.step_len is None:
+            trail = walk_until(step, seg_start, lambda pos: pos >= seg_end, hi + self.reach)
+            inside = trail < seg_end
+            is_start[trail[inside]] = True
+            exits = trail[inside.sum(axis=0), np.arange(n_seg)]
+        else:
+            exits = self.leap_segments(bit_words, seg_start, seg_end, is_start)
+
+        # Step 3: a segment's true entry is the previous segment's exit; what
+        # its walk found before that is dropped, and a segment whose entry is
+        # not on its walk is re-walked from there until it meets the old walk
+        while True:
+            clear_ranges(is_start, seg_start[1:], exits[:-1])
+            ids = np.flatnonzero(~is_start[exits[:-1]]) + 1
+            if not len(ids):
+                break
+            entry, end = exits[ids - 1], seg_end[ids]
+            trail = walk_until(step, entry, lambda pos: (pos >= end) | is_start[pos], hi + self.reach)
+            inside = trail < end
+            joined = is_start[trail] & inside
+            new = inside & (np.cumsum(joined, axis=0) == 0)
+            meet = trail[new.sum(axis=0), np.arange(len(ids))]
+            # Walks that never met the old one leave the segment somewhere new
+            lost = ~joined.any(axis=0)
+            exits[ids[lost]] = meet[lost]
+            clear_ranges(is_start, entry, np.minimum(meet, end))
+            is_start[trail[new]] = True
+
+        positions = np.flatnonzero(is_start[:hi])
+        index = self.window_sym[bit_words[positions] >> shift]
+        return (8 * base + positions, index), 8 * base + exits[-1]
+
+    def leap_segments(self, bit_words, seg_start, seg_end, is_start):
+        # Step 2 for short codes: each step takes every whole codeword in a
+        # STEP_BITS-bit window, then the steps are expanded into codewords
+        step_shift = np.uint32(32 - STEP_BITS)
+        step_len = self.step_len
+
+        def leap(pos):
+            return pos + step_len[bit_words[pos] >> step_shift]
+
+        trail = walk_until(leap, seg_start, lambda pos: pos >= seg_end, seg_end[-1] + self.reach)
+        inside = trail < seg_end
+        # Drop the codewords of the last step that start past the segment end
+        room = np.minimum(seg_end - trail, STEP_BITS).clip(0)
+        starts = self.step_starts[bit_words[trail] >> step_shift] & ((1 << room) - 1)
+        # OR every step's start mask into a packed copy of is_start (a mask
+        # can straddle two 64-bit words)
+        pos, flags = trail[inside], starts[inside].astype(np.uint64)
+        shift = (pos & 63).astype(np.uint64)
+        packed = np.zeros(len(is_start) // 64 + 2, dtype="<u8")
+        np.bitwise_or.at(packed, pos >> 6, flags << shift)
+        np.bitwise_or.at(packed, (pos >> 6) + 1, (flags >> (np.uint64(63) - shift)) >> np.uint64(1))
+        is_start[:] = np.unpackbits(packed.view(np.uint8), bitorder="little")[:len(is_start)]
+
+        # The first codeword at or after the end follows the last one before it
+        last = inside.sum(axis=0) - 1, np.arange(len(seg_start))
+        last_start = trail[last] + np.frexp(starts[last])[1] - 1
+        return last_start + self.window_len[bit_words[last_start] >> np.uint32(32 - self.max_len)]
+
+
+def walk_until(step, pos, done, limit):
+    # Step every walker until done(pos) holds for all of them, holding any
+    # that reach limit there; returns every position visited (one row per
+    # step, one column per walker)
+    trail = [pos]
+    while True:
+        for _ in range(8):
+            pos = np.minimum(step(pos), limit)
+            trail.append(pos)
+        if done(pos).all():
+            return np.stack(trail)
+
+
+def clear_ranges(flags, lo, hi):
+    # flags[lo[i]:hi[i]] = False for every i
+    sizes = np.maximum(hi - lo, 0)
+    flags[np.repeat(lo - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())] = False
@@ -0,0 +1,146 @@
+#  Vectorized Huffman encoder
+#  - No Python loop per symbol: codeword values and lengths are gathered from
+#    lookup arrays, a cumulative sum of the lengths gives every codeword's
+#    bit offset, and the codewords are added into a uint64 word buffer
+#  - A codeword lands in the word holding its first bit; the part that does
+#    not fit spills into the next word. Codewords never overlap, so summing
+#    the ones that share a word (differences of a cumulative sum) is the same
+#    as OR-ing them
+#  - Several k-bit symbols are looked up at once: the table is indexed by
+#    GROUP_BITS input bits and holds the concatenated codewords of the
+#    symbols in them, as long as that stays within 64 bits. It is built on
+#    the first input of at least GROUP_MIN_BITS bits, so short inputs skip it
+#  - A fixed-length code over every block (what a Huffman code of single bits
+#    always is) maps each block to itself, so the input bits are the output
+#  - Neighbouring lookups are then merged pairwise (halving the item count
+#    each round) for as long as two of the longest still fit in 64 bits, so
+#    the cumulative-sum packing, the bulk of the time, runs on fewer items
+#  - Output is identical to writing every codeword with BitWriter.write
+#    (MSB first, zero padded to a whole byte)
+
+import numpy as np
+
+from .block_symbols import to_block_symbols
+from .canonical_huffman import canonical_code_values
+
+
+GROUP_BITS = 16           # input bits per table lookup (table of 2**GROUP_BITS entries)
+GROUP_MIN_BITS = 1 << 19  # shorter inputs are coded symbol by symbol (still vectorized);
+                          # building the table breaks even between 2**18 and 2**19 bits
+WORD_BITS = 64
+
+
+def pack_codes(aligned, lengths, start=0):
+    # aligned: codeword of every item shifted to the top of a uint64 (first bit
+    # = bit 63); lengths: 1 to 64 bits each; start: bit offset of the first
+    # codeword. Returns (uint8 array, end bit).
+    aligned = np.asarray(aligned, dtype=np.uint64)
+    if not len(aligned):
+        return np.zeros((start + 7) // 8, dtype=np.uint8), start
+    ends = np.cumsum(lengths, dtype=np.uint64)
+    if start:
+        ends += np.uint64(start)
+    total = int(ends[-1])
+    offsets = ends - lengths
+    bit = offsets & np.uint64(WORD_BITS - 1)
+    index = offsets >> np.uint64(6)
+
+    # Codewords are at most 64 bits, so every word from the first codeword's
+    # on has at least one codeword starting in it, and only the last of them
+    # can spill into the next word
+    last = np.append(np.flatnonzero(index[1:] != index[:-1]), len(aligned) - 1)
+    sums = np.cumsum(aligned >> bit)
+    words = np.zeros(int(index[-1]) + 2, dtype=np.uint64)
+    words[int(index[0]):-1] = np.diff(sums[last], prepend=np.uint64(0))
+    # (a << 1) << (63 - bit) == a << (64 - bit), and 0 when bit == 0
+    words[int(index[0]) + 1:] += (aligned[last] << np.uint64(1)) << (np.uint64(WORD_BITS - 1) - bit[last])
+    packed = words.astype(">u8").view(np.uint8)
+    return packed[:(total + 7) // 8], total
+
+
+def merge_rounds(max_len):
+    # Pairwise merges after which an item of codewords of up to max_len bits
+    # still fits in one word
+    return max(0, (WORD_BITS // max_len).bit_length() - 1)
+
+
+def merge_pairs(aligned, lengths):
+    # Items 2i and 2i+1 -> one item (their lengths must add up to 64 or less)
+    first_len = lengths[0::2]
+    return aligned[0::2] | (aligned[1::2] >> first_len), first_len + lengths[1::2]
+
+
+class HuffmanEncoder:
+    def __init__(self, lengths, block_size=1, group_bits=GROUP_BITS):
+        # lengths: symbol -> code length (canonical codes, as canonical_codes())
+        # group_bits=0: no multi-symbol table
+        k = self.block_size = block_size
+        # uint8 lengths (at most 64): the per-symbol gathers move 8x less data
+        self.lengths = np.zeros(1 << k, dtype=np.uint8)
+        for s, l in lengths.items():
+            self.lengths[s] = l
+        values = canonical_code_values(self.lengths)
+        self.aligned = values << (np.uint64(WORD_BITS) - self.lengths)
+        # Every block coded as itself: encoding only packs the input bits
+        self.identity = bool((self.lengths == k).all()) and bool((values == np.arange(1 << k)).all())
+
+        # Symbols per table lookup
+        max_len = max(int(self.lengths.max()), 1)
+        if max_len > WORD_BITS:
+            raise ValueError(f"Code length {max_len} does not fit in a {WORD_BITS}-bit word")
+        self.group = max(1, min(group_bits // k, WORD_BITS // max_len))
+        self.group_aligned = self.group_lengths = None
+        self.merges = merge_rounds(max_len)
+        self.group_merges = 0
+
+    def _build_group_table(self):
+        k, g = self.block_size, self.group
+        combined = np.arange(1 << (g * k), dtype=np.int64)
+        self.group_aligned = np.zeros(len(combined), dtype=np.uint64)
+        self.group_lengths = np.zeros(len(combined), dtype=np.uint8)
+        for t in range(g):
+            sub = (combined >> (k * (g - 1 - t))) & ((1 << k) - 1)
+            self.group_aligned |= self.aligned[sub] >> self.group_lengths
+            self.group_lengths += self.lengths[sub]
+        self.group_merges = merge_rounds(int(self.group_lengths.max()))
+
+    def codewords(self, bits):
+        # bits: whole number of blocks -> (aligned, lengths) items for pack_codes
+        k, g = self.block_size, self.group
+        if g > 1 and (self.group_aligned is not None or len(bits) >= GROUP_MIN_BITS):
+            if self.group_aligned is None:
+                self._build_group_table()
+            table, merges = (self.group_aligned, self.group_lengths), self.group_merges
+        else:
+            g, table, merges = 1, (self.aligned, self.lengths), self.merges
+        # Whole merged items first (g symbols per lookup, 2**merges lookups
+        # per item), then the few symbols left over one by one
+        cut = len(bits) - len(bits) % ((g * k) << merges)
+        items = to_block_symbols(bits[:cut], g * k)
+        aligned, lengths = table[0][items], table[1][items]
+        for _ in range(merges):
+            aligned, lengths = merge_pairs(aligned, lengths)
+        if cut < len(bits):
+            rest = to_block_symbols(bits[cut:], k)
+            aligned = np.concatenate([aligned, self.aligned[rest]])
+            lengths = np.concatenate([lengths, self.lengths[rest]])
+        return aligned, lengths
+
+    def encode(self, bits, writer=None):
+        # bits: whole number of blocks; writer: BitWriter whose bits (e.g. a
+        # header) go in front. Returns (bytes, bit length).
+        bits = np.asarray(bits, dtype=np.uint8)
+        if self.identity:
+            if writer is not None:
+                header = np.frombuffer(writer.getvalue(), dtype=np.uint8)
+                bits = np.concatenate([np.unpackbits(header, count=writer.bit_length()), bits])
+            return np.packbits(bits).tobytes(), len(bits)
+        aligned, lengths = self.codewords(bits)
+
+        if writer is None:
+            packed, total = pack_codes(aligned, lengths)
+            return packed.tobytes(), total
+        prefix = np.frombuffer(writer.getvalue(), dtype=np.uint8)
+        packed, total = pack_codes(aligned, lengths, writer.bit_length())
+        packed[:len(prefix)] |= prefix
+        return packed.tobytes(), total
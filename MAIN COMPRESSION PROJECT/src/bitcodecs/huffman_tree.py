@@ -0,0 +1,74 @@
+#  Huffman code lengths shared by every Huffman script
+#  - Works on a flat array of integer counts instead of a tree of Node objects:
+#    sort once, then the in-place two-queue merge (Moffat & Katajainen), which
+#    is O(n) after the sort, needs no recursion and no per-node allocation
+#  - Handles alphabets of 2^16..2^20 symbols (block sizes up to 20)
+#  - Canonical codes are then assigned from the lengths (canonical_huffman.py)
+
+import numpy as np
+
+
+def huffman_lengths(counts):
+    # counts: 1-D array indexed by symbol; returns an int array of code lengths,
+    # 0 for symbols with a zero count
+    counts = np.asarray(counts)
+    lengths = np.zeros(len(counts), dtype=np.int64)
+    present = np.flatnonzero(counts)
+    n = len(present)
+    if n == 0:
+        raise ValueError("Cannot build a codebook without symbols")
+    if n == 1:
+        lengths[present] = 1     # a lone symbol still needs a 1-bit code
+        return lengths
+
+    order = present[np.argsort(counts[present])]
+    A = counts[order].tolist()   # ascending weights; reused in place below
+    A.append(float("inf"))       # sentinel once the leaves run out
+
+    # Phase 1: two-queue merge. Leaves are A[leaf:n], internal nodes A[root:nxt];
+    # a consumed internal node's slot is overwritten with its parent's index
+    A[0] += A[1]
+    root, leaf = 0, 2
+    for nxt in range(1, n - 1):
+        r, l = A[root], A[leaf]
+        if r < l:
+            A[root] = nxt
+            root += 1
+            first = r
+        else:
+            leaf += 1
+            first = l
+        l = A[leaf]
+        if root < nxt:
+            r = A[root]
+            if r < l:
+                A[root] = nxt
+                root += 1
+                A[nxt] = first + r
+                continue
+        A[nxt] = first + l
+        leaf += 1
+
+    # Phase 2: parent indices -> depths of the n-1 internal nodes (pointer jumping)
+    parent = np.array(A[:n - 1], dtype=np.int64)
+    parent[n - 2] = n - 2
+    depth = np.ones(n - 1, dtype=np.int64)
+    depth[n - 2] = 0
+    while np.any(parent != n - 2):
+        depth += depth[parent]
+        parent = parent[parent]
+
+    # Phase 3: internal nodes per depth -> leaves per depth; the heaviest
+    # symbols take the shortest codes
+    internal = np.bincount(depth)
+    leaves = 2 * np.concatenate([[0], internal]) - np.concatenate([internal, [0]])
+    leaves[0] = 0
+    lengths[order] = np.repeat(np.arange(len(leaves)), leaves)[::-1]
+    return lengths
+
+
+def code_lengths(weights):
+    # weights: symbol -> count (or probability); returns symbol -> code length
+    symbols = [s for s in weights if weights[s] > 0]
+    lengths = huffman_lengths([weights[s] for s in symbols])
+    return dict(zip(symbols, lengths.tolist()))
@@ -0,0 +1,136 @@
+#  Per-stage instrumentation for the codec pipelines
+#  - A script marks where each stage begins (load, count, build, encode,
+#    decode, verify, write); a stage ends where the next one begins
+#  - Off by default: stage() and done() then return at once, so the scripts
+#    run as before at the cost of one attribute check per stage
+#  - Switched on with the BITCODECS_INSTRUMENT environment variable, a comma
+#    separated list of:
+#      time            wall time and CPU time per stage
+#      memory          also tracemalloc peak per stage (slows Python code down)
+#      profile=STAGE   cProfile of that stage, dumped to results/profiles/
+#  - done() prints a table and writes the same numbers as JSON to
+#    results/instrumentation/<pipeline>.json
+#
+#  Usage:
+#    BITCODECS_INSTRUMENT=time python huffman_blocked.py 4
+#    BITCODECS_INSTRUMENT=memory,profile=encode python arithmetic_compression.py
+
+import json
+import os
+import time
+
+
+ENV_VAR = "BITCODECS_INSTRUMENT"
+
+base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPORT_DIR = os.path.join(base_dir, "results", "instrumentation")
+PROFILE_DIR = os.path.join(base_dir, "results", "profiles")
+
+
+def parse_options(value):
+    # "memory,profile=encode" -> (True, True, "encode")
+    enabled, memory, profile_stage = False, False, None
+    for option in filter(None, (part.strip() for part in (value or "").split(","))):
+        enabled = True
+        if option == "memory":
+            memory = True
+        elif option.startswith("profile="):
+            profile_stage = option.split("=", 1)[1]
+        elif option not in ("1", "time", "on"):
+            raise ValueError(f"Unknown {ENV_VAR} option: {option}")
+    return enabled, memory, profile_stage
+
+
+class Instrument:
+    def __init__(self, pipeline, options=None):
+        self.pipeline = pipeline
+        self.enabled, self.memory, self.profile_stage = parse_options(
+            os.environ.get(ENV_VAR) if options is None else options)
+        self.stages = []
+        self.current = None
+        self.profiler = None
+        if self.enabled and self.memory:
+            import tracemalloc
+            tracemalloc.start()
+
+    # Step 1: Stage boundaries
+
+    def stage(self, name):
+        if not self.enabled:
+            return
+        self._close()
+        if name == self.profile_stage:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self.current = {"stage": name}
+        if self.memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            self.current["mem_start"] = tracemalloc.get_traced_memory()[0]
+        self.current["cpu"] = time.process_time()
+        self.current["wall"] = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def _close(self):
+        if self.current is None:
+            return
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if self.profiler is not None:
+            self.profiler.disable()
+            self._dump_profile()
+        record = {"stage": self.current["stage"],
+                  "wall_s": wall - self.current["wall"],
+                  "cpu_s": cpu - self.current["cpu"]}
+        if self.memory:
+            import tracemalloc
+            record["peak_mb"] = (tracemalloc.get_traced_memory()[1] - self.current["mem_start"]) / 2 ** 20
+        self.stages.append(record)
+        self.current = None
+
+    def _dump_profile(self):
+        import pstats
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{self.pipeline}-{self.current['stage']}.prof")
+        self.profiler.dump_stats(path)
+        print(f"\ncProfile of stage '{self.current['stage']}' saved to {path}")
+        pstats.Stats(self.profiler).sort_stats("cumulative").print_stats(12)
+        self.profiler = None
+
+    # Step 2: Reports
+
+    def report(self):
+        total_wall = sum(s["wall_s"] for s in self.stages)
+        return {"pipeline": self.pipeline, "memory": self.memory,
+                "total_wall_s": total_wall, "stages": self.stages}
+
+    def table(self):
+        report = self.report()
+        total = report["total_wall_s"] or 1.0
+        header = f"{'stage':<10} {'wall s':>9} {'cpu s':>9} {'share':>6}"
+        if self.memory:
+            header += f" {'peak MB':>8}"
+        lines = [f"--- STAGE TIMINGS ({self.pipeline}) ---", header]
+        for s in self.stages:
+            line = f"{s['stage']:<10} {s['wall_s']:>9.4f} {s['cpu_s']:>9.4f} {100 * s['wall_s'] / total:>5.1f}%"
+            if self.memory:
+                line += f" {s['peak_mb']:>8.2f}"
+            lines.append(line)
+        lines.append(f"{'total':<10} {report['total_wall_s']:>9.4f}")
+        return "\n".join(lines)
+
+    def done(self):
+        # Ends the last stage, prints the table and writes the JSON report
+        if not self.enabled:
+            return None
+        self._close()
+        if self.memory:
+            import tracemalloc
+            tracemalloc.stop()
+        print("\n" + self.table())
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        path = os.path.join(REPORT_DIR, f"{self.pipeline}.json")
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
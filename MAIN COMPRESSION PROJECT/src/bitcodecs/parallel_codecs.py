@@ -0,0 +1,125 @@
+#  Multi-core chunked encoding and decoding
+#  - The input is split into independently coded chunks (frames of stream_codecs)
+#  - Chunks are encoded and decoded across a ProcessPoolExecutor
+#  - A chunk table records every chunk's bit offset, bit length and payload size,
+#    so decoding can run all chunks at once and reassemble them in order
+#  - The codebook / frequency table is either shared (stored once) or per chunk
+
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .bitio import BitWriter, BitReader
+from .block_symbols import to_block_symbols, block_counts
+from .canonical_huffman import write_code_lengths, read_code_lengths
+from .stream_codecs import (CHUNK_BITS, FREQS, HUFFMAN, ARITHMETIC, huffman_code_lengths, bit_frequencies,
+                            encode_huffman_frame, decode_huffman_frame,
+                            encode_arithmetic_frame, decode_arithmetic_frame)
+
+
+MAGIC = b"PCHK"
+CONTAINER_HEADER = struct.Struct("<4sBBBI")   # magic, codec id, block size, shared flag, chunks
+CHUNK_ENTRY = struct.Struct("<QII")           # bit offset, bits in chunk, payload bytes
+MODEL_SIZE = struct.Struct("<I")              # bytes of the shared model
+
+
+# Step 1: Work done inside the worker processes
+
+def _encode_chunk(job):
+    codec, block_size, bits, model = job
+    if codec == HUFFMAN:
+        return encode_huffman_frame(bits, block_size, model)
+    return encode_arithmetic_frame(bits, model)
+
+
+def _decode_chunk(job):
+    codec, block_size, payload, n_bits, model = job
+    if codec == HUFFMAN:
+        return decode_huffman_frame(payload, n_bits, block_size, model)
+    return decode_arithmetic_frame(payload, n_bits, model)
+
+
+def _run(fn, jobs, workers):
+    # workers=1 stays in-process, so the single-core baseline pays no IPC cost
+    if workers == 1:
+        return [fn(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, jobs))
+
+
+# Step 2: Shared model (one codebook / frequency table for all chunks)
+
+def build_shared_model(codec, bits, block_size):
+    if codec == HUFFMAN:
+        padded = np.concatenate([bits, np.zeros(-len(bits) % block_size, dtype=np.uint8)])
+        lengths = huffman_code_lengths(block_counts(to_block_symbols(padded, block_size), block_size), block_size)
+        out = BitWriter()
+        write_code_lengths(out, [lengths.get(s, 0) for s in range(1 << block_size)])
+        return lengths, out.getvalue()
+    freqs = bit_frequencies(bits)
+    return freqs, FREQS.pack(freqs.get(0, 0), freqs.get(1, 0))
+
+
+def read_shared_model(codec, raw, block_size):
+    if codec == HUFFMAN:
+        header = read_code_lengths(BitReader(raw), 1 << block_size)
+        return {s: l for s, l in enumerate(header) if l > 0}
+    f0, f1 = FREQS.unpack(raw)
+    return {s: f for s, f in ((0, f0), (1, f1)) if f > 0}
+
+
+# Step 3: Public entry points
+
+def encode_parallel(bits, codec=HUFFMAN, block_size=1, workers=4, chunk_bits=CHUNK_BITS, shared_model=False):
+    bits = np.asarray(bits, dtype=np.uint8)
+    if codec == ARITHMETIC:
+        block_size = 1
+    chunk_bits = max(1, chunk_bits // block_size) * block_size
+    offsets = list(range(0, len(bits), chunk_bits))
+
+    model, model_raw = None, b""
+    if shared_model and len(bits):
+        model, model_raw = build_shared_model(codec, bits, block_size)
+
+    jobs = [(codec, block_size, bits[start:start + chunk_bits], model) for start in offsets]
+    payloads = _run(_encode_chunk, jobs, workers)
+
+    parts = [CONTAINER_HEADER.pack(MAGIC, codec, block_size, int(bool(model_raw)), len(payloads))]
+    if model_raw:
+        parts.append(MODEL_SIZE.pack(len(model_raw)) + model_raw)
+    for start, payload in zip(offsets, payloads):
+        parts.append(CHUNK_ENTRY.pack(start, min(chunk_bits, len(bits) - start), len(payload)))
+    parts.extend(payloads)
+    return b"".join(parts)
+
+
+def decode_parallel(data, workers=4):
+    data = memoryview(data)
+    magic, codec, block_size, shared, n_chunks = CONTAINER_HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Input is not a parallel chunk container")
+    pos = CONTAINER_HEADER.size
+
+    model = None
+    if shared:
+        (size,) = MODEL_SIZE.unpack_from(data, pos)
+        pos += MODEL_SIZE.size
+        model = read_shared_model(codec, bytes(data[pos:pos + size]), block_size)
+        pos += size
+
+    entries = [CHUNK_ENTRY.unpack_from(data, pos + i * CHUNK_ENTRY.size) for i in range(n_chunks)]
+    pos += n_chunks * CHUNK_ENTRY.size
+
+    jobs = []
+    for _, n_bits, size in entries:
+        jobs.append((codec, block_size, bytes(data[pos:pos + size]), n_bits, model))
+        pos += size
+    chunks = _run(_decode_chunk, jobs, workers)
+
+    # Chunks come back in submission order; offsets say where each one goes
+    total = sum(n_bits for _, n_bits, _ in entries)
+    bits = np.empty(total, dtype=np.uint8)
+    for (offset, n_bits, _), chunk in zip(entries, chunks):
+        bits[offset:offset + n_bits] = chunk
+    return bits
@@ -0,0 +1,167 @@
+#  Random-access container for Huffman and arithmetic coded bits
+#  - The input is coded in segments of SEGMENT_SYMBOLS symbols (blocks of
+#    block_size bits for Huffman, single bits for arithmetic); every segment
+#    starts a fresh code, so it is a sync point the decoder can start from
+#  - One shared model (code lengths / frequency table) for all segments
+#  - Index: per segment its offset and size in the data section and the CRC32
+#    of its coded bytes; segment i always holds symbols i*N .. (i+1)*N - 1, so
+#    a symbol offset turns into a segment (and data offset) with one division
+#  - decode_range() decodes only the segments that overlap the range;
+#    verify() checks every CRC without decoding anything
+#  - The header, model and index have their own CRC32
+#
+#  Usage:
+#    python -m bitcodecs.random_access encode huffman --block-size 4 ../data/bernoulli_bits.bin out.rac
+#    python -m bitcodecs.random_access verify out.rac
+#    python -m bitcodecs.random_access range out.rac 5000 64
+
+import argparse
+import struct
+import zlib
+
+import numpy as np
+
+from .codebook_cache import CodebookCache
+from .parallel_codecs import build_shared_model, read_shared_model
+from .stream_codecs import (HUFFMAN, ARITHMETIC, encode_huffman_frame, decode_huffman_frame,
+                            encode_arithmetic_frame, decode_arithmetic_frame)
+
+
+MAGIC = b"RACC"
+SEGMENT_SYMBOLS = 4096
+RA_HEADER = struct.Struct("<4sBBIQII")    # magic, codec id, block size, symbols per segment, bits, segments, model bytes
+SEGMENT_ENTRY = struct.Struct("<QII")     # data offset (bytes), payload bytes, CRC32 of the payload
+CRC = struct.Struct("<I")                 # CRC32 of header + model + index
+
+
+# Step 1: Encoding
+
+def encode_container(bits, codec=HUFFMAN, block_size=1, segment_symbols=SEGMENT_SYMBOLS):
+    bits = np.asarray(bits, dtype=np.uint8)
+    if codec == ARITHMETIC:
+        block_size = 1
+    segment_bits = segment_symbols * block_size
+
+    model, model_raw = None, b""
+    if len(bits):
+        model, model_raw = build_shared_model(codec, bits, block_size)
+
+    cache = CodebookCache(capacity=4)
+    payloads = []
+    for start in range(0, len(bits), segment_bits):
+        chunk = bits[start:start + segment_bits]
+        if codec == HUFFMAN:
+            payloads.append(encode_huffman_frame(chunk, block_size, model, cache=cache))
+        else:
+            payloads.append(encode_arithmetic_frame(chunk, model))
+
+    header = RA_HEADER.pack(MAGIC, codec, block_size, segment_symbols, len(bits), len(payloads), len(model_raw))
+    index, offset = [], 0
+    for payload in payloads:
+        index.append(SEGMENT_ENTRY.pack(offset, len(payload), zlib.crc32(payload)))
+        offset += len(payload)
+    meta = header + model_raw + b"".join(index)
+    return meta + CRC.pack(zlib.crc32(meta)) + b"".join(payloads)
+
+
+# Step 2: Reading (only the index is parsed up front)
+
+class RandomAccessReader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        (magic, self.codec, self.block_size, self.segment_symbols,
+         self.n_bits, self.n_segments, model_size) = RA_HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError("Input is not a random-access container")
+        pos = RA_HEADER.size
+        model_raw = bytes(self.data[pos:pos + model_size])
+        pos += model_size
+        self.index = [SEGMENT_ENTRY.unpack_from(self.data, pos + i * SEGMENT_ENTRY.size)
+                      for i in range(self.n_segments)]
+        pos += self.n_segments * SEGMENT_ENTRY.size
+        (meta_crc,) = CRC.unpack_from(self.data, pos)
+        if zlib.crc32(self.data[:pos]) != meta_crc:
+            raise ValueError("Container header or index is corrupt (CRC mismatch)")
+        self.data_start = pos + CRC.size
+        self.segment_bits = self.segment_symbols * self.block_size
+        self.model = read_shared_model(self.codec, model_raw, self.block_size) if model_size else None
+        self.cache = CodebookCache(capacity=4)
+
+    def segment_payload(self, i):
+        offset, size, _ = self.index[i]
+        start = self.data_start + offset
+        return self.data[start:start + size]
+
+    def segment_ok(self, i):
+        return zlib.crc32(self.segment_payload(i)) == self.index[i][2]
+
+    def verify(self):
+        # Indexes of the segments whose CRC does not match (empty list: intact)
+        return [i for i in range(self.n_segments) if not self.segment_ok(i)]
+
+    def decode_segment(self, i):
+        if not self.segment_ok(i):
+            raise ValueError(f"Segment {i} is corrupt (CRC mismatch)")
+        payload = bytes(self.segment_payload(i))
+        n_bits = min(self.segment_bits, self.n_bits - i * self.segment_bits)
+        if self.codec == HUFFMAN:
+            return decode_huffman_frame(payload, n_bits, self.block_size, self.model, cache=self.cache)
+        return decode_arithmetic_frame(payload, n_bits, self.model)
+
+    def decode_range(self, start, count):
+        # Bits start .. start + count - 1 of the original input
+        if start < 0 or count < 0 or start + count > self.n_bits:
+            raise ValueError(f"Range {start}+{count} is outside the {self.n_bits} coded bits")
+        if count == 0:
+            return np.zeros(0, dtype=np.uint8)
+        first = start // self.segment_bits
+        last = (start + count - 1) // self.segment_bits
+        bits = np.concatenate([self.decode_segment(i) for i in range(first, last + 1)])
+        offset = start - first * self.segment_bits
+        return bits[offset:offset + count]
+
+    def decode_all(self):
+        return self.decode_range(0, self.n_bits)
+
+
+def decode_container(data):
+    return RandomAccessReader(data).decode_all()
+
+
+# Step 3: Command line
+
+if __name__ == "__main__":
+    from .bit_dataset import load_bits
+
+    parser = argparse.ArgumentParser(description="Random-access compressed container")
+    sub = parser.add_subparsers(dest="command", required=True)
+    enc = sub.add_parser("encode")
+    enc.add_argument("codec", choices=["huffman", "arithmetic"])
+    enc.add_argument("input", help=".bin dataset")
+    enc.add_argument("output")
+    enc.add_argument("--block-size", type=int, default=1)
+    enc.add_argument("--segment-symbols", type=int, default=SEGMENT_SYMBOLS)
+    ver = sub.add_parser("verify")
+    ver.add_argument("input")
+    rng = sub.add_parser("range")
+    rng.add_argument("input")
+    rng.add_argument("start", type=int)
+    rng.add_argument("count", type=int)
+    args = parser.parse_args()
+
+    if args.command == "encode":
+        codec = HUFFMAN if args.codec == "huffman" else ARITHMETIC
+        data = encode_container(load_bits(args.input), codec, args.block_size, args.segment_symbols)
+        with open(args.output, "wb") as f:
+            f.write(data)
+        print(f"Wrote {len(data)} bytes to {args.output}")
+    else:
+        with open(args.input, "rb") as f:
+            reader = RandomAccessReader(f.read())
+        if args.command == "verify":
+            bad = reader.verify()
+            print(f"{reader.n_segments} segments, {reader.n_bits} bits: "
+                  + ("all CRCs match" if not bad else f"corrupt segments {bad}"))
+        else:
+            bits = reader.decode_range(args.start, args.count)
+            print("".join(map(str, bits.tolist())))
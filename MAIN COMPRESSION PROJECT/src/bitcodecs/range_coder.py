@@ -0,0 +1,149 @@
+#  Integer range coder (32-bit range, carry propagation through a cached byte)
+#  - Replaces the Decimal(prec=500) interval narrowing of the arithmetic scripts
+#  - Constant work per symbol, so it scales to millions of bits
+#  - Produces a real byte stream; its length is the true encoded size
+
+from .bitio import BitWriter, BitReader
+
+
+TOP = 1 << 24             # renormalize once the range drops below this
+MASK32 = 0xFFFFFFFF
+FREQ_BITS = 15            # total of the quantized frequency table is 2**FREQ_BITS
+FLUSH_BYTES = 4           # zero bytes the encoder may drop from the end
+
+
+# Step 1: Quantizing symbol counts into an integer frequency table
+
+def quantize_counts(counts, freq_bits=FREQ_BITS):
+    # Every symbol that occurs keeps a frequency of at least 1, the rounding
+    # error is absorbed by the most frequent symbol.
+    total_freq = 1 << freq_bits
+    symbols = sorted(s for s in counts if counts[s] > 0)
+    if not symbols:
+        raise ValueError("Cannot build a frequency table from an empty sequence")
+    if len(symbols) > total_freq // 2:
+        raise ValueError(f"Too many symbols ({len(symbols)}) for a {freq_bits}-bit frequency table")
+
+    n = sum(counts[s] for s in symbols)
+    freqs = {s: max(1, (counts[s] * total_freq) // n) for s in symbols}
+    top = max(symbols, key=lambda s: freqs[s])
+    freqs[top] += total_freq - sum(freqs.values())
+    while freqs[top] < 1:
+        # Too many symbols were bumped up to 1, take the excess from the others
+        for s in symbols:
+            if s != top and freqs[s] > 1 and freqs[top] < 1:
+                freqs[s] -= 1
+                freqs[top] += 1
+    return freqs
+
+
+def build_intervals(freqs):
+    # symbol -> (cumulative frequency, frequency)
+    intervals = {}
+    cum = 0
+    for sym in sorted(freqs):
+        intervals[sym] = (cum, freqs[sym])
+        cum += freqs[sym]
+    return intervals, cum
+
+
+# Step 2: Encoder
+
+class RangeEncoder:
+    def __init__(self):
+        self.low = 0              # up to 33 bits, bit 32 is the pending carry
+        self.range = MASK32
+        self.cache = 0            # last byte not yet written (may still receive a carry)
+        self.cache_size = 1       # cached byte + number of pending 0xFF bytes
+        self.out = BitWriter()
+
+    def encode(self, cum_freq, freq, total_freq):
+        r = self.range // total_freq
+        self.low += r * cum_freq
+        self.range = r * freq
+        while self.range < TOP:
+            self.range <<= 8
+            self._shift_low()
+
+    def _shift_low(self):
+        if self.low < 0xFF000000 or self.low > MASK32:
+            carry = self.low >> 32
+            byte = self.cache
+            while True:
+                self.out.write((byte + carry) & 0xFF, 8)
+                byte = 0xFF
+                self.cache_size -= 1
+                if self.cache_size == 0:
+                    break
+            self.cache = (self.low >> 24) & 0xFF
+        self.cache_size += 1
+        self.low = (self.low << 8) & MASK32
+
+    def finish(self):
+        # Pick the value in [low, low + range) with the most trailing zero
+        # bytes, the decoder reads missing bytes as zero so they are dropped
+        zeros = 0
+        for bits in (32, 24, 16, 8):
+            mask = (1 << bits) - 1
+            value = (self.low + mask) & ~mask
+            if value < self.low + self.range:
+                self.low = value
+                zeros = bits // 8
+                break
+        for _ in range(5):
+            self._shift_low()
+        # The first byte is always 0 (the interval never leaves [0, 1)); only
+        # the flushed zero bytes are dropped, so the decoder never needs more
+        # than FLUSH_BYTES bytes past the end
+        out = self.out.getvalue()
+        return out[1:len(out) - zeros]
+
+
+# Step 3: Decoder
+
+class RangeDecoder:
+    def __init__(self, data):
+        self.reader = BitReader(data)
+        self.end = self.reader.bit_length + 8 * FLUSH_BYTES
+        self.range = MASK32
+        self.code = self.reader.read(32)
+
+    def get_freq(self, total_freq):
+        self.range //= total_freq
+        return min(self.code // self.range, total_freq - 1)
+
+    def decode(self, cum_freq, freq):
+        self.code -= cum_freq * self.range
+        self.range *= freq
+        while self.range < TOP:
+            self.code = ((self.code << 8) | self.reader.read(8)) & MASK32
+            self.range <<= 8
+            if self.reader.pos > self.end:
+                # More symbols were asked for than the data holds
+                raise ValueError("Range coder data ends before the last symbol")
+
+
+# Step 4: Whole-sequence helpers used by the scripts
+
+def encode_sequence(sequence, intervals, total_freq):
+    enc = RangeEncoder()
+    for sym in sequence:
+        cum, freq = intervals[sym]
+        enc.encode(cum, freq, total_freq)
+    return enc.finish()
+
+
+def decode_sequence(data, count, intervals, total_freq):
+    # Direct lookup from a cumulative frequency to its symbol
+    lookup = [None] * total_freq
+    for sym, (cum, freq) in intervals.items():
+        lookup[cum:cum + freq] = [sym] * freq
+
+    dec = RangeDecoder(data)
+    decoded = []
+    for _ in range(count):
+        sym = lookup[dec.get_freq(total_freq)]
+        cum, freq = intervals[sym]
+        dec.decode(cum, freq)
+        decoded.append(sym)
+    return decoded
@@ -0,0 +1,158 @@
+#  Interleaved rANS (range asymmetric numeral system) entropy coder
+#  - Same probability model as the range coder: integer counts quantized to a
+#    frequency table of total 2**FREQ_BITS (quantize_counts)
+#  - Table driven: decoding looks the symbol up in a slot -> symbol table
+#  - L independent 32-bit states (lanes) code symbols i, i+L, ... side by side;
+#    every NumPy operation acts on all lanes at once, so the Python-level loop
+#    runs once per L symbols
+#  - L follows the size of the coded data: about one lane per LANE_BITS output
+#    bits (up to MAX_LANES), so big frames get many lanes and few loop steps,
+#    while the flushed 32-bit lane states stay under ~1% of the output and a
+#    short frame is not padded out with unused lanes
+#  - 16-bit renormalization: at most one word in or out per symbol and lane
+#  - Output: L final states followed by the words in decoding order
+
+import struct
+
+import numpy as np
+
+from .block_symbols import to_block_symbols, from_block_symbols, block_counts
+from .range_coder import FREQ_BITS, quantize_counts
+
+
+LANE_BITS = 1 << 12       # coded bits per lane: one 32-bit state flushed per 4 kbit
+MAX_LANES = 4096
+STATE_LOW = 1 << 16       # states live in [STATE_LOW, 2**32)
+WORD_BITS = 16
+
+RANS_HEADER = struct.Struct("<BH")     # block size, lanes
+
+
+# Step 1: Model tables
+
+def frequency_table(counts, alphabet_size, freq_bits=FREQ_BITS):
+    # counts: symbol -> count (Counter, dict or array); returns a uint64 array
+    # of quantized frequencies indexed by symbol
+    if not isinstance(counts, dict):
+        counts = {s: int(c) for s, c in enumerate(counts) if c > 0}
+    freqs = np.zeros(alphabet_size, dtype=np.uint64)
+    for sym, f in quantize_counts(counts, freq_bits).items():
+        freqs[sym] = f
+    return freqs
+
+
+def model_tables(freqs, freq_bits=FREQ_BITS):
+    # int64 throughout: states stay below 2**32, and signed arrays index
+    # (slot -> symbol lookups) faster than uint64 ones
+    freqs = np.asarray(freqs).astype(np.int64)
+    cum = np.concatenate([[0], np.cumsum(freqs)[:-1]]).astype(np.int64)
+    # slot -> symbol for every one of the 2**freq_bits slots
+    slots = np.repeat(np.arange(len(freqs)), freqs)
+    if len(slots) != 1 << freq_bits:
+        raise ValueError(f"Frequencies must sum to 2**{freq_bits}")
+    return freqs, cum, slots
+
+
+def lane_count(freqs, count, freq_bits=FREQ_BITS):
+    # Lanes for `count` symbols: the model's entropy estimates the coded size
+    probs = np.asarray(freqs, dtype=np.float64) / (1 << freq_bits)
+    probs = probs[probs > 0]
+    coded_bits = count * float(-(probs * np.log2(probs)).sum())
+    return int(max(1, min(MAX_LANES, count, coded_bits // LANE_BITS)))
+
+
+# Step 2: Encoding
+
+def encode_rans(symbols, freqs, lanes=None, freq_bits=FREQ_BITS):
+    # lanes=None: lane_count(); the decoder must be given the same number
+    freqs, cum, _ = model_tables(freqs, freq_bits)
+    symbols = np.asarray(symbols, dtype=np.int64)
+    if lanes is None:
+        lanes = lane_count(freqs, len(symbols), freq_bits)
+    steps = -(-len(symbols) // lanes)
+
+    # Pad the last step with the most frequent symbol; the decoder drops it
+    padded = np.full(steps * lanes, int(np.argmax(freqs)), dtype=np.int64)
+    padded[:len(symbols)] = symbols
+    padded = padded.reshape(steps, lanes)
+
+    x = np.full(lanes, STATE_LOW, dtype=np.int64)
+    scale = freq_bits
+    x_max_shift = 2 * WORD_BITS - freq_bits
+    word_shift = WORD_BITS
+    word_mask = (1 << WORD_BITS) - 1
+
+    # Frequency, renormalization limit and start of every symbol, looked up for
+    # the whole frame at once instead of once per step
+    f_all, c_all = freqs[padded], cum[padded]
+    limit_all = f_all << x_max_shift
+
+    # rANS is last-in first-out: encode the steps backwards. Every step keeps
+    # the low word of all lanes plus which lanes emitted it; the emitted words,
+    # read row by row, are then already in forward (decoding) order
+    low_words = np.empty((steps, lanes), dtype=np.uint16)
+    emitted = np.empty((steps, lanes), dtype=bool)
+    for t in range(steps - 1, -1, -1):
+        full = x >= limit_all[t]
+        emitted[t] = full
+        low_words[t] = x & word_mask
+        x = np.where(full, x >> word_shift, x)
+        q, r = np.divmod(x, f_all[t])
+        x = (q << scale) + r + c_all[t]
+
+    return x.astype(np.uint32).tobytes() + low_words[emitted].tobytes()
+
+
+# Step 3: Decoding
+
+def decode_rans(data, count, freqs, lanes, freq_bits=FREQ_BITS):
+    freqs, cum, slots = model_tables(freqs, freq_bits)
+    steps = -(-count // lanes)
+
+    x = np.frombuffer(data, dtype=np.uint32, count=lanes).astype(np.int64)
+    words = np.frombuffer(data, dtype=np.uint16, offset=4 * lanes).astype(np.int64)
+    scale = freq_bits
+    slot_mask = (1 << freq_bits) - 1
+    word_shift = WORD_BITS
+    # Per slot: the frequency of its symbol and slot - start of that symbol
+    slot_freq = freqs[slots]
+    slot_bias = np.arange(1 << freq_bits) - cum[slots]
+
+    out = np.empty((steps, lanes), dtype=np.int64)
+    pos = 0
+    for t in range(steps):
+        slot = x & slot_mask
+        out[t] = slots[slot]
+        x = slot_freq[slot] * (x >> scale) + slot_bias[slot]
+        low = np.flatnonzero(x < STATE_LOW)
+        if len(low):
+            x[low] = (x[low] << word_shift) | words[pos:pos + len(low)]
+            pos += len(low)
+    return out.ravel()[:count]
+
+
+# Step 4: Self-contained frames of bits (frequency table in the header)
+
+def encode_rans_frame(bits, block_size=1, lanes=None):
+    k = block_size
+    bits = np.concatenate([bits, np.zeros(-len(bits) % k, dtype=np.uint8)])
+    symbols = to_block_symbols(bits, k)
+    if len(symbols) == 0:
+        return RANS_HEADER.pack(k, 0)
+    freqs = frequency_table(block_counts(symbols, k), 1 << k)
+    if lanes is None:
+        lanes = lane_count(freqs, len(symbols))
+    header = RANS_HEADER.pack(k, lanes)
+    return header + freqs.astype(np.uint16).tobytes() + encode_rans(symbols, freqs, lanes)
+
+
+def decode_rans_frame(payload, n_bits):
+    k, lanes = RANS_HEADER.unpack_from(payload, 0)
+    if n_bits == 0:
+        return np.zeros(0, dtype=np.uint8)
+    if lanes == 0:
+        raise ValueError("rANS frame has no lanes for its symbols")
+    table_end = RANS_HEADER.size + 2 * (1 << k)
+    freqs = np.frombuffer(payload[RANS_HEADER.size:table_end], dtype=np.uint16)
+    symbols = decode_rans(payload[table_end:], -(-n_bits // k), freqs, lanes)
+    return from_block_symbols(symbols, k)[:n_bits]
@@ -0,0 +1,96 @@
+#  Machine-readable results store
+#  - Every codec run is stored as JSON, keyed by a hash of the input bits,
+#    the codec name, its parameters and the code version (a hash of the source
+#    of the script and codec modules that produced it)
+#  - A rerun with the same key is served from the store instead of re-encoding;
+#    once the code changes the key does too, and the new result replaces the
+#    old one (same input, codec and parameters)
+#  - visualize_results.py reads its numbers from here
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+base_dir = os.path.dirname(os.path.dirname(SRC_DIR))
+STORE_PATH = os.path.join(base_dir, "results", "results_store.json")
+
+
+def data_hash(bits):
+    bits = np.asarray(bits, dtype=np.uint8)
+    return packed_data_hash(np.packbits(bits), len(bits))
+
+
+def packed_data_hash(packed, n_bits, chunk_bytes=1 << 20):
+    # Same digest as data_hash() on the unpacked bits, read chunk by chunk;
+    # the padding bits of the last byte are cleared first
+    packed = np.asarray(packed, dtype=np.uint8)
+    nbytes = (n_bits + 7) // 8
+    h = hashlib.sha256()
+    h.update(int(n_bits).to_bytes(8, "little"))
+    whole = nbytes - (n_bits % 8 != 0)
+    for start in range(0, whole, chunk_bytes):
+        h.update(packed[start:min(start + chunk_bytes, whole)].tobytes())
+    if whole < nbytes:
+        h.update(bytes([int(packed[whole]) & (0xFF << (8 - n_bits % 8)) & 0xFF]))
+    return h.hexdigest()
+
+
+def code_version(*modules):
+    # modules: names of modules in this folder ("huffman_encoder") or paths
+    # (a script's __file__); line endings do not count
+    h = hashlib.sha256()
+    for module in modules:
+        path = module if module.endswith(".py") else os.path.join(SRC_DIR, module + ".py")
+        with open(path, "rb") as f:
+            h.update(f.read().replace(b"\r\n", b"\n"))
+    return h.hexdigest()[:16]
+
+
+def make_key(input_hash, codec, params, version=None):
+    blob = json.dumps({"input": input_hash, "codec": codec, "params": params, "version": version}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResultsStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.records = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.records = json.load(f)
+
+    def key(self, bits, codec, params, version=None):
+        # Returns (key, input hash) for a run of `codec` with `params` on `bits`;
+        # version: code_version() of the code doing the run
+        input_hash = data_hash(bits)
+        return make_key(input_hash, codec, params, version), input_hash
+
+    def get(self, key):
+        record = self.records.get(key)
+        return None if record is None else record["metrics"]
+
+    def put(self, key, input_hash, codec, params, metrics, save=True, version=None):
+        # save=False batches many puts into one later save() (sweep.py).
+        # Records of the same run made by another code version are dropped
+        self.records = {k: r for k, r in self.records.items()
+                        if not (r["input"] == input_hash and r["codec"] == codec and r["params"] == params)}
+        self.records[key] = {"input": input_hash, "codec": codec, "params": params, "version": version,
+                             "metrics": metrics}
+        if save:
+            self.save()
+
+    def query(self, input_hash=None, codec=None):
+        return [r for r in self.records.values()
+                if (input_hash is None or r["input"] == input_hash)
+                and (codec is None or r["codec"] == codec)]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.records, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
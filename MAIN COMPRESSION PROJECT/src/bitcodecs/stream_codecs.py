@@ -0,0 +1,390 @@
+#  Streaming, constant-memory encode/decode over file objects
+#  - Input: packed bits (8 per byte, first bit = MSB), e.g. a .bin dataset payload
+#  - The input is coded in frames of CHUNK_BITS bits, each frame carries its own
+#    codebook (Huffman), frequency table (arithmetic, rANS) or Rice parameter, so one pass is enough
+#    (adaptive Huffman needs none: its model carries over from frame to frame)
+#    and memory use depends on the frame size only, never on the input size
+#
+#  Usage:
+#    python -m bitcodecs.stream_codecs encode huffman --block-size 3 ../data/bernoulli_bits.bin out.huf
+#    python -m bitcodecs.stream_codecs decode out.huf decoded.bits
+#    (--cache FILE keeps Huffman / arithmetic models in a warm-start file across runs)
+
+import argparse
+import io
+import struct
+from collections import Counter
+
+import numpy as np
+
+from .adaptive_huffman import (AdaptiveHuffmanEncoder, AdaptiveHuffmanDecoder,
+                               encode_adaptive_frame, decode_adaptive_frame)
+from .bitio import BitWriter, BitReader
+from .block_symbols import to_block_symbols, from_block_symbols, block_counts
+from .canonical_huffman import package_merge, canonical_codes, write_code_lengths, read_code_lengths
+from .golomb_rice import RICE_HEADER, encode_rice, decode_rice
+from .rans import RANS_HEADER, encode_rans_frame, decode_rans_frame
+from .huffman_decoder import HuffmanDecoder
+from .huffman_encoder import HuffmanEncoder
+from .huffman_tree import huffman_lengths
+from .range_coder import quantize_counts, build_intervals, encode_sequence, decode_sequence
+
+
+CHUNK_BITS = 1 << 20          # bits per frame
+MAX_CODE_LEN = 12             # Huffman code length limit (one decode-table lookup)
+CODE_LEN_SLACK = 4            # larger alphabets: limit of block size + this many bits
+
+STREAM_HEADER = struct.Struct("<4sBB")    # magic, codec id, block size
+FRAME_HEADER = struct.Struct("<II")       # bits in frame, payload bytes
+MAGIC = b"BSTR"
+HUFFMAN, ARITHMETIC, RICE, RANS, ADAPTIVE = 0, 1, 2, 3, 4
+
+
+# Step 1: Chunked bit input / output
+
+def iter_bit_chunks(reader, chunk_bytes, num_bits=None):
+    # Yields 0/1 uint8 arrays of at most chunk_bytes * 8 bits
+    remaining = num_bits
+    while remaining is None or remaining > 0:
+        want = chunk_bytes if remaining is None else min(chunk_bytes, (remaining + 7) // 8)
+        data = reader.read(want)
+        if not data:
+            break
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        if remaining is not None:
+            bits = bits[:remaining]
+            remaining -= len(bits)
+        yield bits
+
+
+def write_frame(writer, n_bits, payload):
+    writer.write(FRAME_HEADER.pack(n_bits, len(payload)))
+    writer.write(payload)
+
+
+def iter_frames(reader):
+    while True:
+        head = reader.read(FRAME_HEADER.size)
+        if not head:
+            return
+        n_bits, size = FRAME_HEADER.unpack(head)
+        yield n_bits, reader.read(size)
+
+
+def write_stream_header(writer, codec, block_size):
+    writer.write(STREAM_HEADER.pack(MAGIC, codec, block_size))
+
+
+def read_stream_header(reader, codec):
+    magic, found, block_size = STREAM_HEADER.unpack(reader.read(STREAM_HEADER.size))
+    if magic != MAGIC or found != codec:
+        raise ValueError("Input is not a stream written by this codec")
+    return block_size
+
+
+class BitSink:
+    # Packs decoded bits back into bytes; only the final frame may leave a partial byte
+    def __init__(self, writer):
+        self.writer = writer
+        self.pending = np.zeros(0, dtype=np.uint8)
+        self.total = 0
+
+    def write(self, bits):
+        self.total += len(bits)
+        bits = np.concatenate([self.pending, bits])
+        whole = len(bits) - len(bits) % 8
+        self.writer.write(np.packbits(bits[:whole]).tobytes())
+        self.pending = bits[whole:]
+
+    def close(self):
+        if len(self.pending):
+            self.writer.write(np.packbits(self.pending).tobytes())
+        return self.total
+
+
+# Step 2: Huffman (plain and blocked)
+
+def max_code_length(block_size):
+    # 2**k symbols need codes of at least k bits; a limit of exactly k would
+    # force fixed-length codes once every block occurs, hence the slack
+    return max(MAX_CODE_LEN, block_size + CODE_LEN_SLACK)
+
+
+def huffman_code_lengths(counts, block_size):
+    # counts: block_counts() array -> symbol -> code length
+    lengths = huffman_lengths(counts)
+    max_len = max_code_length(block_size)
+    if lengths.max() > max_len:
+        return package_merge({s: int(c) for s, c in enumerate(counts) if c > 0}, max_len)
+    return {s: int(l) for s, l in enumerate(lengths) if l > 0}
+
+
+def encode_huffman_frame(bits, block_size, lengths=None, cache=None):
+    # lengths=None: the frame gets its own code lengths, stored at its start
+    # cache: a CodebookCache; frames with a known distribution skip the build
+    k = block_size
+    bits = np.concatenate([bits, np.zeros(-len(bits) % k, dtype=np.uint8)])
+    out = BitWriter()
+    if lengths is None:
+        counts = block_counts(to_block_symbols(bits, k), k)
+        if cache is not None:
+            lengths = cache.huffman_lengths(counts, k)
+        else:
+            lengths = huffman_code_lengths(counts, k)
+        write_code_lengths(out, [lengths.get(s, 0) for s in range(1 << k)])
+    if cache is not None:
+        encoder = cache.huffman_tables(lengths, k).encoder
+    else:
+        encoder = HuffmanEncoder(lengths, k)
+    return encoder.encode(bits, out)[0]
+
+
+def decode_huffman_frame(payload, n_bits, block_size, lengths=None, cache=None):
+    k = block_size
+    reader = BitReader(payload)
+    if lengths is None:
+        header = read_code_lengths(reader, 1 << k)
+        lengths = {s: l for s, l in enumerate(header) if l > 0}
+    if cache is not None:
+        decoder = cache.huffman_tables(lengths, k).decoder
+    else:
+        decoder = HuffmanDecoder(canonical_codes(lengths))
+    symbols = decoder.decode(payload, -(-n_bits // k), start=reader.pos)
+    return from_block_symbols(symbols, k)[:n_bits]
+
+
+class HuffmanStream:
+    def __init__(self, block_size=1, chunk_bits=CHUNK_BITS, cache=None):
+        self.block_size = block_size
+        self.cache = cache
+        # Whole number of blocks and of bytes in every frame but the last
+        self.chunk_bytes = max(1, chunk_bits // (8 * block_size)) * block_size
+
+    def encode(self, reader, writer, num_bits=None):
+        k = self.block_size
+        write_stream_header(writer, HUFFMAN, k)
+        total = 0
+        for bits in iter_bit_chunks(reader, self.chunk_bytes, num_bits):
+            write_frame(writer, len(bits), encode_huffman_frame(bits, k, cache=self.cache))
+            total += len(bits)
+        return total
+
+    def decode(self, reader, writer):
+        k = read_stream_header(reader, HUFFMAN)
+        sink = BitSink(writer)
+        for n_bits, payload in iter_frames(reader):
+            sink.write(decode_huffman_frame(payload, n_bits, k, cache=self.cache))
+        return sink.close()
+
+
+# Step 3: Arithmetic (integer range coder)
+
+FREQS = struct.Struct("<HH")      # quantized frequencies of 0 and 1
+
+
+def bit_frequencies(bits):
+    ones = int(np.count_nonzero(bits))
+    return quantize_counts(Counter({0: len(bits) - ones, 1: ones}))
+
+
+def encode_arithmetic_frame(bits, freqs=None, cache=None):
+    # freqs=None: the frame gets its own frequency table, stored at its start
+    header = b""
+    if freqs is None:
+        if cache is not None:
+            ones = int(np.count_nonzero(bits))
+            freqs = cache.arithmetic_freqs([len(bits) - ones, ones])
+        else:
+            freqs = bit_frequencies(bits)
+        header = FREQS.pack(freqs.get(0, 0), freqs.get(1, 0))
+    if cache is not None:
+        intervals, total_freq = cache.arithmetic_intervals(freqs)
+    else:
+        intervals, total_freq = build_intervals(freqs)
+    return header + encode_sequence(bits.tolist(), intervals, total_freq)
+
+
+def decode_arithmetic_frame(payload, n_bits, freqs=None, cache=None):
+    if freqs is None:
+        f0, f1 = FREQS.unpack(payload[:FREQS.size])
+        freqs = {s: f for s, f in ((0, f0), (1, f1)) if f > 0}
+        payload = payload[FREQS.size:]
+    if cache is not None:
+        intervals, total_freq = cache.arithmetic_intervals(freqs)
+    else:
+        intervals, total_freq = build_intervals(freqs)
+    return np.array(decode_sequence(payload, n_bits, intervals, total_freq), dtype=np.uint8)
+
+
+class ArithmeticStream:
+    def __init__(self, chunk_bits=CHUNK_BITS, cache=None):
+        self.chunk_bytes = max(1, chunk_bits // 8)
+        self.cache = cache
+
+    def encode(self, reader, writer, num_bits=None):
+        write_stream_header(writer, ARITHMETIC, 1)
+        total = 0
+        for bits in iter_bit_chunks(reader, self.chunk_bytes, num_bits):
+            write_frame(writer, len(bits), encode_arithmetic_frame(bits, cache=self.cache))
+            total += len(bits)
+        return total
+
+    def decode(self, reader, writer):
+        read_stream_header(reader, ARITHMETIC)
+        sink = BitSink(writer)
+        for n_bits, payload in iter_frames(reader):
+            sink.write(decode_arithmetic_frame(payload, n_bits, cache=self.cache))
+        return sink.close()
+
+
+# Step 4: Run-length + Golomb-Rice (sparse inputs)
+
+class RiceStream:
+    def __init__(self, chunk_bits=CHUNK_BITS):
+        self.chunk_bytes = max(1, chunk_bits // 8)
+
+    def encode(self, reader, writer, num_bits=None):
+        write_stream_header(writer, RICE, 1)
+        total = 0
+        for bits in iter_bit_chunks(reader, self.chunk_bytes, num_bits):
+            write_frame(writer, len(bits), encode_rice(bits))
+            total += len(bits)
+        return total
+
+    def decode(self, reader, writer):
+        read_stream_header(reader, RICE)
+        sink = BitSink(writer)
+        for n_bits, payload in iter_frames(reader):
+            sink.write(decode_rice(payload, n_bits))
+        return sink.close()
+
+
+# Step 5: Interleaved rANS (plain or on k-bit blocks)
+
+class RansStream:
+    def __init__(self, block_size=1, chunk_bits=CHUNK_BITS):
+        self.block_size = block_size
+        self.chunk_bytes = max(1, chunk_bits // (8 * block_size)) * block_size
+
+    def encode(self, reader, writer, num_bits=None):
+        write_stream_header(writer, RANS, self.block_size)
+        total = 0
+        for bits in iter_bit_chunks(reader, self.chunk_bytes, num_bits):
+            write_frame(writer, len(bits), encode_rans_frame(bits, self.block_size))
+            total += len(bits)
+        return total
+
+    def decode(self, reader, writer):
+        read_stream_header(reader, RANS)
+        sink = BitSink(writer)
+        for n_bits, payload in iter_frames(reader):
+            sink.write(decode_rans_frame(payload, n_bits))
+        return sink.close()
+
+
+# Step 6: One-pass adaptive Huffman (no codebooks at all)
+
+class AdaptiveHuffmanStream:
+    def __init__(self, block_size=1, chunk_bits=CHUNK_BITS):
+        self.block_size = block_size
+        self.chunk_bytes = max(1, chunk_bits // (8 * block_size)) * block_size
+
+    def encode(self, reader, writer, num_bits=None):
+        k = self.block_size
+        write_stream_header(writer, ADAPTIVE, k)
+        encoder = AdaptiveHuffmanEncoder(1 << k)
+        total = 0
+        for bits in iter_bit_chunks(reader, self.chunk_bytes, num_bits):
+            write_frame(writer, len(bits), encode_adaptive_frame(bits, k, encoder))
+            total += len(bits)
+        return total
+
+    def decode(self, reader, writer):
+        k = read_stream_header(reader, ADAPTIVE)
+        decoder = AdaptiveHuffmanDecoder(1 << k)
+        sink = BitSink(writer)
+        for n_bits, payload in iter_frames(reader):
+            sink.write(decode_adaptive_frame(payload, n_bits, k, decoder))
+        return sink.close()
+
+
+STREAMS = {HUFFMAN: HuffmanStream, ARITHMETIC: ArithmeticStream, RICE: RiceStream, RANS: RansStream,
+           ADAPTIVE: AdaptiveHuffmanStream}
+
+
+# Step 7: Header accounting
+
+def header_bits(data):
+    # Bits of an encoded stream that are not coded symbols: the stream and frame
+    # headers plus every frame's model (code lengths, frequency table, Rice parameter)
+    reader = io.BytesIO(data)
+    _, codec, k = STREAM_HEADER.unpack(reader.read(STREAM_HEADER.size))
+    total = 8 * STREAM_HEADER.size
+    for n_bits, payload in iter_frames(reader):
+        total += 8 * FRAME_HEADER.size
+        if codec == HUFFMAN:
+            bits = BitReader(payload)
+            read_code_lengths(bits, 1 << k)
+            total += bits.pos
+        elif codec == ARITHMETIC:
+            total += 8 * FREQS.size
+        elif codec == RICE:
+            total += 8 * RICE_HEADER.size
+        elif codec == RANS:
+            total += 8 * (RANS_HEADER.size + (2 << k if n_bits else 0))
+    return total
+
+
+# Step 8: Command line
+
+if __name__ == "__main__":
+    from .bit_dataset import read_header
+
+    parser = argparse.ArgumentParser(description="Stream-compress packed bit files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    enc = sub.add_parser("encode")
+    enc.add_argument("codec", choices=["huffman", "arithmetic", "rice", "rans", "adaptive"])
+    enc.add_argument("input", help=".bin dataset or raw packed bits")
+    enc.add_argument("output")
+    enc.add_argument("--block-size", type=int, default=1)
+    dec = sub.add_parser("decode")
+    dec.add_argument("input")
+    dec.add_argument("output", help="raw packed bits")
+    for p in (enc, dec):
+        p.add_argument("--cache", help="codebook warm-start file (huffman, arithmetic)")
+    args = parser.parse_args()
+
+    cache = None
+    if args.cache:
+        from .codebook_cache import CodebookCache
+        cache = CodebookCache(path=args.cache)
+
+    if args.command == "encode":
+        if args.codec == "huffman":
+            codec = HuffmanStream(args.block_size, cache=cache)
+        elif args.codec == "rans":
+            codec = RansStream(args.block_size)
+        elif args.codec == "adaptive":
+            codec = AdaptiveHuffmanStream(args.block_size)
+        else:
+            codec = ArithmeticStream(cache=cache) if args.codec == "arithmetic" else RiceStream()
+        with open(args.input, "rb") as src, open(args.output, "wb") as dst:
+            num_bits = None
+            if args.input.endswith(".bin"):
+                header, offset = read_header(args.input)
+                src.seek(offset)
+                num_bits = header["length"]
+            n = codec.encode(src, dst, num_bits)
+        print(f"Encoded {n} bits into {args.output}")
+    else:
+        with open(args.input, "rb") as src:
+            codec_id = STREAM_HEADER.unpack(src.read(STREAM_HEADER.size))[1]
+            src.seek(0)
+            codec = STREAMS[codec_id](cache=cache) if codec_id in (HUFFMAN, ARITHMETIC) else STREAMS[codec_id]()
+            with open(args.output, "wb") as dst:
+                n = codec.decode(src, dst)
+        print(f"Decoded {n} bits into {args.output}")
+
+    if cache is not None:
+        cache.save()
+        print(f"Codebook cache: {cache.stats()}")
@@ -0,0 +1,44 @@
+#  THIS SCRIPT
+#  - Compares every block size 1..K on one dataset in a single pass
+#    (instead of editing block_size in the blocked Huffman scripts and rerunning)
+#  - Prints entropy per bit, optimal Huffman length per bit and efficiency
+#
+#  Usage:
+#    python block_size_sweep.py                  # bernoulli_bits, K=8
+#    python block_size_sweep.py graph_bits 12
+
+import sys
+
+from bitcodecs.bit_dataset import dataset_path, iter_packed
+from bitcodecs.block_stats import BlockStats
+
+
+# CONFIGURATION
+
+dataset = "bernoulli_bits"
+max_block = 8
+chunk_bytes = 1 << 20       # packed bytes read per update
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        dataset = sys.argv[1]
+    if len(sys.argv) > 2:
+        max_block = int(sys.argv[2])
+
+    # Step 1: One pass over the data
+
+    stats = BlockStats(max_block)
+    for chunk, n in iter_packed(dataset_path(dataset), chunk_bytes):
+        stats.update_packed(chunk, n)
+
+
+    # Step 2: Display results
+
+    print(f"\n--- BLOCK SIZE SWEEP ({dataset}, {stats.total_bits} bits) ---")
+    print(f"{'k':>3} {'blocks':>10} {'distinct':>8} {'H/bit':>8} {'Huffman/bit':>11} {'efficiency':>10}")
+    for row in stats.results():
+        if not row["blocks"]:
+            continue
+        print(f"{row['block_size']:>3} {row['blocks']:>10} {row['distinct']:>8} {row['entropy_per_bit']:>8.4f} "
+              f"{row['huffman_len_per_bit']:>11.4f} {row['efficiency']:>9.2f}%")
@@ -1,64 +1,206 @@
-import numpy as np
-import networkx as nx
-import matplotlib.pyplot as plt
+#  THIS SCRIPT
+#  - Writes data/bernoulli_bits.bin and data/graph_bits.bin (packed .bin datasets)
+#  - Bernoulli bits are made in fixed chunks, one spawned RNG stream per chunk,
+#    across worker processes and streamed to the file; the output is
+#    bit-identical for any --workers
+#
+#  Usage:
+#    python generate_data.py
+#    python generate_data.py --bern-length 1e9 --bern-p 0.1 --seed 7 --no-plot
+
+import argparse
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
+from bitcodecs.bit_dataset import load_bits, PackedBitWriter
 
-np.random.seed(42)          # for reproducibility
+
+seed = 42                   # for reproducibility
 bern_p = 0.3                # probability of 1 in Bernoulli sequence
 bern_length = 1000          # sequence length
 graph_n = 10                # number of nodes
 graph_p = 0.3               # edge probability
 
-
-# Ensuring that output directories exist
-
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-data_dir = os.path.join(base_dir, "data")
-results_dir = os.path.join(base_dir, "results")
-os.makedirs(data_dir, exist_ok=True)
-os.makedirs(results_dir, exist_ok=True)
-
-
-# 1. Generating Bernoulli sequence
-
-bernoulli_seq = np.random.binomial(1, bern_p, bern_length)
-bern_file = os.path.join(data_dir, "bernoulli_bits.txt")
-np.savetxt(bern_file, bernoulli_seq, fmt='%d')
-print(f"Saved Bernoulli sequence to {bern_file} (length={bern_length}, p={bern_p})")
-
-
-# 2. Generating Erdős–Rényi random graph
-
-G = nx.erdos_renyi_graph(graph_n, graph_p)
-adj_matrix = nx.to_numpy_array(G, dtype=int)
-
-# Flattening the upper triangular part (no self-loops, avoid duplicates)
-adj_bits = []
-for i in range(graph_n):
-    for j in range(i + 1, graph_n):
-        adj_bits.append(int(adj_matrix[i, j]))
-
-adj_file = os.path.join(data_dir, "graph_bits.txt")
-np.savetxt(adj_file, adj_bits, fmt='%d')
-print(f"Saved flattened adjacency bits to {adj_file} (nodes={graph_n}, p={graph_p})")
-
-
-# 3. Visualizing and saving the graph
-
-plt.figure(figsize=(5, 4))
-pos = nx.spring_layout(G, seed=42)
-nx.draw(G, pos, with_labels=True, node_color="skyblue", edge_color="gray", node_size=800)
-plt.title(f"Erdős–Rényi G({graph_n}, {graph_p})")
-graph_img = os.path.join(results_dir, "graph_plot.png")
-plt.savefig(graph_img)
-plt.close()
-print(f"Graph visualization saved to {graph_img}")
-
-
-# 4. Print summary
-
-print("\n--- Data Generation Summary ---")
-print(f"Bernoulli sequence: length={bern_length}, p={bern_p}")
-print(f"Random graph: nodes={graph_n}, edge prob={graph_p}")
-print(f"Adjacency bits count: {len(adj_bits)}")
\ No newline at end of file
+bern_chunk_bits = 1 << 24       # bits per Bernoulli RNG stream (part of what a seed produces)
+
+graph_chunk_bits = 1 << 22      # adjacency bits generated (and held in memory) at a time
+skip_sampling_below = 0.05      # edge probability under which edges are placed by geometric skips
+plot_max_nodes = 200            # larger graphs are not drawn
+
+
+# Generators (networkx / matplotlib are only imported when a graph is drawn)
+
+# Bernoulli bits: chunk i always comes from the i-th child of SeedSequence(seed)
+# (seed may also be a SeedSequence, e.g. one spawned child per dataset),
+# so the output depends only on (length, p, seed, chunk_bits) and never on how
+# many workers produced it. float32 draws: p is resolved to 2^-24.
+
+def bernoulli_streams(length, seed, chunk_bits=bern_chunk_bits):
+    # [(child SeedSequence, bits in that chunk)]
+    if chunk_bits % 8:
+        raise ValueError(f"chunk_bits must be a multiple of 8, got {chunk_bits}")
+    n_chunks = -(-length // chunk_bits)
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    children = root.spawn(n_chunks)
+    return [(child, min(chunk_bits, length - i * chunk_bits)) for i, child in enumerate(children)]
+
+
+def bernoulli_chunk(seed_seq, n, p):
+    rng = np.random.default_rng(seed_seq)
+    return rng.random(n, dtype=np.float32) < p
+
+
+def _packed_bernoulli_chunk(seed_seq, n, p):
+    return np.packbits(bernoulli_chunk(seed_seq, n, p)).tobytes()
+
+
+def packed_bernoulli_chunks(length, p, seed=None, workers=1, chunk_bits=bern_chunk_bits):
+    # Yields (packed bytes, bits) in order; with workers > 1 the chunks are made
+    # in a process pool, at most 2 * workers of them in flight at a time
+    streams = bernoulli_streams(length, seed, chunk_bits)
+    if workers <= 1:
+        for child, n in streams:
+            yield _packed_bernoulli_chunk(child, n, p), n
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for child, n in streams:
+            in_flight.append((pool.submit(_packed_bernoulli_chunk, child, n, p), n))
+            if len(in_flight) >= 2 * workers:
+                future, size = in_flight.popleft()
+                yield future.result(), size
+        while in_flight:
+            future, size = in_flight.popleft()
+            yield future.result(), size
+
+
+def generate_bernoulli(length, p, seed=None, chunk_bits=bern_chunk_bits):
+    # In memory; the same bits write_bernoulli_bits() puts in a file
+    chunks = [bernoulli_chunk(child, n, p) for child, n in bernoulli_streams(length, seed, chunk_bits)]
+    return np.concatenate(chunks).astype(np.uint8) if chunks else np.zeros(0, dtype=np.uint8)
+
+
+def write_bernoulli_bits(path, length, p, seed=None, workers=1, chunk_bits=bern_chunk_bits):
+    # Streams the packed chunks straight into a .bin file. Returns the number of ones.
+    ones = 0
+    params = {"p": p, "seed": seed, "chunk_bits": chunk_bits}
+    with PackedBitWriter(path, length, "bernoulli", params) as writer:
+        for packed, n in packed_bernoulli_chunks(length, p, seed, workers, chunk_bits):
+            writer.write_packed(packed, n)
+            ones += int(np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=n).sum(dtype=np.int64))
+    return ones
+
+
+def er_bit_chunks(n, p, rng, chunk_bits=graph_chunk_bits):
+    # Upper triangle of an Erdős–Rényi G(n, p) adjacency matrix, row by row
+    # ((0,1), (0,2), ..., (1,2), ...), yielded as uint8 chunks of chunk_bits bits.
+    # Dense p: one uniform draw per pair. Sparse p: jump from edge to edge with
+    # geometric gaps, so the work is proportional to the number of edges.
+    total = n * (n - 1) // 2
+    sparse = 0 < p < skip_sampling_below
+    next_edge = int(rng.geometric(p)) - 1 if sparse else 0
+    for start in range(0, total, chunk_bits):
+        end = min(start + chunk_bits, total)
+        if not sparse:
+            yield (rng.random(end - start) < p).astype(np.uint8)
+            continue
+        bits = np.zeros(end - start, dtype=np.uint8)
+        while next_edge < end:
+            m = int((end - next_edge) * p * 1.1) + 16
+            positions = next_edge + np.concatenate([[0], np.cumsum(rng.geometric(p, m))])
+            inside = positions[:-1][positions[:-1] < end]
+            bits[inside - start] = 1
+            if len(inside) < m:
+                next_edge = int(positions[len(inside)])
+                break
+            next_edge = int(positions[-1])
+        yield bits
+
+
+def write_graph_bits(path, n, p, seed=None):
+    # Streams the adjacency bits straight to a packed .bin file; memory stays
+    # at one chunk whatever n is. Returns (bits written, edges).
+    rng = np.random.default_rng(seed)
+    total = n * (n - 1) // 2
+    edges = 0
+    with PackedBitWriter(path, total, "erdos_renyi", {"n": n, "p": p, "seed": seed}) as writer:
+        for bits in er_bit_chunks(n, p, rng):
+            writer.write(bits)
+            edges += int(np.count_nonzero(bits))
+    return total, edges
+
+
+def plot_graph(bits, n, path, title):
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    rows, cols = np.triu_indices(n, k=1)
+    edges = np.flatnonzero(bits)
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(zip(rows[edges].tolist(), cols[edges].tolist()))
+    plt.figure(figsize=(5, 4))
+    pos = nx.spring_layout(G, seed=42)
+    nx.draw(G, pos, with_labels=True, node_color="skyblue", edge_color="gray", node_size=800)
+    plt.title(title)
+    plt.savefig(path)
+    plt.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the Bernoulli and random-graph bit datasets")
+    parser.add_argument("--bern-length", type=float, default=bern_length, help="bits, e.g. 1e9")
+    parser.add_argument("--bern-p", type=float, default=bern_p)
+    parser.add_argument("--seed", type=int, default=seed)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes for the Bernoulli chunks (the output does not depend on it)")
+    parser.add_argument("--chunk-bits", type=int, default=bern_chunk_bits)
+    parser.add_argument("--graph-n", type=int, default=graph_n)
+    parser.add_argument("--graph-p", type=float, default=graph_p)
+    parser.add_argument("--no-plot", action="store_true", help="skip drawing the graph")
+    args = parser.parse_args()
+
+    # Ensuring that output directories exist
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(base_dir, "data")
+    results_dir = os.path.join(base_dir, "results")
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(results_dir, exist_ok=True)
+
+
+    # 1. Generating Bernoulli sequence
+
+    bern_length = int(args.bern_length)
+    bern_file = os.path.join(data_dir, "bernoulli_bits.bin")
+    start = time.perf_counter()
+    bern_ones = write_bernoulli_bits(bern_file, bern_length, args.bern_p, args.seed, args.workers, args.chunk_bits)
+    bern_time = time.perf_counter() - start
+    print(f"Saved Bernoulli sequence to {bern_file} (length={bern_length}, p={args.bern_p}) in {bern_time:.2f} s")
+
+
+    # 2. Generating Erdős–Rényi random graph (upper triangle streamed to disk)
+
+    adj_file = os.path.join(data_dir, "graph_bits.bin")
+    n_bits, n_edges = write_graph_bits(adj_file, args.graph_n, args.graph_p, args.seed)
+    print(f"Saved flattened adjacency bits to {adj_file} (nodes={args.graph_n}, p={args.graph_p})")
+
+
+    # 3. Visualizing and saving the graph (small graphs only)
+
+    if not args.no_plot and args.graph_n <= plot_max_nodes:
+        graph_img = os.path.join(results_dir, "graph_plot.png")
+        plot_graph(load_bits(adj_file), args.graph_n, graph_img, f"Erdős–Rényi G({args.graph_n}, {args.graph_p})")
+        print(f"Graph visualization saved to {graph_img}")
+
+
+    # 4. Print summary
+
+    print("\n--- Data Generation Summary ---")
+    print(f"Bernoulli sequence: length={bern_length}, p={args.bern_p}, ones={bern_ones} "
+          f"({bern_ones / max(bern_length, 1):.4f}), seed={args.seed}")
+    print(f"Random graph: nodes={args.graph_n}, edge prob={args.graph_p}, edges={n_edges}")
+    print(f"Adjacency bits count: {n_bits}")
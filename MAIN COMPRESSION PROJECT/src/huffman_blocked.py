@@ -1,119 +1,142 @@
-import os
-import math
-from collections import Counter
-import heapq
+import sys
 
+import numpy as np
 
-# CONFIGURATION
-
-block_size = 3  # <--- we'll change this to  3 then 4 later to compare
-
-
-# Utility: Huffman tree
-
-class Node:
-    def __init__(self, symbol=None, prob=0):
-        self.symbol = symbol
-        self.prob = prob
-        self.left = None
-        self.right = None
-
-    def __lt__(self, other):
-        return self.prob < other.prob
-
-
-def build_huffman_tree(prob_dict):
-    heap = [Node(sym, p) for sym, p in prob_dict.items()]
-    heapq.heapify(heap)
-    while len(heap) > 1:
-        left = heapq.heappop(heap)
-        right = heapq.heappop(heap)
-        new_node = Node(prob=left.prob + right.prob)
-        new_node.left, new_node.right = left, right
-        heapq.heappush(heap, new_node)
-    return heap[0]
-
-
-def generate_codes(node, prefix="", codebook={}):
-    if node is None:
-        return
-    if node.symbol is not None:
-        codebook[node.symbol] = prefix
-    generate_codes(node.left, prefix + "0", codebook)
-    generate_codes(node.right, prefix + "1", codebook)
-    return codebook
-
-
-
-# Load the generated Bernoulli sequence
+from bitcodecs.bit_dataset import load_dataset
+from bitcodecs.bitio import BitWriter, BitReader
+from bitcodecs.entropy import entropy
+from bitcodecs.huffman_tree import code_lengths
+from bitcodecs.huffman_decoder import HuffmanDecoder
+from bitcodecs.huffman_encoder import HuffmanEncoder
+from bitcodecs.canonical_huffman import package_merge, canonical_codes, write_code_lengths, read_code_lengths
+from bitcodecs.block_symbols import to_block_symbols, from_block_symbols, block_counts, block_label
+from bitcodecs.instrument import Instrument
+from bitcodecs.results_store import ResultsStore, code_version
+from bitcodecs.stream_codecs import max_code_length
 
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-data_file = os.path.join(base_dir, "data", "bernoulli_bits.txt")
 
-with open(data_file, "r") as f:
-    bits = [int(line.strip()) for line in f.readlines() if line.strip() != ""]
-
-# Pad if needed
-while len(bits) % block_size != 0:
-    bits.append(0)
-
-# Group into blocks
-blocks = ["".join(str(x) for x in bits[i:i+block_size])
-          for i in range(0, len(bits), block_size)]
-
-total_blocks = len(blocks)
-counts = Counter(blocks)
-probs = {b: counts[b] / total_blocks for b in counts}
-
-print(f"\n--- BLOCKED HUFFMAN (block size={block_size}) ---")
-print(f"Total bits: {len(bits)}, Total blocks: {total_blocks}")
-
-
-# Build Huffman codes
-
-root = build_huffman_tree(probs)
-codes = generate_codes(root)
-
-print("\nHuffman codes:")
-for b, c in codes.items():
-    print(f"  Block {b}: {c} (len={len(c)})")
-
-
-# Encoding & Decoding
-
-encoded = "".join(codes[b] for b in blocks)
-reverse = {v: k for k, v in codes.items()}
+# CONFIGURATION
 
-decoded_blocks = []
-temp = ""
-for bit in encoded:
-    temp += bit
-    if temp in reverse:
-        decoded_blocks.append(reverse[temp])
-        temp = ""
+block_size = 3  # default; sweep.py runs every block size in one go
+max_listed = 64  # codebook lines printed (k=16 has up to 65536 codes)
 
-decoded_bits = [int(b) for blk in decoded_blocks for b in blk]
-decoded_ok = decoded_bits[:len(bits)] == bits
 
+if __name__ == "__main__":
 
-# Entropy and efficiency
+    # Block size can also be given on the command line
 
-def entropy(p_list):
-    return -sum(p * math.log2(p) for p in p_list if p > 0)
+    if len(sys.argv) > 1:
+        block_size = int(sys.argv[1])
 
-H_block = entropy(list(probs.values()))
-H_bit = H_block / block_size
-avg_len_block = sum(probs[b] * len(codes[b]) for b in codes)
-avg_len_bit = avg_len_block / block_size
-efficiency = (H_bit / avg_len_bit) * 100
+    # Longest codeword allowed (same limit as the stream codecs; grows with the block size)
+    max_code_len = max_code_length(block_size)
 
-print(f"\nEntropy per block: {H_block:.4f} bits")
-print(f"Entropy per bit:   {H_bit:.4f} bits")
-print(f"Average code length per block: {avg_len_block:.4f} bits")
-print(f"Average code length per bit:   {avg_len_bit:.4f} bits")
-print(f"Compression efficiency: {efficiency:.2f}%")
-print(f"Decoded correctly? {decoded_ok}")
-encoded_len = len(encoded)
-original_len = len(bits)
-print(f"Encoded bitstream length: {encoded_len} bits")
-print(f"Original bit length: {original_len} bits")
+
+    # Load the generated Bernoulli sequence
+
+    inst = Instrument("huffman_blocked")
+    inst.stage("load")
+    raw_bits = load_dataset("bernoulli_bits")
+
+    # Pad if needed
+    pad = -len(raw_bits) % block_size
+    bits = np.concatenate([raw_bits, np.zeros(pad, dtype=np.uint8)])
+
+    # Group into blocks (block i -> integer symbol, first bit most significant)
+    inst.stage("count")
+    blocks = to_block_symbols(bits, block_size)
+
+    total_blocks = len(blocks)
+    block_count_arr = block_counts(blocks, block_size)
+    counts = {int(b): int(c) for b, c in enumerate(block_count_arr) if c > 0}
+    probs = {b: counts[b] / total_blocks for b in counts}
+
+    print(f"\n--- BLOCKED HUFFMAN (block size={block_size}) ---")
+    print(f"Total bits: {len(bits)}, Total blocks: {total_blocks}")
+
+
+    # Build Huffman codes
+
+    # Canonical codes only need the code lengths (length-limited if necessary)
+    inst.stage("build")
+    lengths = code_lengths(counts)
+    if max(lengths.values()) > max_code_len:
+        lengths = package_merge(counts, max_code_len)
+    codes = canonical_codes(lengths)
+
+    print("\nHuffman codes:")
+    for b, c in list(codes.items())[:max_listed]:
+        print(f"  Block {block_label(b, block_size)}: {c} (len={len(c)})")
+    if len(codes) > max_listed:
+        print(f"  ... and {len(codes) - max_listed} more")
+
+
+    # Encoding & Decoding (served from the results store if this exact run was done before)
+
+    inst.stage("lookup")
+    store = ResultsStore()
+    run_params = {"block_size": block_size, "max_code_len": max_code_len, "padding": "zero-pad"}
+    run_version = code_version(__file__, "bitio", "huffman_tree", "canonical_huffman", "huffman_encoder", "huffman_decoder",
+                               "block_symbols", "stream_codecs")
+    run_key, input_hash = store.key(raw_bits, "huffman_blocked", run_params, run_version)
+    cached = store.get(run_key)
+
+    if cached is None:
+        inst.stage("encode")
+        writer = BitWriter()
+        write_code_lengths(writer, [lengths.get(b, 0) for b in range(2 ** block_size)])
+        header_len = writer.bit_length()
+        encoded, encoded_len = HuffmanEncoder(lengths, block_size).encode(bits, writer)
+
+        inst.stage("decode")
+        # The decoder rebuilds the codebook from the header alone
+        reader = BitReader(encoded)
+        header_lengths = read_code_lengths(reader, 2 ** block_size)
+        decoded_codes = canonical_codes({b: l for b, l in enumerate(header_lengths) if l > 0})
+        decoded_blocks = HuffmanDecoder(decoded_codes).decode(encoded, len(blocks), start=reader.pos)
+
+        inst.stage("verify")
+        decoded_bits = from_block_symbols(decoded_blocks, block_size)
+        decoded_ok = bool(np.array_equal(decoded_bits[:len(bits)], bits))
+        encoded_bytes = len(encoded)
+    else:
+        print("\n(encode/decode results served from the results store)")
+        header_len = cached["header_bits"]
+        encoded_len = cached["encoded_bits"]
+        encoded_bytes = cached["encoded_bytes"]
+        decoded_ok = cached["lossless"]
+
+
+    # Entropy and efficiency
+
+    inst.stage("stats")
+    H_block = entropy(list(probs.values()))
+    H_bit = H_block / block_size
+    avg_len_block = sum(probs[b] * len(codes[b]) for b in codes)
+    avg_len_bit = avg_len_block / block_size
+    efficiency = (H_bit / avg_len_bit) * 100
+
+    print(f"\nEntropy per block: {H_block:.4f} bits")
+    print(f"Entropy per bit:   {H_bit:.4f} bits")
+    print(f"Average code length per block: {avg_len_block:.4f} bits")
+    print(f"Average code length per bit:   {avg_len_bit:.4f} bits")
+    print(f"Compression efficiency: {efficiency:.2f}%")
+    print(f"Decoded correctly? {decoded_ok}")
+    original_len = len(bits)
+    print(f"Codebook header: {header_len} bits")
+    print(f"Encoded bitstream length: {encoded_len} bits ({encoded_bytes} bytes, header included)")
+    print(f"Original bit length: {original_len} bits")
+
+    inst.stage("write")
+    store.put(run_key, input_hash, "huffman_blocked", run_params, {
+        "entropy_per_bit": H_bit,
+        "avg_len_per_bit": avg_len_bit,
+        "efficiency": efficiency,
+        "original_bits": original_len,
+        "header_bits": header_len,
+        "encoded_bits": encoded_len,
+        "encoded_bytes": encoded_bytes,
+        "lossless": decoded_ok,
+    }, version=run_version)
+
+    inst.done()
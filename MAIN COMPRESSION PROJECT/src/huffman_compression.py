@@ -1,126 +1,134 @@
 import os
-import math
 from collections import Counter
-import heapq
 
+import numpy as np
 
-# Build Huffman tree
+from bitcodecs.bit_dataset import load_dataset
+from bitcodecs.bitio import BitWriter, BitReader
+from bitcodecs.entropy import entropy
+from bitcodecs.huffman_tree import code_lengths
+from bitcodecs.huffman_decoder import HuffmanDecoder
+from bitcodecs.huffman_encoder import HuffmanEncoder
+from bitcodecs.canonical_huffman import canonical_codes, write_code_lengths, read_code_lengths
+from bitcodecs.instrument import Instrument
+from bitcodecs.results_store import ResultsStore, code_version
 
-class Node:
-    def __init__(self, symbol=None, prob=0):
-        self.symbol = symbol
-        self.prob = prob
-        self.left = None
-        self.right = None
 
-    def __lt__(self, other):
-        return self.prob < other.prob
+if __name__ == "__main__":
 
+    # 1. Load the generated Bernoulli sequence
 
-def build_huffman_tree(prob_dict):
-    heap = [Node(sym, p) for sym, p in prob_dict.items()]
-    heapq.heapify(heap)
+    inst = Instrument("huffman_compression")
+    inst.stage("load")
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sequence = load_dataset("bernoulli_bits").tolist()
 
-    while len(heap) > 1:
-        left = heapq.heappop(heap)
-        right = heapq.heappop(heap)
-        new_node = Node(prob=left.prob + right.prob)
-        new_node.left, new_node.right = left, right
-        heapq.heappush(heap, new_node)
+    total = len(sequence)
+    inst.stage("count")
+    counts = Counter(sequence)
+    probs = {k: v / total for k, v in counts.items()}
 
-    return heap[0]
-
-
-def generate_codes(node, prefix="", codebook={}):
-    if node is None:
-        return
-    if node.symbol is not None:
-        codebook[node.symbol] = prefix
-    generate_codes(node.left, prefix + "0", codebook)
-    generate_codes(node.right, prefix + "1", codebook)
-    return codebook
-
-
-
-# 1. Load the generated Bernoulli sequence
-
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-data_file = os.path.join(base_dir, "data", "bernoulli_bits.txt")
-
-with open(data_file, "r") as f:
-    sequence = [int(line.strip()) for line in f.readlines() if line.strip() != ""]
-
-total = len(sequence)
-counts = Counter(sequence)
-probs = {k: v / total for k, v in counts.items()}
-
-print("\n--- HUFFMAN COMPRESSION (no blocks) ---")
-print(f"Sequence length: {total}")
-for k, v in probs.items():
-    print(f"Symbol {k}: p={v:.4f}")
-
-
-# 2. Build Huffman codes
-
-root = build_huffman_tree(probs)
-codes = generate_codes(root)
-
-print("\nHuffman codes:")
-for sym, code in codes.items():
-    print(f"  Symbol {sym}: {code} (len={len(code)})")
-
-
-# 3. Encoding and Decoding
-
-encoded = "".join(codes[b] for b in sequence)
-
-reverse_codes = {v: k for k, v in codes.items()}
-
-decoded = []
-code = ""
-for bit in encoded:
-    code += bit
-    if code in reverse_codes:
-        decoded.append(reverse_codes[code])
-        code = ""
-
-decoded_ok = decoded == sequence
-
-
-# 4. Entropy and efficiency
-
-def entropy(p_list):
-    return -sum(p * math.log2(p) for p in p_list if p > 0)
-
-H = entropy(list(probs.values()))
-avg_len = sum(probs[sym] * len(code) for sym, code in codes.items())
-efficiency = (H / avg_len) * 100
+    print("\n--- HUFFMAN COMPRESSION (no blocks) ---")
+    print(f"Sequence length: {total}")
+    for k, v in probs.items():
+        print(f"Symbol {k}: p={v:.4f}")
 
-print(f"\nEntropy: {H:.4f} bits per symbol")
-print(f"Average code length: {avg_len:.4f} bits")
-print(f"Compression efficiency: {efficiency:.2f}%")
-print(f"Encoded bitstream length: {len(encoded)} bits")
-print(f"Decoded matches original? {decoded_ok}")
 
-# 5. Save results 
+    # 2. Build Huffman codes
 
-results_dir = os.path.join(base_dir, "results")
-os.makedirs(results_dir, exist_ok=True)
-out_file = os.path.join(results_dir, "huffman_basic.txt")
+    # Canonical codes only need the code lengths
+    inst.stage("build")
+    lengths = code_lengths(counts)
+    codes = canonical_codes(lengths)
 
-with open(out_file, "w") as f:
-    f.write("--- HUFFMAN COMPRESSION (No Blocks) ---\n")
-    f.write(f"Sequence length: {total}\n")
-    for k, v in probs.items():
-        f.write(f"Symbol {k}: p={v:.4f}\n")
-    f.write("\nHuffman Codes:\n")
+    print("\nHuffman codes:")
     for sym, code in codes.items():
-        f.write(f"  Symbol {sym}: {code} (len={len(code)})\n")
-    f.write("\nResults:\n")
-    f.write(f"Entropy: {H:.4f} bits per symbol\n")
-    f.write(f"Average code length: {avg_len:.4f} bits\n")
-    f.write(f"Compression efficiency: {efficiency:.2f}%\n")
-    f.write(f"Encoded bitstream length: {len(encoded)} bits\n")
-    f.write(f"Decoded matches original? {decoded_ok}\n")
-
-print(f"\nResults saved to: {out_file}")
\ No newline at end of file
+        print(f"  Symbol {sym}: {code} (len={len(code)})")
+
+
+    # 3. Encoding and Decoding (served from the results store if this exact run was done before)
+
+    inst.stage("lookup")
+    store = ResultsStore()
+    run_params = {}
+    run_version = code_version(__file__, "bitio", "huffman_tree", "canonical_huffman", "huffman_encoder", "huffman_decoder",
+                               "block_symbols", "stream_codecs")
+    run_key, input_hash = store.key(sequence, "huffman", run_params, run_version)
+    cached = store.get(run_key)
+
+    if cached is None:
+        inst.stage("encode")
+        writer = BitWriter()
+        write_code_lengths(writer, [lengths.get(0, 0), lengths.get(1, 0)])
+        header_len = writer.bit_length()
+        encoded, encoded_len = HuffmanEncoder(lengths).encode(np.asarray(sequence, dtype=np.uint8), writer)
+
+        inst.stage("decode")
+        # The decoder rebuilds the codebook from the header alone
+        reader = BitReader(encoded)
+        header_lengths = read_code_lengths(reader, 2)
+        decoded_codes = canonical_codes({sym: l for sym, l in enumerate(header_lengths) if l > 0})
+        decoded = HuffmanDecoder(decoded_codes).decode(encoded, total, start=reader.pos)
+
+        inst.stage("verify")
+        decoded_ok = decoded.tolist() == sequence
+        encoded_bytes = len(encoded)
+    else:
+        print("\n(encode/decode results served from the results store)")
+        header_len = cached["header_bits"]
+        encoded_len = cached["encoded_bits"]
+        encoded_bytes = cached["encoded_bytes"]
+        decoded_ok = cached["lossless"]
+
+
+    # 4. Entropy and efficiency
+
+    inst.stage("stats")
+    H = entropy(list(probs.values()))
+    avg_len = sum(probs[sym] * len(code) for sym, code in codes.items())
+    efficiency = (H / avg_len) * 100
+
+    print(f"\nEntropy: {H:.4f} bits per symbol")
+    print(f"Average code length: {avg_len:.4f} bits")
+    print(f"Compression efficiency: {efficiency:.2f}%")
+    print(f"Codebook header: {header_len} bits")
+    print(f"Encoded bitstream length: {encoded_len} bits ({encoded_bytes} bytes, header included)")
+    print(f"Decoded matches original? {decoded_ok}")
+
+    inst.stage("write")
+    store.put(run_key, input_hash, "huffman", run_params, {
+        "entropy_per_bit": H,
+        "avg_len_per_bit": avg_len,
+        "efficiency": efficiency,
+        "original_bits": total,
+        "header_bits": header_len,
+        "encoded_bits": encoded_len,
+        "encoded_bytes": encoded_bytes,
+        "lossless": decoded_ok,
+    }, version=run_version)
+
+    # 5. Save results 
+
+    results_dir = os.path.join(base_dir, "results")
+    os.makedirs(results_dir, exist_ok=True)
+    out_file = os.path.join(results_dir, "huffman_basic.txt")
+
+    with open(out_file, "w") as f:
+        f.write("--- HUFFMAN COMPRESSION (No Blocks) ---\n")
+        f.write(f"Sequence length: {total}\n")
+        for k, v in probs.items():
+            f.write(f"Symbol {k}: p={v:.4f}\n")
+        f.write("\nHuffman Codes:\n")
+        for sym, code in codes.items():
+            f.write(f"  Symbol {sym}: {code} (len={len(code)})\n")
+        f.write("\nResults:\n")
+        f.write(f"Entropy: {H:.4f} bits per symbol\n")
+        f.write(f"Average code length: {avg_len:.4f} bits\n")
+        f.write(f"Compression efficiency: {efficiency:.2f}%\n")
+        f.write(f"Codebook header: {header_len} bits\n")
+        f.write(f"Encoded bitstream length: {encoded_len} bits ({encoded_bytes} bytes, header included)\n")
+        f.write(f"Decoded matches original? {decoded_ok}\n")
+
+    print(f"\nResults saved to: {out_file}")
+
+    inst.done()
@@ -1,137 +1,147 @@
 
 import os
-import math
 from collections import Counter
-import heapq
 
+import numpy as np
 
-# Step 1: Load the generated Graph data
+from bitcodecs.bit_dataset import load_dataset
+from bitcodecs.bitio import BitWriter, BitReader
+from bitcodecs.entropy import entropy
+from bitcodecs.huffman_tree import code_lengths
+from bitcodecs.huffman_decoder import HuffmanDecoder
+from bitcodecs.huffman_encoder import HuffmanEncoder
+from bitcodecs.canonical_huffman import canonical_codes, write_code_lengths, read_code_lengths
+from bitcodecs.instrument import Instrument
+from bitcodecs.results_store import ResultsStore, code_version
 
-data_path = os.path.join(os.path.dirname(__file__), "..", "data", "graph_bits.txt")
 
-if not os.path.exists(data_path):
-    raise FileNotFoundError("Missing 'graph_bits.txt' in data/ folder. Run data generation first!")
+if __name__ == "__main__":
 
-with open(data_path, "r") as f:
-    content = f.read().strip()
-    sequence = [int(c) for c in content if c in "01"]
+    # Step 1: Load the generated Graph data
 
-total = len(sequence)
-counts = Counter(sequence)
-p0 = counts[0] / total
-p1 = counts[1] / total
+    inst = Instrument("huffman_graph")
+    inst.stage("load")
+    sequence = load_dataset("graph_bits").tolist()
 
-print("\n--- HUFFMAN CODING (Graph Data) ---")
-print(f"Sequence length: {total}")
-print(f"Symbol 0: p={p0:.4f}")
-print(f"Symbol 1: p={p1:.4f}")
+    total = len(sequence)
+    inst.stage("count")
+    counts = Counter(sequence)
+    p0 = counts[0] / total
+    p1 = counts[1] / total
 
+    print("\n--- HUFFMAN CODING (Graph Data) ---")
+    print(f"Sequence length: {total}")
+    print(f"Symbol 0: p={p0:.4f}")
+    print(f"Symbol 1: p={p1:.4f}")
 
-# Step 2: Compute entropy
 
-def entropy(p_list):
-    return -sum(p * math.log2(p) for p in p_list if p > 0)
+    # Step 2: Compute entropy
 
-H = entropy([p0, p1])
-print(f"Entropy of source: {H:.4f} bits/symbol\n")
+    H = entropy([p0, p1])
+    print(f"Entropy of source: {H:.4f} bits/symbol\n")
 
 
-# Step 3: Build Huffman tree
+    # Step 3: Build Huffman code lengths
 
-class Node:
-    def __init__(self, symbol=None, prob=None):
-        self.symbol = symbol
-        self.prob = prob
-        self.left = None
-        self.right = None
+    probs = {0: p0, 1: p1}
 
-    def __lt__(self, other):
-        return self.prob < other.prob
+    # Canonical codes only need the code lengths
+    inst.stage("build")
+    lengths = code_lengths(counts)
+    codes = canonical_codes(lengths)
 
-def build_huffman_tree(prob_dict):
-    heap = [Node(sym, p) for sym, p in prob_dict.items()]
-    heapq.heapify(heap)
 
-    while len(heap) > 1:
-        a = heapq.heappop(heap)
-        b = heapq.heappop(heap)
-        new_node = Node(prob=a.prob + b.prob)
-        new_node.left = a
-        new_node.right = b
-        heapq.heappush(heap, new_node)
-    return heap[0]
+    # Step 4: Encoding and decoding (served from the results store if this exact run was done before)
 
-def assign_codes(node, code="", codebook=None):
-    if codebook is None:
-        codebook = {}
-    if node.symbol is not None:
-        codebook[node.symbol] = code
-    else:
-        assign_codes(node.left, code + "0", codebook)
-        assign_codes(node.right, code + "1", codebook)
-    return codebook
-
-probs = {0: p0, 1: p1}
-root = build_huffman_tree(probs)
-codes = assign_codes(root)
-
-
-# Step 4: Encoding and decoding
-
-encoded = "".join(codes[bit] for bit in sequence)
-decoded = []
-code_to_symbol = {v: k for k, v in codes.items()}
+    inst.stage("lookup")
+    store = ResultsStore()
+    run_params = {}
+    run_version = code_version(__file__, "bitio", "huffman_tree", "canonical_huffman", "huffman_encoder", "huffman_decoder",
+                               "block_symbols", "stream_codecs")
+    run_key, input_hash = store.key(sequence, "huffman", run_params, run_version)
+    cached = store.get(run_key)
 
-buffer = ""
-for bit in encoded:
-    buffer += bit
-    if buffer in code_to_symbol:
-        decoded.append(code_to_symbol[buffer])
-        buffer = ""
+    if cached is None:
+        inst.stage("encode")
+        writer = BitWriter()
+        write_code_lengths(writer, [lengths.get(0, 0), lengths.get(1, 0)])
+        header_len = writer.bit_length()
+        encoded, encoded_len = HuffmanEncoder(lengths).encode(np.asarray(sequence, dtype=np.uint8), writer)
 
-is_lossless = decoded == sequence
+        inst.stage("decode")
+        # The decoder rebuilds the codebook from the header alone
+        reader = BitReader(encoded)
+        header_lengths = read_code_lengths(reader, 2)
+        decoded_codes = canonical_codes({sym: l for sym, l in enumerate(header_lengths) if l > 0})
+        decoded = HuffmanDecoder(decoded_codes).decode(encoded, total, start=reader.pos)
 
+        inst.stage("verify")
+        is_lossless = decoded.tolist() == sequence
+        encoded_bytes = len(encoded)
+    else:
+        print("(encode/decode results served from the results store)\n")
+        header_len = cached["header_bits"]
+        encoded_len = cached["encoded_bits"]
+        encoded_bytes = cached["encoded_bytes"]
+        is_lossless = cached["lossless"]
 
-# Step 5: Calculating statistics
-
-avg_len = sum(len(codes[sym]) * probs[sym] for sym in probs)
-efficiency = (H / avg_len) * 100
-encoded_len = len(encoded)
-
-
-# Step 6: Display results
-
-print("Huffman Codes:")
-for sym, code in codes.items():
-    print(f"  Symbol {sym}: {code} (len={len(code)})")
 
-print(f"\nEntropy: {H:.4f} bits/symbol")
-print(f"Average code length: {avg_len:.4f} bits/symbol")
-print(f"Compression efficiency: {efficiency:.2f}%")
-print(f"Encoded bitstream length: {encoded_len} bits")
-print(f"Original bit length: {total} bits")
-print(f"Decoded sequence equals original? {is_lossless}")
+    # Step 5: Calculating statistics
 
+    inst.stage("stats")
+    avg_len = sum(len(codes[sym]) * probs[sym] for sym in codes)
+    efficiency = (H / avg_len) * 100
 
-# Step 7: Save results
 
-results_dir = os.path.join(os.path.dirname(__file__), "..", "results")
-os.makedirs(results_dir, exist_ok=True)
-save_path = os.path.join(results_dir, "huffman_graph.txt")
+    # Step 6: Display results
 
-with open(save_path, "w") as f:
-    f.write("--- HUFFMAN CODING (Graph Data) ---\n")
-    f.write(f"Sequence length: {total}\n")
-    f.write(f"Symbol 0: p={p0:.4f}\n")
-    f.write(f"Symbol 1: p={p1:.4f}\n\n")
-    f.write("Huffman Codes:\n")
+    print("Huffman Codes:")
     for sym, code in codes.items():
-        f.write(f"  Symbol {sym}: {code} (len={len(code)})\n")
-    f.write(f"\nEntropy: {H:.4f} bits/symbol\n")
-    f.write(f"Average code length: {avg_len:.4f} bits/symbol\n")
-    f.write(f"Compression efficiency: {efficiency:.2f}%\n")
-    f.write(f"Encoded bitstream length: {encoded_len} bits\n")
-    f.write(f"Original bit length: {total} bits\n")
-    f.write(f"Decoded sequence equals original? {is_lossless}\n")
-
-print(f"\nResults saved to: {os.path.abspath(save_path)}")
\ No newline at end of file
+        print(f"  Symbol {sym}: {code} (len={len(code)})")
+
+    print(f"\nEntropy: {H:.4f} bits/symbol")
+    print(f"Average code length: {avg_len:.4f} bits/symbol")
+    print(f"Compression efficiency: {efficiency:.2f}%")
+    print(f"Codebook header: {header_len} bits")
+    print(f"Encoded bitstream length: {encoded_len} bits ({encoded_bytes} bytes, header included)")
+    print(f"Original bit length: {total} bits")
+    print(f"Decoded sequence equals original? {is_lossless}")
+
+    inst.stage("write")
+    store.put(run_key, input_hash, "huffman", run_params, {
+        "entropy_per_bit": H,
+        "avg_len_per_bit": avg_len,
+        "efficiency": efficiency,
+        "original_bits": total,
+        "header_bits": header_len,
+        "encoded_bits": encoded_len,
+        "encoded_bytes": encoded_bytes,
+        "lossless": is_lossless,
+    }, version=run_version)
+
+
+    # Step 7: Save results
+
+    results_dir = os.path.join(os.path.dirname(__file__), "..", "results")
+    os.makedirs(results_dir, exist_ok=True)
+    save_path = os.path.join(results_dir, "huffman_graph.txt")
+
+    with open(save_path, "w") as f:
+        f.write("--- HUFFMAN CODING (Graph Data) ---\n")
+        f.write(f"Sequence length: {total}\n")
+        f.write(f"Symbol 0: p={p0:.4f}\n")
+        f.write(f"Symbol 1: p={p1:.4f}\n\n")
+        f.write("Huffman Codes:\n")
+        for sym, code in codes.items():
+            f.write(f"  Symbol {sym}: {code} (len={len(code)})\n")
+        f.write(f"\nEntropy: {H:.4f} bits/symbol\n")
+        f.write(f"Average code length: {avg_len:.4f} bits/symbol\n")
+        f.write(f"Compression efficiency: {efficiency:.2f}%\n")
+        f.write(f"Codebook header: {header_len} bits\n")
+        f.write(f"Encoded bitstream length: {encoded_len} bits ({encoded_bytes} bytes, header included)\n")
+        f.write(f"Original bit length: {total} bits\n")
+        f.write(f"Decoded sequence equals original? {is_lossless}\n")
+
+    print(f"\nResults saved to: {os.path.abspath(save_path)}")
+
+    inst.done()
@@ -1,130 +1,151 @@
 
-import os
-import math
-import heapq
-from collections import Counter
+import sys
 
+import numpy as np
 
-# Step 1: Load the generated graph bit data
+from bitcodecs.bit_dataset import load_dataset
+from bitcodecs.bitio import BitWriter, BitReader
+from bitcodecs.entropy import entropy
+from bitcodecs.huffman_tree import code_lengths
+from bitcodecs.huffman_decoder import HuffmanDecoder
+from bitcodecs.huffman_encoder import HuffmanEncoder
+from bitcodecs.canonical_huffman import package_merge, canonical_codes, write_code_lengths, read_code_lengths
+from bitcodecs.block_symbols import to_block_symbols, from_block_symbols, block_counts, block_label
+from bitcodecs.instrument import Instrument
+from bitcodecs.results_store import ResultsStore, code_version
+from bitcodecs.stream_codecs import max_code_length
 
-data_path = os.path.join(os.path.dirname(__file__), "..", "data", "graph_bits.txt")
 
-if not os.path.exists(data_path):
-    raise FileNotFoundError("Missing 'graph_bits.txt' in data/ folder. Run data generation first!")
+if __name__ == "__main__":
 
-with open(data_path, "r") as f:
-    content = f.read().strip()
-    bits = [int(c) for c in content if c in "01"]
+    # Step 1: Load the generated graph bit data
 
+    inst = Instrument("huffman_graph_blocked")
+    inst.stage("load")
+    raw_bits = load_dataset("graph_bits")
 
-# Step 2: Choose block size
 
-block_size = 3   # <<< we'll change this to  3, then 4... to test different setups
-total_bits = len(bits)
-num_blocks = total_bits // block_size
+    # Step 2: Choose block size
 
-# Trim any leftover bits that don't fill a block
-bits = bits[: num_blocks * block_size]
+    block_size = 3   # default; sweep.py runs every block size in one go
+    if len(sys.argv) > 1:   # or pass it on the command line
+        block_size = int(sys.argv[1])
+    max_code_len = max_code_length(block_size)   # longest codeword allowed (grows with the block size)
+    max_listed = 64   # block / codebook lines printed (k=16 has up to 65536 blocks)
+    total_bits = len(raw_bits)
+    num_blocks = total_bits // block_size
 
-# Grouping into blocks 
-blocks = ["".join(map(str, bits[i:i+block_size])) for i in range(0, len(bits), block_size)]
+    # Trim any leftover bits that don't fill a block
+    bits = raw_bits[: num_blocks * block_size]
 
-print(f"\n--- BLOCKED HUFFMAN (Graph Data, block size={block_size}) ---")
-print(f"Total bits: {total_bits}, Total blocks: {num_blocks}")
+    # Grouping into blocks (block i -> integer symbol, first bit most significant)
+    inst.stage("count")
+    blocks = to_block_symbols(bits, block_size)
 
+    print(f"\n--- BLOCKED HUFFMAN (Graph Data, block size={block_size}) ---")
+    print(f"Total bits: {total_bits}, Total blocks: {num_blocks}")
 
-# Step 3: Computing block probabilities
 
-counts = Counter(blocks)
-total_blocks = len(blocks)
-probs = {blk: counts[blk] / total_blocks for blk in counts}
+    # Step 3: Computing block probabilities
 
-def entropy(p_list):
-    return -sum(p * math.log2(p) for p in p_list if p > 0)
+    block_count_arr = block_counts(blocks, block_size)
+    counts = {int(blk): int(c) for blk, c in enumerate(block_count_arr) if c > 0}
+    total_blocks = len(blocks)
+    probs = {blk: counts[blk] / total_blocks for blk in counts}
 
-H_block = entropy(list(probs.values()))
-H_bit = H_block / block_size
+    H_block = entropy(list(probs.values()))
+    H_bit = H_block / block_size
 
-print("\nBlock counts and probabilities:")
-for blk, p in probs.items():
-    print(f"  {blk}: count={counts[blk]}, p={p:.4f}")
+    print("\nBlock counts and probabilities:")
+    for blk, p in list(probs.items())[:max_listed]:
+        print(f"  {block_label(blk, block_size)}: count={counts[blk]}, p={p:.4f}")
+    if len(probs) > max_listed:
+        print(f"  ... and {len(probs) - max_listed} more")
 
-print(f"\nEntropy per block: {H_block:.4f} bits")
-print(f"Entropy per bit:   {H_bit:.4f} bits")
+    print(f"\nEntropy per block: {H_block:.4f} bits")
+    print(f"Entropy per bit:   {H_bit:.4f} bits")
 
 
-# Step 4: Build Huffman tree for blocks
+    # Step 4: Build Huffman tree for blocks
 
-class Node:
-    def __init__(self, symbol=None, prob=None):
-        self.symbol = symbol
-        self.prob = prob
-        self.left = None
-        self.right = None
-    def __lt__(self, other):
-        return self.prob < other.prob
+    # Canonical codes only need the code lengths (length-limited if necessary)
+    inst.stage("build")
+    lengths = code_lengths(counts)
+    if max(lengths.values()) > max_code_len:
+        lengths = package_merge(counts, max_code_len)
+    codes = canonical_codes(lengths)
 
-def build_tree(prob_dict):
-    heap = [Node(sym, p) for sym, p in prob_dict.items()]
-    heapq.heapify(heap)
-    while len(heap) > 1:
-        a = heapq.heappop(heap)
-        b = heapq.heappop(heap)
-        parent = Node(prob=a.prob + b.prob)
-        parent.left = a
-        parent.right = b
-        heapq.heappush(heap, parent)
-    return heap[0]
 
-def assign_codes(node, code="", codebook=None):
-    if codebook is None:
-        codebook = {}
-    if node.symbol is not None:
-        codebook[node.symbol] = code
-    else:
-        assign_codes(node.left, code + "0", codebook)
-        assign_codes(node.right, code + "1", codebook)
-    return codebook
-
-root = build_tree(probs)
-codes = assign_codes(root)
-
-
-# Step 5: Encoding and decoding
-
-encoded = "".join(codes[b] for b in blocks)
-code_to_block = {v: k for k, v in codes.items()}
-
-# Decode
-decoded_blocks = []
-temp = ""
-for bit in encoded:
-    temp += bit
-    if temp in code_to_block:
-        decoded_blocks.append(code_to_block[temp])
-        temp = ""
+    # Step 5: Encoding and decoding (served from the results store if this exact run was done before)
 
-decoded_bits = [int(x) for block in decoded_blocks for x in block]
-is_lossless = decoded_bits == bits
+    inst.stage("lookup")
+    store = ResultsStore()
+    run_params = {"block_size": block_size, "max_code_len": max_code_len, "padding": "trim"}
+    run_version = code_version(__file__, "bitio", "huffman_tree", "canonical_huffman", "huffman_encoder", "huffman_decoder",
+                               "block_symbols", "stream_codecs")
+    run_key, input_hash = store.key(raw_bits, "huffman_blocked", run_params, run_version)
+    cached = store.get(run_key)
 
+    if cached is None:
+        inst.stage("encode")
+        writer = BitWriter()
+        write_code_lengths(writer, [lengths.get(blk, 0) for blk in range(2 ** block_size)])
+        header_len = writer.bit_length()
+        encoded, encoded_len = HuffmanEncoder(lengths, block_size).encode(bits, writer)
 
-# Step 6: Stats
+        inst.stage("decode")
+        # Decode (the codebook is rebuilt from the header alone)
+        reader = BitReader(encoded)
+        header_lengths = read_code_lengths(reader, 2 ** block_size)
+        decoded_codes = canonical_codes({blk: l for blk, l in enumerate(header_lengths) if l > 0})
+        decoded_blocks = HuffmanDecoder(decoded_codes).decode(encoded, len(blocks), start=reader.pos)
 
-avg_len_block = sum(probs[b] * len(codes[b]) for b in codes)
-avg_len_bit = avg_len_block / block_size
-efficiency = (H_bit / avg_len_bit) * 100
-encoded_len = len(encoded)
-
-
-# Step 7: Display results
-
-print("\nHuffman codes (per block):")
-for blk, code in codes.items():
-    print(f"  {blk}: {code} (len={len(code)})")
-
-print(f"\nAverage code length per block: {avg_len_block:.4f} bits")
-print(f"Average code length per bit:   {avg_len_bit:.4f} bits")
-print(f"Compression efficiency: {efficiency:.2f}%")
-print(f"Encoded bitstream length: {encoded_len} bits")
-print(f"Original bit length: {total_bits} bits")
-print(f"Decoded correctly? {is_lossless}")
+        inst.stage("verify")
+        decoded_bits = from_block_symbols(decoded_blocks, block_size)
+        is_lossless = bool(np.array_equal(decoded_bits, bits))
+        encoded_bytes = len(encoded)
+    else:
+        print("\n(encode/decode results served from the results store)")
+        header_len = cached["header_bits"]
+        encoded_len = cached["encoded_bits"]
+        encoded_bytes = cached["encoded_bytes"]
+        is_lossless = cached["lossless"]
+
+
+    # Step 6: Stats
+
+    inst.stage("stats")
+    avg_len_block = sum(probs[b] * len(codes[b]) for b in codes)
+    avg_len_bit = avg_len_block / block_size
+    efficiency = (H_bit / avg_len_bit) * 100
+
+
+    # Step 7: Display results
+
+    print("\nHuffman codes (per block):")
+    for blk, code in list(codes.items())[:max_listed]:
+        print(f"  {block_label(blk, block_size)}: {code} (len={len(code)})")
+    if len(codes) > max_listed:
+        print(f"  ... and {len(codes) - max_listed} more")
+
+    print(f"\nAverage code length per block: {avg_len_block:.4f} bits")
+    print(f"Average code length per bit:   {avg_len_bit:.4f} bits")
+    print(f"Compression efficiency: {efficiency:.2f}%")
+    print(f"Codebook header: {header_len} bits")
+    print(f"Encoded bitstream length: {encoded_len} bits ({encoded_bytes} bytes, header included)")
+    print(f"Original bit length: {total_bits} bits")
+    print(f"Decoded correctly? {is_lossless}")
+
+    inst.stage("write")
+    store.put(run_key, input_hash, "huffman_blocked", run_params, {
+        "entropy_per_bit": H_bit,
+        "avg_len_per_bit": avg_len_bit,
+        "efficiency": efficiency,
+        "original_bits": total_bits,
+        "header_bits": header_len,
+        "encoded_bits": encoded_len,
+        "encoded_bytes": encoded_bytes,
+        "lossless": is_lossless,
+    }, version=run_version)
+
+    inst.done()
@@ -0,0 +1,244 @@
+#  THIS SCRIPT
+#  - Runs a whole grid of (dataset, codec, block size, p, length) in one command
+#    instead of editing block_size in the blocked Huffman scripts and rerunning
+#  - Datasets: "bernoulli" is generated for every (p, length) pair, each pair
+#    from its own spawned child of SeedSequence(seed) so no two are correlated;
+#    any other name is a file in data/ (p and length do not apply to it)
+#  - Grid points run concurrently in a process pool; all inputs are packed once
+#    into one multiprocessing.shared_memory block, and each task only carries
+#    its offset into it, so the bits are never pickled to the workers
+#  - Every point is encoded with the stream codec and decoded again; the
+#    results go to the results store in one save at the end and to
+#    results/sweep.json
+#  - Sizes are whole containers (stream, frame and codebook headers included),
+#    unlike the codec scripts' code lengths, so they are stored under their
+#    own names ("huffman_container", ...) and never mixed into the scripts' plots
+#  - Points already in the store are skipped unless --force is given
+#
+#  Usage:
+#    python sweep.py                                          # bernoulli_bits + graph_bits, huffman k=1..4, arithmetic
+#    python sweep.py --datasets bernoulli --probs 0.05 0.3 --lengths 1e5 1e6 --codecs huffman rans --block-sizes 1 2 3 4 8
+#    python sweep.py --workers 8 --force
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import benchmark_suite
+from benchmark_suite import run_codec
+from bitcodecs.bit_dataset import load_packed_dataset
+from bitcodecs.block_symbols import to_block_symbols, block_counts
+from bitcodecs.entropy import entropy
+from bitcodecs.results_store import ResultsStore, code_version, packed_data_hash, make_key
+from bitcodecs.stream_codecs import CHUNK_BITS, HuffmanStream, ArithmeticStream, RiceStream, RansStream, AdaptiveHuffmanStream
+from generate_data import generate_bernoulli
+
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(base_dir, "results", "sweep.json")
+
+
+# CONFIGURATION
+
+datasets = ["bernoulli_bits", "graph_bits"]
+codecs = ["huffman", "arithmetic"]
+block_sizes = [1, 2, 3, 4]
+probs = [0.3]                   # only used by the generated "bernoulli" dataset
+lengths = [100000]              # only used by the generated "bernoulli" dataset
+seed = 42
+
+# name -> (stream codec, whether it takes a block size; the others always code single bits)
+STREAM_CODECS = {
+    "huffman": (HuffmanStream, True),
+    "arithmetic": (ArithmeticStream, False),
+    "rice": (RiceStream, False),
+    "rans": (RansStream, True),
+    "adaptive": (AdaptiveHuffmanStream, True),
+}
+
+# Source that goes into the results-store key: the stream codecs and everything they use
+CODE_MODULES = [benchmark_suite.__file__, "stream_codecs", "adaptive_huffman", "bitio", "block_symbols",
+                "canonical_huffman", "golomb_rice", "huffman_decoder", "huffman_encoder", "huffman_tree",
+                "rans", "range_coder"]
+
+
+# Step 1: Grid
+
+def store_codec_name(codec):
+    # Not the codec scripts' names: their avg_len / efficiency leave headers out
+    return f"{codec}_container"
+
+
+def grid_points(inputs, codec_names, sizes):
+    # inputs: [(label, p, length)]; block size is dropped for codecs without one
+    points = []
+    for label, p, length in inputs:
+        for codec in codec_names:
+            for block_size in (sizes if STREAM_CODECS[codec][1] else [1]):
+                points.append((label, p, length, codec, block_size))
+    return list(dict.fromkeys(points))
+
+
+# Step 2: Inputs in shared memory
+
+def load_inputs(names, probs, lengths, seed):
+    # Returns [(label, p, length, packed bytes, n_bits)]
+    inputs = []
+    for name in names:
+        if name == "bernoulli":
+            pairs = [(length, p) for length in lengths for p in probs]
+            for (length, p), child in zip(pairs, np.random.SeedSequence(seed).spawn(len(pairs))):
+                bits = generate_bernoulli(length, p, child)
+                inputs.append((f"bernoulli p={p} n={length}", p, length, np.packbits(bits), length))
+        else:
+            packed, n_bits = load_packed_dataset(name)
+            inputs.append((name, None, None, packed, n_bits))
+    return inputs
+
+
+def share_inputs(inputs):
+    # One shared block holding every packed input back to back
+    # Returns (SharedMemory, {label: (offset, n_bytes, n_bits)})
+    total = max(sum(len(packed) for _, _, _, packed, _ in inputs), 1)
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    view = np.ndarray((total,), dtype=np.uint8, buffer=shm.buf)
+    slots, offset = {}, 0
+    for label, _, _, packed, n_bits in inputs:
+        view[offset:offset + len(packed)] = packed
+        slots[label] = (offset, len(packed), n_bits)
+        offset += len(packed)
+    del view
+    return shm, slots
+
+
+# Step 3: One grid point (runs in the worker processes)
+
+_attached = {}
+
+
+def _shared_input(shm_name, offset, n_bytes):
+    # Each worker attaches to the block once and keeps it for later tasks
+    shm = _attached.get(shm_name)
+    if shm is None:
+        shm = _attached[shm_name] = shared_memory.SharedMemory(name=shm_name)
+    return np.ndarray((n_bytes,), dtype=np.uint8, buffer=shm.buf, offset=offset)
+
+
+def run_point(shm_name, slot, codec, block_size):
+    offset, n_bytes, n_bits = slot
+    packed = _shared_input(shm_name, offset, n_bytes)
+    raw = packed.tobytes()
+
+    # Empirical block entropy (whole blocks only) as the reference for efficiency
+    bits = np.unpackbits(packed, count=n_bits)
+    whole = n_bits - n_bits % block_size
+    counts = block_counts(to_block_symbols(bits[:whole], block_size), block_size)
+    H_bit = entropy((counts[counts > 0] / counts.sum()).tolist()) / block_size if whole else 0.0
+
+    stream, blocked = STREAM_CODECS[codec]
+    make = (lambda: stream(block_size)) if blocked else stream
+    enc_time, dec_time, size, header = run_codec(make, raw, n_bits)
+
+    # run_codec raises if the round trip fails, so a returned point is lossless.
+    # Container bits per input bit, every header included
+    avg_len_bit = 8 * size / n_bits if n_bits else 0.0
+    return {
+        "entropy_per_bit": H_bit,
+        "avg_len_per_bit": avg_len_bit,
+        "efficiency": 100 * H_bit / avg_len_bit if avg_len_bit else 0.0,
+        "original_bits": n_bits,
+        "encoded_bits": 8 * size,
+        "encoded_bytes": size,
+        "header_bits": header,
+        "lossless": True,
+        "encode_s": enc_time,
+        "decode_s": dec_time,
+    }
+
+
+# Step 4: The sweep
+
+def sweep(points, inputs, workers=None, store=None, force=False):
+    # Returns one row per grid point; new results are saved to the store once, at the end
+    store = store or ResultsStore()
+    hashes = {label: packed_data_hash(packed, n_bits) for label, _, _, packed, n_bits in inputs}
+    version = code_version(__file__, *CODE_MODULES)
+
+    rows, todo = [], []
+    for label, p, length, codec, block_size in points:
+        name = store_codec_name(codec)
+        params = {"block_size": block_size, "chunk_bits": CHUNK_BITS, "runner": "sweep"}
+        key = make_key(hashes[label], name, params, version)
+        row = {"dataset": label, "p": p, "length": length, "codec": codec, "block_size": block_size}
+        cached = None if force else store.get(key)
+        if cached is not None:
+            rows.append(dict(row, cached=True, **cached))
+        else:
+            todo.append((row, key, hashes[label], name, params))
+
+    shm, slots = share_inputs(inputs)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            # Longest inputs first, so the pool does not end on one big straggler
+            todo.sort(key=lambda t: -slots[t[0]["dataset"]][2])
+            futures = {pool.submit(run_point, shm.name, slots[row["dataset"]], row["codec"], row["block_size"]):
+                       (row, key, input_hash, name, params)
+                       for row, key, input_hash, name, params in todo}
+            for future in as_completed(futures):
+                row, key, input_hash, name, params = futures[future]
+                metrics = future.result()
+                store.put(key, input_hash, name, params, metrics, save=False, version=version)
+                rows.append(dict(row, cached=False, **metrics))
+                print(f"  {row['dataset']:<28} {row['codec']:>10} k={row['block_size']:<2} "
+                      f"{metrics['avg_len_per_bit']:.4f} bits/bit  {metrics['efficiency']:6.2f}%")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if todo:
+        store.save()
+    return rows
+
+
+# Step 5: Command line
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel sweep over dataset x codec x block size x p x length")
+    parser.add_argument("--datasets", nargs="+", default=datasets,
+                        help="'bernoulli' (generated per p / length) or dataset names in data/")
+    parser.add_argument("--codecs", nargs="+", choices=sorted(STREAM_CODECS), default=codecs)
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=block_sizes)
+    parser.add_argument("--probs", type=float, nargs="+", default=probs)
+    parser.add_argument("--lengths", type=float, nargs="+", default=lengths)
+    parser.add_argument("--seed", type=int, default=seed)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="rerun points already in the results store")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    inputs = load_inputs(args.datasets, args.probs, [int(n) for n in args.lengths], args.seed)
+    points = grid_points([(label, p, length) for label, p, length, _, _ in inputs], args.codecs, args.block_sizes)
+    print(f"\n--- SWEEP ({len(points)} grid points, {args.workers or os.cpu_count()} workers) ---")
+
+    rows = sweep(points, inputs, args.workers, force=args.force)
+    rows.sort(key=lambda r: (r["dataset"], r["codec"], r["block_size"]))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'dataset':<28} {'codec':>10} {'k':>2} {'H/bit':>7} {'bits/bit':>8} {'eff %':>7} {'enc s':>7} {'dec s':>7}")
+    for r in rows:
+        print(f"{r['dataset']:<28} {r['codec']:>10} {r['block_size']:>2} {r['entropy_per_bit']:>7.4f} "
+              f"{r['avg_len_per_bit']:>8.4f} {r['efficiency']:>7.2f} {r['encode_s']:>7.3f} {r['decode_s']:>7.3f}"
+              + ("  (stored)" if r["cached"] else ""))
+    print(f"\n{len(rows)} points in {elapsed:.2f} s ({sum(not r['cached'] for r in rows)} run, "
+          f"{sum(r['cached'] for r in rows)} from the store)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"seed": args.seed, "results": rows}, f, indent=2)
+    print(f"Results saved to: {os.path.abspath(args.output)}")
@@ -1,100 +1,184 @@
 #  THIS SCRIPT
 #  - Compares Huffman (blocked) and Arithmetic Coding results
 #  - Plots compression efficiency, entropy vs avg length, etc.
+#  - Numbers come from the results store (run the codec scripts first); sweep.py
+#    records ("<codec>_container") are whole-container sizes, headers included,
+#    and get their own figure next to the scripts' code-only lengths
+#  - A figure is only redrawn when the data behind it has changed
 
-import matplotlib.pyplot as plt
-import numpy as np
+import hashlib
+import json
 import os
 
+import numpy as np
+
+from bitcodecs.bit_dataset import load_packed_dataset
+from bitcodecs.results_store import ResultsStore, packed_data_hash
 
-# Step 1: Defining the recorded results for the Bernoulli Sequence
 
-methods = ["Huffman-2", "Huffman-3", "Huffman-4", "Arithmetic"]
+if __name__ == "__main__":
 
-# Entropy (bits/symbol)
-entropy_vals = [0.8636, 0.8639, 0.8562, 0.8661]
+    # Step 1: Reading the recorded results for the Bernoulli Sequence from the store
 
-# Average code length (bits/symbol)
-avg_code_len = [0.8750, 0.8902, 0.8620, 0.8661]
+    import matplotlib.pyplot as plt
 
-# Compression efficiency (%)
-efficiency = [98.70, 97.04, 99.33, 100.00]
+    store = ResultsStore()
+    input_hash = packed_data_hash(*load_packed_dataset("bernoulli_bits"))
 
-# Original and compressed bit lengths
-original_bits = [1000, 1002, 1000, 1000]
-compressed_bits = [875, 892, 862, 866.12]
+    # One record per block size (runs with other parameters, e.g. an older length limit, may also be stored)
+    by_block = {r["params"]["block_size"]: r for r in store.query(input_hash, "huffman_blocked")}
+    blocked = [by_block[k] for k in sorted(by_block)]
+    arithmetic = store.query(input_hash, "arithmetic")
 
+    # sweep.py records: container codec -> block size -> container bits per input bit
+    containers = {}
+    for r in store.query(input_hash):
+        if r["codec"].endswith("_container"):
+            codec = r["codec"][:-len("_container")]
+            containers.setdefault(codec, {})[r["params"]["block_size"]] = r["metrics"]["avg_len_per_bit"]
 
-# Step 2: Preparing output directory
+    if not blocked and not arithmetic and not containers:
+        print("\nNo stored results for the Bernoulli data yet.")
+        print("Run huffman_blocked.py (e.g. with block size 2, 3, 4) and arithmetic_compression.py, or sweep.py, first.")
+        raise SystemExit(1)
 
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-results_dir = os.path.join(base_dir, "results")
-os.makedirs(results_dir, exist_ok=True)
+    records = blocked + arithmetic[:1]
+    methods = [f"Huffman-{r['params']['block_size']}" for r in blocked] + ["Arithmetic"] * len(arithmetic[:1])
 
+    # Entropy (bits/symbol)
+    entropy_vals = [r["metrics"]["entropy_per_bit"] for r in records]
 
-# Step 3: Ploting Compression Efficiency
+    # Average code length (bits/symbol)
+    avg_code_len = [r["metrics"]["avg_len_per_bit"] for r in records]
 
-plt.figure(figsize=(7, 4))
-plt.bar(methods, efficiency, color=["#6baed6", "#9ecae1", "#4292c6", "#2171b5"])
-plt.title("Compression Efficiency: Huffman vs Arithmetic")
-plt.ylabel("Efficiency (%)")
-plt.ylim(90, 102)
-plt.grid(axis="y", linestyle="--", alpha=0.6)
-plt.tight_layout()
-plt.savefig(os.path.join(results_dir, "efficiency_comparison.png"))
-plt.close()
+    # Compression efficiency (%)
+    efficiency = [r["metrics"]["efficiency"] for r in records]
 
+    # Original and compressed bit lengths
+    original_bits = [r["metrics"]["original_bits"] for r in records]
+    compressed_bits = [r["metrics"]["encoded_bits"] for r in records]
 
-# Step 4: Ploting Entropy vs Average Code Length
 
-x = np.arange(len(methods))
-width = 0.35
-plt.figure(figsize=(7, 4))
-plt.bar(x - width/2, entropy_vals, width, label="Entropy", color="#74c476")
-plt.bar(x + width/2, avg_code_len, width, label="Avg Code Length", color="#238b45")
-plt.xticks(x, methods)
-plt.ylabel("Bits per Symbol")
-plt.title("Entropy vs Average Code Length per Symbol")
-plt.legend()
-plt.grid(axis="y", linestyle="--", alpha=0.6)
-plt.tight_layout()
-plt.savefig(os.path.join(results_dir, "entropy_vs_avglen.png"))
-plt.close()
+    # Step 2: Preparing output directory and the figure manifest
 
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results_dir = os.path.join(base_dir, "results")
+    os.makedirs(results_dir, exist_ok=True)
 
-# Step 5: Ploting Block Size vs Efficiency (Huffman only)
+    manifest_path = os.path.join(results_dir, "figures_manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+
+    def needs_redraw(name, *data):
+        # A figure is stale when the hash of its plotted data changed or the png is gone
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        if manifest.get(name) == digest and os.path.exists(os.path.join(results_dir, name)):
+            print(f"  {name}: unchanged, skipped")
+            return False
+        manifest[name] = digest
+        print(f"  {name}: redrawn")
+        return True
 
-block_sizes = [2, 3, 4]
-huffman_eff = efficiency[:3]
 
-plt.figure(figsize=(7, 4))
-plt.plot(block_sizes, huffman_eff, marker="o", color="#08519c", linewidth=2)
-plt.title("Effect of Block Size on Huffman Compression Efficiency")
-plt.xlabel("Block Size")
-plt.ylabel("Efficiency (%)")
-plt.grid(True, linestyle="--", alpha=0.6)
-plt.tight_layout()
-plt.savefig(os.path.join(results_dir, "blocksize_efficiency.png"))
-plt.close()
+    print("\nFigures:")
 
 
-# Step 6: Ploting Original vs Compressed Bit Lengths
+    # Step 3: Ploting Compression Efficiency
 
-x = np.arange(len(methods))
-plt.figure(figsize=(7, 4))
-plt.bar(x - width/2, original_bits, width, label="Original", color="#fdae6b")
-plt.bar(x + width/2, compressed_bits, width, label="Compressed", color="#e6550d")
-plt.xticks(x, methods)
-plt.ylabel("Bit Length")
-plt.title("Original vs Compressed Bit Lengths")
-plt.legend()
-plt.grid(axis="y", linestyle="--", alpha=0.6)
-plt.tight_layout()
-plt.savefig(os.path.join(results_dir, "bitlength_comparison.png"))
-plt.close()
+    if records and needs_redraw("efficiency_comparison.png", methods, efficiency):
+        plt.figure(figsize=(7, 4))
+        plt.bar(methods, efficiency, color=["#6baed6", "#9ecae1", "#4292c6", "#2171b5"])
+        plt.title("Compression Efficiency: Huffman vs Arithmetic")
+        plt.ylabel("Efficiency (%)")
+        plt.ylim(90, 102)
+        plt.grid(axis="y", linestyle="--", alpha=0.6)
+        plt.tight_layout()
+        plt.savefig(os.path.join(results_dir, "efficiency_comparison.png"))
+        plt.close()
 
 
-# Done
+    # Step 4: Ploting Entropy vs Average Code Length
 
-print("\nAll comparison plots have been generated and saved to:")
-print(results_dir)
\ No newline at end of file
+    width = 0.35
+    if records and needs_redraw("entropy_vs_avglen.png", methods, entropy_vals, avg_code_len):
+        x = np.arange(len(methods))
+        plt.figure(figsize=(7, 4))
+        plt.bar(x - width/2, entropy_vals, width, label="Entropy", color="#74c476")
+        plt.bar(x + width/2, avg_code_len, width, label="Avg Code Length", color="#238b45")
+        plt.xticks(x, methods)
+        plt.ylabel("Bits per Symbol")
+        plt.title("Entropy vs Average Code Length per Symbol")
+        plt.legend()
+        plt.grid(axis="y", linestyle="--", alpha=0.6)
+        plt.tight_layout()
+        plt.savefig(os.path.join(results_dir, "entropy_vs_avglen.png"))
+        plt.close()
+
+
+    # Step 5: Ploting Block Size vs Efficiency (Huffman only)
+
+    block_sizes = [r["params"]["block_size"] for r in blocked]
+    huffman_eff = efficiency[:len(blocked)]
+
+    if blocked and needs_redraw("blocksize_efficiency.png", block_sizes, huffman_eff):
+        plt.figure(figsize=(7, 4))
+        plt.plot(block_sizes, huffman_eff, marker="o", color="#08519c", linewidth=2)
+        plt.title("Effect of Block Size on Huffman Compression Efficiency")
+        plt.xlabel("Block Size")
+        plt.ylabel("Efficiency (%)")
+        plt.grid(True, linestyle="--", alpha=0.6)
+        plt.tight_layout()
+        plt.savefig(os.path.join(results_dir, "blocksize_efficiency.png"))
+        plt.close()
+
+
+    # Step 6: Ploting Original vs Compressed Bit Lengths
+
+    if records and needs_redraw("bitlength_comparison.png", methods, original_bits, compressed_bits):
+        x = np.arange(len(methods))
+        plt.figure(figsize=(7, 4))
+        plt.bar(x - width/2, original_bits, width, label="Original", color="#fdae6b")
+        plt.bar(x + width/2, compressed_bits, width, label="Compressed", color="#e6550d")
+        plt.xticks(x, methods)
+        plt.ylabel("Bit Length")
+        plt.title("Original vs Compressed Bit Lengths")
+        plt.legend()
+        plt.grid(axis="y", linestyle="--", alpha=0.6)
+        plt.tight_layout()
+        plt.savefig(os.path.join(results_dir, "bitlength_comparison.png"))
+        plt.close()
+
+
+    # Step 7: Ploting whole-container sizes from sweep.py against the code-only lengths
+
+    container_lines = {codec: sorted(sizes.items()) for codec, sizes in sorted(containers.items())}
+    code_only = list(zip(block_sizes, [r["metrics"]["avg_len_per_bit"] for r in blocked]))
+
+    if containers and needs_redraw("container_bits_per_bit.png", container_lines, code_only):
+        plt.figure(figsize=(7, 4))
+        for codec, points in container_lines.items():
+            plt.plot([k for k, _ in points], [v for _, v in points], marker="o", linewidth=2,
+                     label=f"{codec} (container)")
+        if code_only:
+            plt.plot([k for k, _ in code_only], [v for _, v in code_only], marker="s", linestyle="--",
+                     color="gray", label="huffman (code lengths only)")
+        plt.title("Container Size per Input Bit (sweep.py, headers included)")
+        plt.xlabel("Block Size")
+        plt.ylabel("Bits per Input Bit")
+        plt.legend()
+        plt.grid(True, linestyle="--", alpha=0.6)
+        plt.tight_layout()
+        plt.savefig(os.path.join(results_dir, "container_bits_per_bit.png"))
+        plt.close()
+
+
+    # Done
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print("\nAll comparison plots are up to date in:")
+    print(results_dir)